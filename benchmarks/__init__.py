@@ -0,0 +1 @@
+"""Benchmarks for the hot paths; run with `python -m benchmarks.run --help`."""
@@ -0,0 +1,285 @@
+"""Time the hot paths and write the results as JSON.
+
+    python -m benchmarks.run --rows 1000 100000 1000000 --output bench.json
+    python -m benchmarks.run --compare bench.json
+
+Each case is run `--repeat` times and reported as min/median/max
+milliseconds per operation. With `--compare`, cases whose median grew by
+more than `--tolerance` against an earlier run are listed and the exit status
+is 1, so a deploy script can stop on regressions.
+
+Chart cases drive the same TrackerChart a tracker uses, built without Tk:
+finished images are only kept as the last result, not shown or written to
+the chart cache.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from . import synthetic
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+WORK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".work")
+
+PRICE_STRINGS = ["$1,234.56", "1.234,56€", "£12.03", "CDN$ 7.45", "12,--€", "--", "", "¥ 1,820", "R$ 45,90", "$0.03"]
+
+def timed(fn, repeat: int = 5, number: int = 1, ops: int = 1) -> dict:
+    """Run fn `number` times per sample and report milliseconds per operation.
+
+    `ops` is how many operations a single call of fn performs (e.g. the size
+    of a batch), so batched cases stay comparable with single calls.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) * 1000 / (number * ops))
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "max_ms": max(samples),
+        "repeat": repeat,
+        "ops": number * ops,
+    }
+
+def once(fn) -> dict:
+    'Time a single run of work that changes state (a rebuild, a cold cache).'
+    start = time.perf_counter()
+    fn()
+    elapsed = (time.perf_counter() - start) * 1000
+    return {"min_ms": elapsed, "median_ms": elapsed, "max_ms": elapsed, "repeat": 1, "ops": 1}
+
+def tracker_chart(logger):
+    'A TrackerChart as a tracker builds it, with indicators off; finished images are dropped.'
+    from steam_market_gui.tracker_chart import TrackerChart
+
+    chart = TrackerChart(logger, show=lambda image, pixel_points, text="": None)
+    chart.show_indicators = False
+    return chart
+
+def sample_item_image():
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGBA", (360, 270), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.polygon([(20, 200), (300, 40), (340, 70), (70, 240)], fill=(190, 120, 220, 255))
+    draw.ellipse((40, 180, 110, 250), fill=(90, 90, 110, 255))
+    return image
+
+def bench_utils(results: dict, repeat: int):
+    from steam_market_gui.utils import parse_price_to_float
+
+    batch = PRICE_STRINGS * 1000
+    results["parse_price_to_float"] = timed(lambda: [parse_price_to_float(s) for s in batch], repeat, ops=len(batch))
+
+    from steam_market_gui.item_style import ItemStyler
+
+    image = sample_item_image()
+    results["stylize_item_image"] = timed(lambda: ItemStyler().stylize(image), repeat)
+
+    bench_alerts(results, repeat)
+
+def bench_alerts(results: dict, repeat: int, items: int = 500):
+    'One refresh of a large watchlist: per-item thresholds plus catch-all change and spread rules.'
+    import numpy as np
+    from steam_market_gui.alerts import AlertEngine, Rule
+
+    slugs = [f"item-{i:04d}" for i in range(items)]
+    specs = [{"item": slug, "type": kind, "value": 1.0 if kind == "below" else 1e6} for slug in slugs for kind in ("below", "above")]
+    specs += [{"item": "*", "type": "change", "window": window, "percent": percent} for window in ("15m", "1h", "1d") for percent in (-5, -10, 5)]
+    specs += [{"item": "*", "type": "spread", "percent": 8}]
+    engine = AlertEngine([Rule(spec, i) for i, spec in enumerate(specs, 1)], [], cooldown=900)
+    prices = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, (4096, items)), axis=0))
+    tick = 0
+
+    def refresh():
+        nonlocal tick
+        row = prices[tick % len(prices)].tolist()
+        epoch = tick * 300.0
+        tick += 1
+        for slug, median in zip(slugs, row):
+            engine.observe(slug, median, median * 0.97, epoch)
+
+    refresh()  # first sample of every item matches the rules
+    results[f"alerts/observe/{len(specs)}_rules"] = timed(refresh, repeat, number=5, ops=items)
+
+def bench_history(results: dict, rows: int, args):
+    from steam_market_gui.data_logger import PriceLogger, SeriesCache
+    from steam_market_gui.tracker_chart import TIMEFRAME_SPANS
+
+    prefix = f"history/{rows}"
+    start = time.perf_counter()
+    path = synthetic.ensure_history(args.work_dir, rows, args.span_days, args.failure_rate)
+    print(f"  {rows} rows ready in {time.perf_counter() - start:.1f}s ({os.path.getsize(path) / 1e6:.1f} MB)", file=sys.stderr)
+
+    logger = PriceLogger(path)
+    if os.path.exists(path + ".1h"):
+        logger.ohlc_series("1d")
+    else:
+        results[f"{prefix}/rollup_rebuild"] = once(lambda: logger.ohlc_series("1d"))
+    results[f"{prefix}/latest"] = timed(logger.latest, args.repeat, number=100)
+
+    append_path = os.path.join(args.work_dir, "append.csv")
+    for suffix in ("", ".idx", ".1h", ".1d"):
+        shutil.copyfile(path + suffix, append_path + suffix)
+    append_logger = PriceLogger(append_path)
+    append_logger.append(250.0, 249.0, "12")  # first append checks the rollups
+    results[f"{prefix}/append"] = timed(lambda: append_logger.append(250.0, 249.0, "12"), args.repeat, number=50)
+
+    # load path of TrackerChart.plot: the series cache (CSV), the window read (other backends), the rollups
+    results[f"{prefix}/load/series_cache_cold"] = timed(lambda: SeriesCache(path).refresh(), min(args.repeat, 3))
+    chart = tracker_chart(logger)
+    points = chart.series_cache.refresh()
+    results[f"{prefix}/load/series_cache_warm"] = timed(chart.series_cache.refresh, args.repeat, number=20)
+    for timeframe in TIMEFRAME_SPANS:
+        chart.timeframe = timeframe
+        results[f"{prefix}/load/window/{timeframe}"] = timed(chart.load_window_points, min(args.repeat, 3))
+        resolution = chart.rollup_resolution(timeframe)
+        if resolution is not None:
+            results[f"{prefix}/load/rollup/{timeframe}"] = timed(lambda: logger.ohlc_series(resolution), args.repeat)
+
+    for timeframe in TIMEFRAME_SPANS:
+        chart.timeframe = timeframe
+        chart.points = points
+
+        def render():
+            chart._downsample_cache = {}  # a refresh with new rows misses the cache
+            chart.render(timeframe)
+
+        render()  # first render builds the Matplotlib figure
+        results[f"{prefix}/render/{timeframe}"] = timed(render, args.repeat)
+        results[f"{prefix}/render_cached/{timeframe}"] = timed(lambda: chart.render(timeframe), args.repeat)
+        resolution = chart.rollup_resolution(timeframe)
+        if resolution is not None:
+            for mode in ("line", "candles"):
+                chart.chart_mode = mode
+                results[f"{prefix}/render_rollup/{timeframe}/{mode}"] = timed(
+                    lambda: chart.render_rollup(timeframe, resolution), args.repeat
+                )
+            chart.chart_mode = "line"
+        results[f"{prefix}/plot_chart/{timeframe}"] = timed(chart.plot, args.repeat)
+
+    from steam_market_gui.indicators import RollingIndicators
+
+    epochs, medians, volumes, _ = chart.series_cache.columns()
+    indicators = RollingIndicators()
+    results[f"{prefix}/indicators/backfill"] = timed(lambda: indicators.backfill(epochs, medians, volumes), min(args.repeat, 3))
+    tail = list(zip(epochs[-1000:].tolist(), medians[-1000:].tolist(), volumes[-1000:].tolist()))
+    results[f"{prefix}/indicators/update"] = timed(lambda: [indicators.update(*sample) for sample in tail], args.repeat, ops=len(tail))
+    chart.show_indicators = True
+    for timeframe in TIMEFRAME_SPANS:
+        chart.timeframe = timeframe
+        chart._indicator_source = None  # first refresh backfills
+        chart.plot()
+        results[f"{prefix}/plot_chart_indicators/{timeframe}"] = timed(chart.plot, args.repeat)
+
+def bench_client(results: dict, args):
+    from .steam_stub import SteamStub, FIXTURE_ITEMS
+    from steam_market_gui.steam_api import SteamMarketClient
+
+    with SteamStub(latency=args.latency, error_rate=args.error_rate, retry_after=args.retry_after, seed=1) as stub:
+        client = SteamMarketClient(base_url=stub.url)
+        failures = 0
+
+        def price_overview():
+            nonlocal failures
+            if client.price_overview("Item 001") is None:
+                failures += 1
+
+        prefix = f"client/latency={args.latency:g}/429={args.error_rate:g}"
+        results[f"{prefix}/price_overview"] = timed(price_overview, args.repeat, number=args.requests)
+        names = [item["hash_name"] for item in stub.items]
+        results[f"{prefix}/bulk_prices/{FIXTURE_ITEMS}"] = timed(lambda: client.bulk_prices(names), args.repeat)
+        results[f"{prefix}/listing_image_url"] = timed(
+            lambda: client.listing_image_url(stub.url + "/market/listings/730/Item%20001"), args.repeat
+        )
+        results[f"{prefix}/stub"] = {**stub.stats, "failed_price_overview": failures}
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: dict, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or "median_ms" not in result or "median_ms" not in before:
+            continue
+        if before["median_ms"] > 0 and result["median_ms"] > before["median_ms"] * (1 + tolerance):
+            regressions.append((name, before["median_ms"], result["median_ms"]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the steam_market_gui hot paths")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100_000], help="history sizes to benchmark (up to 10M)")
+    parser.add_argument("--span-days", type=float, default=365, help="days each synthetic history covers")
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="share of rows logged without prices")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per case")
+    parser.add_argument("--requests", type=int, default=20, help="priceoverview requests per client sample")
+    parser.add_argument("--latency", type=float, default=0.02, help="stub response latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="share of stub responses that are 429")
+    parser.add_argument("--retry-after", type=float, default=0.0, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--skip", nargs="*", default=[], choices=("utils", "history", "client"), help="groups to leave out")
+    parser.add_argument("--work-dir", default=WORK_DIR, help="where synthetic histories are cached")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    # the benchmark measures the client, not the production request budget
+    os.environ.setdefault("STEAM_RATE_PER_MINUTE", "1000000")
+    os.environ.setdefault("STEAM_RATE_BURST", "1000")
+
+    results = {}
+    if "utils" not in args.skip:
+        print("utils ...", file=sys.stderr)
+        bench_utils(results, args.repeat)
+    if "history" not in args.skip:
+        for rows in args.rows:
+            print(f"history {rows} ...", file=sys.stderr)
+            bench_history(results, rows, args)
+    if "client" not in args.skip:
+        print("client ...", file=sys.stderr)
+        bench_client(results, args)
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.3f} -> {after:.3f} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
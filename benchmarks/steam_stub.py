@@ -0,0 +1,179 @@
+"""Local stand-in for the Steam Market endpoints the clients use.
+
+Serves priceoverview, paginated search/render results and a listing page
+with an og:image tag, after `latency` seconds, and answers a share
+`error_rate` of requests with 429 and a `Retry-After` header. Point a client
+at it with `base_url=stub.url` (or STEAM_BASE_URL). POSTs to /alerts are
+accepted and kept in `alerts`, so a webhook alert sink can target it.
+
+    python -m benchmarks.steam_stub --port 8765 --latency 0.05 --error-rate 0.1
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from steam_market_gui.steam_api import PRICE_OVERVIEW_PATH, SEARCH_RENDER_PATH
+
+FIXTURE_ITEMS = 250
+
+def search_fixture(count: int = FIXTURE_ITEMS):
+    return [
+        {
+            "hash_name": f"Item {i:03d}",
+            "sell_listings": i + 1,
+            "sell_price_text": f"${10 + i}.50",
+            "sale_price_text": f"${10 + i}.25",
+        }
+        for i in range(count)
+    ]
+
+LISTING_PAGE = (
+    b"<html><head><title>Listing</title>"
+    b'<meta property="og:image" content="https://community.akamai.steamstatic.com/economy/image/stub/360fx360f">'
+    b"</head><body>" + b"<div>listing</div>" * 2000 + b"</body></html>"
+)
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients that stop reading early (og:image streaming) reset the connection
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class SteamStub:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, error_rate: float = 0.0, retry_after: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.items = search_fixture()
+        self.stats = {"requests": 0, "throttled": 0}
+        self.alerts = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body go out in separate writes; avoid the delayed-ACK stall on keep-alive
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stub._handle(self)
+
+            def do_POST(self):
+                stub._handle_post(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="steam-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handle(self, handler: BaseHTTPRequestHandler):
+        with self._lock:
+            self.stats["requests"] += 1
+            throttled = self._random.random() < self.error_rate
+            if throttled:
+                self.stats["throttled"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(handler.path)
+        if throttled:
+            self._send(handler, 429, b"Too Many Requests", "text/plain", {"Retry-After": f"{self.retry_after:g}"})
+            return
+        if url.path == PRICE_OVERVIEW_PATH:
+            body = {"success": True, "lowest_price": "$254.10", "median_price": "$251.37", "volume": "1,204"}
+        elif url.path == SEARCH_RENDER_PATH:
+            query = parse_qs(url.query)
+            start = int(query.get("start", ["0"])[0])
+            count = int(query.get("count", ["100"])[0])
+            body = {
+                "success": True,
+                "start": start,
+                "pagesize": count,
+                "total_count": len(self.items),
+                "results": self.items[start:start + count],
+            }
+        elif url.path.startswith("/market/listings/"):
+            self._send(handler, 200, LISTING_PAGE, "text/html; charset=utf-8")
+            return
+        else:
+            self._send(handler, 404, b"not found", "text/plain")
+            return
+        self._send(handler, 200, json.dumps(body).encode("utf-8"), "application/json")
+
+    def _handle_post(self, handler: BaseHTTPRequestHandler):
+        body = handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+        if urlparse(handler.path).path != "/alerts":
+            self._send(handler, 404, b"not found", "text/plain")
+            return
+        try:
+            alert = json.loads(body)
+        except ValueError:
+            self._send(handler, 400, b"invalid JSON", "text/plain")
+            return
+        with self._lock:
+            self.alerts.append(alert)
+        print("alert:", json.dumps(alert), file=sys.stderr)
+        self._send(handler, 204, b"", "text/plain")
+
+    @staticmethod
+    def _send(handler, status: int, body: bytes, content_type: str, headers=None):
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        try:
+            handler.wfile.write(body)
+        except ConnectionError:
+            pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve stub Steam Market responses locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with a 429")
+    args = parser.parse_args(argv)
+
+    stub = SteamStub(args.host, args.port, args.latency, args.error_rate, args.retry_after)
+    print(f"Steam stub on {stub.url} (STEAM_BASE_URL={stub.url})")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Synthetic price histories in the PriceLogger CSV layout.
+
+Prices follow a seeded random walk over `span_days` ending now, so the Day
+and Week views always have data. A small share of rows is left without
+prices, as failed fetches are in real logs. Files are cached by their
+parameters, so only the first run pays for generating large histories.
+"""
+import os
+import time
+
+import numpy as np
+
+from steam_market_gui.data_logger import FIELDNAMES
+
+CHUNK_ROWS = 200_000
+
+def history_path(work_dir: str, rows: int, span_days: float, failure_rate: float, seed: int) -> str:
+    return os.path.join(work_dir, f"history-{rows}-{span_days:g}d-{failure_rate:g}-{seed}.csv")
+
+def write_history(path: str, rows: int, span_days: float = 365, failure_rate: float = 0.02, seed: int = 1, end_epoch=None):
+    'Write `rows` evenly spaced samples covering the `span_days` before `end_epoch`.'
+    rng = np.random.default_rng(seed)
+    end = int(time.time() if end_epoch is None else end_epoch)
+    start = end - int(span_days * 86400)
+    step = max((end - start) / max(rows - 1, 1), 1.0)
+    price = 250.0
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(FIELDNAMES) + "\n")
+        for first in range(0, rows, CHUNK_ROWS):
+            count = min(CHUNK_ROWS, rows - first)
+            epochs = (start + np.arange(first, first + count) * step).astype(np.int64)
+            walk = price * np.exp(np.cumsum(rng.normal(0.0, 0.002, count)))
+            price = float(walk[-1])
+            medians = np.round(walk, 2)
+            lowests = np.round(walk * rng.uniform(0.97, 1.0, count), 2)
+            volumes = rng.integers(1, 40, count)
+            failed = rng.random(count) < failure_rate
+            stamps = np.datetime_as_string(epochs.astype("datetime64[s]"), unit="s")
+            lines = [
+                f"{stamp}+00:00,{epoch},,,\n" if fail else f"{stamp}+00:00,{epoch},{median},{lowest},{volume}\n"
+                for stamp, epoch, median, lowest, volume, fail in zip(
+                    stamps.tolist(), epochs.tolist(), medians.tolist(), lowests.tolist(), volumes.tolist(), failed.tolist()
+                )
+            ]
+            f.write("".join(lines))
+    os.replace(tmp_path, path)
+
+def ensure_history(work_dir: str, rows: int, span_days: float = 365, failure_rate: float = 0.02, seed: int = 1) -> str:
+    """Path of a generated history, writing it unless a fresh one exists.
+
+    A cached file counts as fresh while its newest row is under an hour old,
+    so the Day view of a reused history still covers a full day.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    path = history_path(work_dir, rows, span_days, failure_rate, seed)
+    if not os.path.exists(path) or time.time() - os.path.getmtime(path) > 3600:
+        write_history(path, rows, span_days, failure_rate, seed)
+        for suffix in (".idx", ".1h", ".1d"):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+    return path
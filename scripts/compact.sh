@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+set -e
+source .venv/bin/activate
+python -m steam_market_gui.compaction "$@"
@@ -0,0 +1,3 @@
+@echo off
+call .venv\Scripts\activate
+python -m steam_market_gui.query %*
@@ -0,0 +1,309 @@
+"""Alert rules evaluated on every logged price sample.
+
+Rules and sinks come from a JSON file (ALERTS_FILE, see alerts.example.json):
+
+    {
+      "cooldown": 900,
+      "sinks": [{"type": "log", "path": "data/alerts.log"}, {"type": "desktop"}],
+      "rules": [
+        {"item": "AK-47 | Redline (Field-Tested)", "type": "below", "value": 12.5},
+        {"item": "*", "type": "change", "window": "1h", "percent": -5},
+        {"item": "ak-47-*", "type": "spread", "percent": 8}
+      ]
+    }
+
+`item` is a market hash name or a glob over item slugs. Rule types:
+
+    above / below   `field` (median or lowest, default median) crosses `value`
+    change          `field` moved `percent` against the extreme of the last
+                    `window` (-5: 5 % under the window high, 5: 5 % over its low)
+    spread          lowest listing is `percent` or more under the median
+
+A rule fires when its condition becomes true and again only after it was
+false in between and `cooldown` seconds passed. Rolling windows are
+monotonic deques shared by all rules on the same item, field and window,
+so a sample costs O(1) amortized per window and a dict lookup per rule;
+nothing is re-read from the logs. Alerts are delivered to the sinks on a
+background thread, so a slow webhook never delays a refresh.
+"""
+import fnmatch
+import json
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from .utils import parse_duration, slugify
+
+FIELDS = ("median", "lowest")
+
+@dataclass
+class Alert:
+    rule: str
+    item: str
+    message: str
+    value: float
+    epoch: int
+
+class RollingWindow:
+    """Maximum and minimum of the samples in the last `seconds` seconds."""
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self._max = deque()  # (epoch, value), values decreasing
+        self._min = deque()  # (epoch, value), values increasing
+
+    def push(self, epoch: float, value: float):
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((epoch, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((epoch, value))
+        cutoff = epoch - self.seconds
+        while self._max[0][0] < cutoff:
+            self._max.popleft()
+        while self._min[0][0] < cutoff:
+            self._min.popleft()
+
+    @property
+    def empty(self) -> bool:
+        return not self._max
+
+    @property
+    def high(self) -> float:
+        return self._max[0][1]
+
+    @property
+    def low(self) -> float:
+        return self._min[0][1]
+
+class Rule:
+    def __init__(self, spec: dict, index: int):
+        # names need not be unique; the index identifies the rule
+        self.index = index
+        self.kind = str(spec.get("type", "")).lower()
+        if self.kind not in ("above", "below", "change", "spread"):
+            raise ValueError(f"rule {index}: unknown type {spec.get('type')!r}")
+        item = str(spec.get("item", "*"))
+        self.pattern = item if any(c in item for c in "*?[") else slugify(item)
+        self.field = str(spec.get("field", "median")).lower()
+        if self.field not in FIELDS:
+            raise ValueError(f"rule {index}: field must be one of {', '.join(FIELDS)}")
+        try:
+            if self.kind in ("above", "below"):
+                self.value = float(spec["value"])
+            else:
+                self.percent = float(spec["percent"])
+            self.window = parse_duration(spec["window"]) if self.kind == "change" else None
+        except KeyError as e:
+            raise ValueError(f"rule {index}: {self.kind} needs {e.args[0]!r}") from None
+        if self.kind == "change" and not self.percent:
+            raise ValueError(f"rule {index}: change percent must not be 0")
+        self.name = str(spec.get("name") or self._default_name(item))
+
+    def _default_name(self, item: str) -> str:
+        if self.kind in ("above", "below"):
+            return f"{item}: {self.field} {self.kind} {self.value:g}"
+        if self.kind == "change":
+            return f"{item}: {self.field} {self.percent:+g}% in {self.window}s"
+        return f"{item}: spread {self.percent:g}%"
+
+    def matches(self, slug: str) -> bool:
+        return fnmatch.fnmatchcase(slug, self.pattern)
+
+    def applies(self, median: Optional[float], lowest: Optional[float]) -> bool:
+        'Whether the sample has the prices this rule looks at.'
+        if self.kind == "spread":
+            return median is not None and lowest is not None
+        return (median if self.field == "median" else lowest) is not None
+
+    def check(self, median: Optional[float], lowest: Optional[float], window: Optional[RollingWindow]):
+        'The (message, value) if the condition holds for this sample, else None.'
+        if self.kind == "spread":
+            if not median or lowest is None:
+                return None
+            spread = (median - lowest) / median * 100
+            if spread >= self.percent:
+                return f"lowest {lowest:.2f} is {spread:.1f}% under median {median:.2f}", lowest
+            return None
+        price = median if self.field == "median" else lowest
+        if price is None:
+            return None
+        if self.kind == "below":
+            return (f"{self.field} {price:.2f} below {self.value:g}", price) if price < self.value else None
+        if self.kind == "above":
+            return (f"{self.field} {price:.2f} above {self.value:g}", price) if price > self.value else None
+        if self.percent < 0:
+            reference = window.high
+            change = (price - reference) / reference * 100 if reference else 0.0
+            hit = change <= self.percent
+        else:
+            reference = window.low
+            change = (price - reference) / reference * 100 if reference else 0.0
+            hit = change >= self.percent
+        if hit:
+            return f"{self.field} {price:.2f} is {change:+.1f}% from {reference:.2f} within {self.window}s", price
+        return None
+
+# -- sinks -----------------------------------------------------------------
+
+class LogSink:
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, alert: Alert):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(alert)) + "\n")
+
+class WebhookSink:
+    def __init__(self, url: str, timeout: float = 5.0):
+        import requests
+
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, alert: Alert):
+        response = self.session.post(self.url, json=asdict(alert), timeout=self.timeout)
+        response.raise_for_status()
+
+class DesktopSink:
+    """notify-send on Linux, Notification Center on macOS, stderr elsewhere."""
+
+    def send(self, alert: Alert):
+        title = f"Steam Market: {alert.item}"
+        system = platform.system()
+        if system == "Linux" and shutil.which("notify-send"):
+            command = ["notify-send", "--app-name=steam_market_gui", title, alert.message]
+        elif system == "Darwin":
+            command = ["osascript", "-e", f"display notification {json.dumps(alert.message)} with title {json.dumps(title)}"]
+        else:
+            print(f"ALERT {title}: {alert.message}", file=sys.stderr)
+            return
+        subprocess.run(command, check=False, timeout=10, capture_output=True)
+
+SINKS = {"log": LogSink, "webhook": WebhookSink, "desktop": DesktopSink}
+
+def make_sink(spec: dict):
+    kind = str(spec.get("type", "")).lower()
+    if kind not in SINKS:
+        raise ValueError(f"unknown sink type {spec.get('type')!r}")
+    options = {key: value for key, value in spec.items() if key != "type"}
+    try:
+        return SINKS[kind](**options)
+    except TypeError as e:
+        raise ValueError(f"sink {kind}: {e}") from None
+
+# -- engine ----------------------------------------------------------------
+
+class AlertEngine:
+    def __init__(self, rules: List[Rule], sinks: list, cooldown: float = 900.0):
+        self.rules = rules
+        self.sinks = sinks
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._items: Dict[str, tuple] = {}  # slug -> ([(rule, window)], [((field, seconds), window)])
+        self._active: Dict[tuple, bool] = {}  # (rule index, slug) -> condition held at the last sample
+        self._fired: Dict[tuple, float] = {}
+        self._outbox: "queue.Queue[Alert]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def _rules_for(self, slug: str) -> tuple:
+        entries = []
+        windows = {}
+        for rule in self.rules:
+            if rule.matches(slug):
+                window = None
+                if rule.window:
+                    key = (rule.field, rule.window)
+                    window = windows.get(key) or windows.setdefault(key, RollingWindow(rule.window))
+                entries.append((rule, window))
+        item = self._items[slug] = (entries, list(windows.items()))
+        return item
+
+    def observe(self, slug: str, median: Optional[float], lowest: Optional[float], epoch: Optional[float] = None) -> List[Alert]:
+        'Evaluate the rules of one item against a freshly logged sample; returns the alerts fired.'
+        epoch = time.time() if epoch is None else epoch
+        fired = []
+        with self._lock:
+            item = self._items.get(slug)
+            entries, windows = item if item is not None else self._rules_for(slug)
+            if not entries:
+                return fired
+            for (field, _), window in windows:
+                value = median if field == "median" else lowest
+                if value is not None:
+                    window.push(epoch, value)
+            for rule, window in entries:
+                if not rule.applies(median, lowest) or (window is not None and window.empty):
+                    # a failed fetch neither fires nor re-arms a rule
+                    continue
+                result = rule.check(median, lowest, window)
+                state = (rule.index, slug)
+                if result is None:
+                    self._active[state] = False
+                    continue
+                if self._active.get(state) or epoch - self._fired.get(state, float("-inf")) < self.cooldown:
+                    continue
+                self._active[state] = True
+                self._fired[state] = epoch
+                message, value = result
+                fired.append(Alert(rule.name, slug, message, value, int(epoch)))
+        for alert in fired:
+            self._deliver(alert)
+        return fired
+
+    def _deliver(self, alert: Alert):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._drain, name="alerts", daemon=True)
+            self._worker.start()
+        self._outbox.put(alert)
+
+    def _drain(self):
+        while True:
+            alert = self._outbox.get()
+            for sink in self.sinks:
+                try:
+                    sink.send(alert)
+                except Exception as e:
+                    print(f"Alert sink {type(sink).__name__} failed:", e, file=sys.stderr)
+
+def load_engine(path: str) -> Optional[AlertEngine]:
+    'The engine configured in `path`, or None if the file does not exist.'
+    try:
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+    except FileNotFoundError:
+        return None
+    rules = [Rule(rule, i) for i, rule in enumerate(spec.get("rules", []), 1)]
+    sinks = [make_sink(sink) for sink in spec.get("sinks", [{"type": "desktop"}])]
+    return AlertEngine(rules, sinks, float(spec.get("cooldown", 900)))
+
+_engine: Optional[AlertEngine] = None
+
+def configure(path: str) -> Optional[AlertEngine]:
+    'Load the rules used by `observe`; errors are reported and leave alerts off.'
+    global _engine
+    try:
+        _engine = load_engine(path)
+    except (OSError, ValueError) as e:
+        print(f"Alerts disabled, cannot load {path}:", e, file=sys.stderr)
+        _engine = None
+    if _engine is not None:
+        print(f"Loaded {len(_engine.rules)} alert rules from {path}", file=sys.stderr)
+    return _engine
+
+def observe(slug: str, median: Optional[float], lowest: Optional[float]):
+    'Hook called after a sample is logged; a no-op unless `configure` loaded rules.'
+    if _engine is not None:
+        _engine.observe(slug, median, lowest)
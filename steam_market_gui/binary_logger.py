@@ -0,0 +1,179 @@
+"""Append-only binary price log.
+
+Each item gets a `{slug}.bin` file: a 16-byte header followed by fixed-width
+little-endian records (epoch int64, median float64, lowest float64,
+volume int32). Missing prices are stored as NaN and a missing volume as -1.
+Readers map the file with numpy.memmap, so loading a chart touches only the
+pages it needs and never parses text.
+
+Convert the existing CSV logs once with:
+
+    python -m steam_market_gui.binary_logger --data-dir data
+"""
+import argparse
+import csv
+import glob
+import math
+import os
+import struct
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+
+from .utils import parse_volume, to_float
+
+MAGIC = b"SMPRICE1"
+HEADER = struct.Struct("<8sII")  # magic, record size, reserved
+RECORD = struct.Struct("<qddi")
+RECORD_DTYPE = np.dtype([
+    ("epoch", "<i8"),
+    ("median", "<f8"),
+    ("lowest", "<f8"),
+    ("volume", "<i4"),
+])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+def _pack(epoch: int, median: Optional[float], lowest: Optional[float], volume: Optional[int]) -> bytes:
+    return RECORD.pack(
+        int(epoch),
+        math.nan if median is None else float(median),
+        math.nan if lowest is None else float(lowest),
+        -1 if volume is None else int(volume),
+    )
+
+def _record_to_dict(epoch: int, median: float, lowest: float, volume: int) -> Dict[str, Any]:
+    ts = datetime.fromtimestamp(epoch, tz=timezone.utc).astimezone()
+    return {
+        "timestamp_iso": ts.isoformat(timespec="seconds"),
+        "timestamp": ts,
+        "epoch_s": float(epoch),
+        "median_price": None if math.isnan(median) else median,
+        "lowest_price": None if math.isnan(lowest) else lowest,
+        "volume": "" if volume < 0 else str(volume),
+    }
+
+class BinaryPriceLogger:
+    def __init__(self, path: str, read_only: bool = False):
+        self.path = path
+        # a reader never creates the log or trims a record the writer is in the middle of
+        self.read_only = read_only
+        if not os.path.exists(self.path):
+            if not read_only:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "wb") as f:
+                    f.write(HEADER.pack(MAGIC, RECORD.size, 0))
+        else:
+            with open(self.path, "rb") as f:
+                magic, size, _ = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or size != RECORD.size:
+                raise ValueError(f"{self.path} is not a price log (bad header)")
+
+    def append(self, median: Optional[float], lowest: Optional[float], volume: Optional[str]):
+        """Persist a single price snapshot to disk with an accurate timestamp."""
+        if self.read_only:
+            raise ValueError(f"{self.path} is opened read-only")
+        record = _pack(round(time.time()), median, lowest, parse_volume(volume))
+        with open(self.path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            whole = HEADER.size + max(0, size - HEADER.size) // RECORD.size * RECORD.size
+            if size != whole:
+                # a record torn by a crash mid-write would misalign every record after it
+                f.truncate(whole)
+                f.seek(whole)
+            f.write(record)
+
+    def __len__(self) -> int:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        # a torn trailing record (crash mid-write) is ignored
+        return max(0, (size - HEADER.size) // RECORD.size)
+
+    def records(self, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None) -> np.ndarray:
+        """Zero-copy view of the records with start_epoch <= epoch <= end_epoch.
+
+        Records are appended in time order, so the bounds are found by binary
+        search on the memory-mapped epoch column.
+        """
+        count = len(self)
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        data = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+        lo, hi = 0, count
+        if start_epoch is not None:
+            lo = int(np.searchsorted(data["epoch"], start_epoch, side="left"))
+        if end_epoch is not None:
+            hi = int(np.searchsorted(data["epoch"], end_epoch, side="right"))
+        return data[lo:hi]
+
+    def range(self, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Rows in the window as dictionaries shaped like latest()."""
+        return [_record_to_dict(*rec) for rec in self.records(start_epoch, end_epoch).tolist()]
+
+    def median_series(self, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None):
+        """Return (epochs, medians) for samples that have a median price."""
+        rows = self.records(start_epoch, end_epoch)
+        mask = ~np.isnan(rows["median"])
+        return rows["epoch"][mask].astype(np.float64), rows["median"][mask]
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Return the most recent logged row as a dictionary or None if empty."""
+        count = len(self)
+        if count == 0:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(HEADER.size + (count - 1) * RECORD.size)
+            return _record_to_dict(*RECORD.unpack(f.read(RECORD.size)))
+
+def convert_csv(csv_path: str, bin_path: str) -> int:
+    """Convert one CSV price log into a binary log; returns the record count.
+
+    Rows are sorted by epoch and written to a temporary file that atomically
+    replaces `bin_path`, so an interrupted conversion leaves no partial log.
+    """
+    rows = []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                epoch = round(float(row["epoch_s"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            rows.append((
+                epoch,
+                to_float(row.get("median_price")),
+                to_float(row.get("lowest_price")),
+                parse_volume(row.get("volume")),
+            ))
+    rows.sort(key=lambda r: r[0])
+
+    tmp_path = bin_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, RECORD.size, 0))
+        for row in rows:
+            f.write(_pack(*row))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, bin_path)
+    return len(rows)
+
+def main(argv=None):
+    from .config import DATA_DIR
+
+    parser = argparse.ArgumentParser(description="Convert CSV price logs to the binary format")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory holding the {slug}.csv logs")
+    parser.add_argument("--force", action="store_true", help="overwrite existing .bin files")
+    args = parser.parse_args(argv)
+
+    for csv_path in sorted(glob.glob(os.path.join(args.data_dir, "*.csv"))):
+        bin_path = os.path.splitext(csv_path)[0] + ".bin"
+        if os.path.exists(bin_path) and not args.force:
+            print("skip (exists):", bin_path)
+            continue
+        count = convert_csv(csv_path, bin_path)
+        print(f"{os.path.basename(csv_path)} -> {os.path.basename(bin_path)}: {count} records")
+
+if __name__ == "__main__":
+    main()
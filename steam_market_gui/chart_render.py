@@ -0,0 +1,321 @@
+import threading
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Tuple, Dict
+
+import numpy as np
+from PIL import Image
+
+import matplotlib
+matplotlib.use("Agg")  # render offscreen, then show as image in Tk
+import matplotlib.dates as mdates
+import matplotlib.style
+from matplotlib import ticker
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Matplotlib date number of the Unix epoch, to convert epoch seconds without datetimes
+_EPOCH_DATENUM = mdates.date2num(datetime(1970, 1, 1, tzinfo=timezone.utc))
+
+# indicator overlays; the band is the rolling standard deviation around the SMA
+OVERLAY_COLORS = {"sma": "#ffd166", "ema": "#c792ea", "vwap": "#7ee787", "band": "#ffd166"}
+
+class HoverPoints:
+    """Pixel positions of the plotted samples, sorted by x.
+
+    `nearest` binary-searches the x column and only inspects neighbours
+    within the hit radius, so lookups stay cheap however dense the chart is.
+    """
+
+    def __init__(self, xs=(), ys=(), prices=()):
+        self.xs = np.asarray(xs, dtype=np.float64)
+        self.ys = np.asarray(ys, dtype=np.float64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def nearest(self, x: float, y: float, radius: float = 8.0) -> Optional[Tuple[float, float, str]]:
+        xs = self.xs
+        n = len(xs)
+        if n == 0:
+            return None
+        lo = int(np.searchsorted(xs, x - radius, side="left"))
+        hi = int(np.searchsorted(xs, x + radius, side="right"))
+        if lo >= hi:
+            return None
+        dx = xs[lo:hi] - x
+        dy = self.ys[lo:hi] - y
+        dist_sq = dx * dx + dy * dy
+        best = int(np.argmin(dist_sq))
+        if dist_sq[best] > radius * radius:
+            return None
+        i = lo + best
+        return xs[i], self.ys[i], f"${self.prices[i]:,.2f}"
+
+class ChartRenderer:
+    """Long-lived Matplotlib figure for one tracker's price chart.
+
+    The figure, axes, locators and line artists are created once; `render`
+    only swaps the artists' data, redraws the Agg canvas and wraps its RGBA
+    buffer in a PIL image without a PNG encode/decode round-trip. Given
+    open/high/low/close columns it draws candlesticks instead of the line,
+    and given `overlays` (see indicators.chart_overlays) the indicator lines
+    and band on top.
+    """
+
+    def __init__(
+        self,
+        figsize=(3.4, 1.75),
+        dpi: int = 135,
+        line_color: str = "#58b4ff",
+        fill_color: str = "#0f2f5c",
+        background: str = "#050b18",
+        axes_background: str = "#0b1a34",
+        up_color: Optional[str] = None,
+        down_color: str = "#ff6f91",
+    ):
+        self.fill_color = fill_color
+        self.up_color = up_color or line_color
+        self.down_color = down_color
+        self._body_colors = np.array([to_rgba(self.down_color), to_rgba(self.up_color)])
+        self._lock = threading.Lock()
+
+        with matplotlib.style.context("dark_background"):
+            self.fig = Figure(figsize=figsize, dpi=dpi)
+            self.canvas = FigureCanvasAgg(self.fig)
+            ax = self.ax = self.fig.add_subplot()
+            self.fig.patch.set_facecolor(background)
+            ax.set_facecolor(axes_background)
+
+            self.glow_lines = [
+                ax.plot([], [], color=line_color, linewidth=glow_width, alpha=alpha, solid_capstyle="round")[0]
+                for glow_width, alpha in ((9, 0.08), (6, 0.12), (4, 0.18))
+            ]
+            self.line = ax.plot(
+                [],
+                [],
+                color=line_color,
+                linewidth=2.6,
+                marker="o",
+                markersize=4,
+                markerfacecolor=background,
+                markeredgecolor=line_color,
+            )[0]
+            self.fill = None
+            self.wicks = ax.plot([], [], color="#7f9bff", linewidth=1.0)[0]
+            # one collection for all candle bodies, updated in place (a bar patch each is far slower)
+            self.bodies = PolyCollection([], linewidths=0, zorder=3)
+            ax.add_collection(self.bodies, autolim=False)
+            self.overlay_lines = {
+                name: ax.plot([], [], color=OVERLAY_COLORS[name], linewidth=1.1, linestyle=style, label=label, zorder=4)[0]
+                for name, label, style in (("sma", "SMA", "-"), ("ema", "EMA", "-"), ("vwap", "VWAP", "--"))
+            }
+            self.band = None
+            self.legend = ax.legend(
+                handles=list(self.overlay_lines.values()),
+                loc="upper left",
+                fontsize=6,
+                ncol=3,
+                frameon=False,
+                labelcolor="#a9c2ff",
+                handlelength=1.2,
+                borderaxespad=0.2,
+            )
+            self.legend.set_visible(False)
+
+            self.title = ax.set_title(
+                "",
+                color="#94b7ff",
+                fontsize=11,
+                pad=16,
+                fontweight="bold",
+            )
+
+            ax.xaxis_date()
+            locator = mdates.AutoDateLocator(minticks=3, maxticks=6)
+            ax.xaxis.set_major_locator(locator)
+            ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+            ax.tick_params(colors="#7f9bff", labelsize=8)
+            ax.xaxis.set_tick_params(rotation=0, labelcolor="#a9c2ff")
+
+            ax.yaxis.set_major_locator(ticker.MaxNLocator(nbins=6))
+            ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda val, _: f"${val:,.2f}"))
+            ax.yaxis.label.set_color("#94b7ff")
+            ax.set_ylabel("Median Price", fontsize=9)
+
+            for spine in ax.spines.values():
+                spine.set_color("#1b2b4d")
+
+            ax.grid(which="major", color="#1b2b4d", linestyle="-", linewidth=0.8, alpha=0.8)
+            ax.margins(y=0.1)
+            ax.set_xlabel("Date", color="#d4defc", fontsize=9)
+
+    def render(
+        self,
+        times: Sequence,
+        prices: Sequence[float],
+        title: str,
+        range_start,
+        range_end,
+        markers: bool = True,
+        ohlc: Optional[Tuple[Sequence[float], ...]] = None,
+        bar_seconds: float = 3600,
+        overlays: Optional[dict] = None,
+    ):
+        """Draw the series and return (PIL RGBA image, HoverPoints).
+
+        With `ohlc` = (opens, highs, lows, closes) aligned with `times`, one
+        candle of `bar_seconds` width is drawn per entry; `prices` should
+        then hold the closes, which the hover points report. `overlays` maps
+        "sma", "ema" and "vwap" to values aligned with `times`, and "band"
+        to a (lower, upper) pair; NaN values leave gaps.
+
+        The image is a copy taken under the renderer lock, so a render on
+        another thread cannot change it.
+        """
+        return self._draw(
+            mdates.date2num(times),
+            prices,
+            title,
+            mdates.date2num(range_start),
+            mdates.date2num(range_end),
+            markers,
+            ohlc,
+            bar_seconds,
+            overlays,
+        )
+
+    def render_epochs(
+        self,
+        epochs,
+        prices,
+        title: str,
+        start_epoch: float,
+        end_epoch: float,
+        markers: bool = True,
+        ohlc: Optional[Tuple[Sequence[float], ...]] = None,
+        bar_seconds: float = 3600,
+        overlays: Optional[dict] = None,
+    ):
+        'Like `render`, with times given as Unix epoch seconds.'
+        to_datenum = lambda t: np.asarray(t, dtype=np.float64) / 86400.0 + _EPOCH_DATENUM
+        return self._draw(
+            to_datenum(epochs), prices, title, to_datenum(start_epoch), to_datenum(end_epoch), markers, ohlc, bar_seconds, overlays
+        )
+
+    def _draw(self, x, prices, title: str, xmin: float, xmax: float, markers: bool, ohlc=None, bar_seconds: float = 3600, overlays=None):
+        with self._lock:
+            ax = self.ax
+            x = np.asarray(x, dtype=np.float64)
+            y = np.asarray(prices, dtype=np.float64)
+            candles = ohlc is not None
+
+            line_x, line_y = (x[:0], y[:0]) if candles else (x, y)
+            for line in self.glow_lines:
+                line.set_data(line_x, line_y)
+            self.line.set_data(line_x, line_y)
+            self.line.set_marker("o" if markers else "None")
+            if candles:
+                opens, highs, lows, closes = (np.asarray(column, dtype=np.float64) for column in ohlc)
+                bar_width = bar_seconds / 86400.0
+                # bucket epochs mark the bucket start; centre each candle in its bucket
+                centers = x + bar_width / 2
+                nan = np.full_like(centers, np.nan)
+                # all wicks in one NaN-separated line, so relim() sees them
+                self.wicks.set_data(
+                    np.column_stack((centers, centers, nan)).ravel(),
+                    np.column_stack((lows, highs, nan)).ravel(),
+                )
+            else:
+                self.wicks.set_data([], [])
+            overlays = overlays or {}
+            overlay_x = centers if candles else x
+            for name, line in self.overlay_lines.items():
+                values = overlays.get(name)
+                if values is None:
+                    line.set_data([], [])
+                else:
+                    line.set_data(overlay_x, np.asarray(values, dtype=np.float64))
+            self.legend.set_visible(any(name in overlays for name in self.overlay_lines))
+            ax.relim()
+
+            # the fill polygon cannot be updated in place on every Matplotlib version
+            if self.fill is not None:
+                self.fill.remove()
+                self.fill = None
+            if self.band is not None:
+                self.band.remove()
+                self.band = None
+            if overlays.get("band") is not None and len(overlay_x) > 1:
+                lower, upper = overlays["band"]
+                self.band = ax.fill_between(
+                    overlay_x, lower, upper, color=OVERLAY_COLORS["band"], alpha=0.12, linewidth=0, zorder=1
+                )
+            if candles:
+                self._draw_bodies(centers, opens, highs, lows, closes, bar_width)
+            else:
+                self.bodies.set_verts([])
+                if len(y) > 1:
+                    self.fill = ax.fill_between(x, y, color=self.fill_color, alpha=0.22)
+
+            self.title.set_text(title)
+            ax.autoscale_view(scalex=False)
+            ax.set_xlim(xmin, xmax)
+
+            self.canvas.draw()
+            width, height = self.canvas.get_width_height()
+            pixel_points = HoverPoints()
+            if len(y):
+                hover_x = centers if candles else x
+                display_points = ax.transData.transform(np.column_stack((hover_x, y)))
+                # x is time-ordered, so the pixel x column is already sorted
+                pixel_points = HoverPoints(display_points[:, 0], height - display_points[:, 1], y)
+
+            # copied before the lock is released; the next render draws into the same buffer
+            image = Image.frombuffer("RGBA", (width, height), self.canvas.buffer_rgba(), "raw", "RGBA", 0, 1).copy()
+            return image, pixel_points
+
+    def _draw_bodies(self, centers, opens, highs, lows, closes, bar_width: float):
+        rising = closes >= opens
+        bottoms = np.minimum(opens, closes)
+        # keep flat candles visible as a thin line
+        min_height = (np.nanmax(highs) - np.nanmin(lows)) * 0.004 if len(highs) else 0.0
+        tops = bottoms + np.maximum(np.abs(closes - opens), min_height)
+        left = centers - bar_width * 0.35
+        right = centers + bar_width * 0.35
+        # (n, 4, 2) rectangle corners
+        self.bodies.set_verts(np.stack((
+            np.column_stack((left, bottoms)),
+            np.column_stack((left, tops)),
+            np.column_stack((right, tops)),
+            np.column_stack((right, bottoms)),
+        ), axis=1))
+        self.bodies.set_facecolor(self._body_colors[rising.astype(int)])
+
+# one renderer per style in each pool process, kept across tasks
+_worker_renderers: Dict[tuple, ChartRenderer] = {}
+
+def render_to_buffer(
+    style: dict,
+    epochs,
+    prices,
+    title: str,
+    start_epoch: float,
+    end_epoch: float,
+    markers: bool = True,
+    ohlc=None,
+    bar_seconds: float = 3600,
+    overlays=None,
+):
+    """Process-pool entry point: render a chart and return it as plain picklable data.
+
+    Returns ((width, height), RGBA bytes, hover xs, hover ys, hover prices).
+    """
+    key = tuple(sorted(style.items()))
+    renderer = _worker_renderers.get(key)
+    if renderer is None:
+        renderer = _worker_renderers[key] = ChartRenderer(**style)
+    image, points = renderer.render_epochs(epochs, prices, title, start_epoch, end_epoch, markers, ohlc, bar_seconds, overlays)
+    return image.size, image.tobytes(), points.xs, points.ys, points.prices
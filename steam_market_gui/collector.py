@@ -0,0 +1,150 @@
+"""Headless price collector.
+
+Polls every item in a watchlist file concurrently and logs each snapshot
+through the configured price logger into DATA_DIR, so the GUI (started with --attach) can
+display the same files without fetching anything itself.
+
+    python -m steam_market_gui.collector --watchlist watchlist.txt
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+from typing import Optional
+
+from .config import APPID, CURRENCY, REFRESH_SECONDS, DATA_DIR, STORAGE_BACKEND, WATCHLIST_FILE, COLLECTOR_CONCURRENCY, METRICS_PORT, ALERTS_FILE
+from . import alerts
+from .data_logger import open_logger
+from .metrics import ITEM_STALENESS, serve as serve_metrics
+from .profiling import from_config as profiler_from_config
+from .steam_api_async import AsyncSteamMarketClient
+from .utils import load_watchlist, slugify, parse_price_to_float
+
+class Collector:
+    def __init__(
+        self,
+        names,
+        client: AsyncSteamMarketClient,
+        data_dir: str = DATA_DIR,
+        backend: str = STORAGE_BACKEND,
+        search_query: Optional[str] = None,
+        profiler=None,
+    ):
+        self.client = client
+        self.search_query = search_query
+        self.profiler = profiler
+        self.loggers = {
+            name: open_logger(data_dir, slugify(name), backend)
+            for name in names
+        }
+        self.slugs = {name: slugify(name) for name in names}
+        # batched backends (SQLite) share one store per database file
+        self.stores = list({id(logger.store): logger.store for logger in self.loggers.values() if hasattr(logger, "store")}.values())
+
+    def log_snapshot(self, name: str, data) -> bool:
+        if not data:
+            return False
+        median = parse_price_to_float(data.get("median_price"))
+        lowest = parse_price_to_float(data.get("lowest_price"))
+        self.loggers[name].append(median, lowest, data.get("volume"))
+        if median is not None:
+            ITEM_STALENESS.mark(self.slugs[name])
+        alerts.observe(self.slugs[name], median, lowest)
+        return True
+
+    async def poll_item(self, name: str) -> bool:
+        return self.log_snapshot(name, await self.client.price_overview(name))
+
+    async def poll_bulk(self):
+        # one search page covers up to 100 items; price_overview fills the gaps
+        prices = await self.client.bulk_prices(self.loggers, query=self.search_query)
+        return [self.log_snapshot(name, prices.get(name)) for name in self.loggers]
+
+    async def run_cycle(self):
+        started = time.monotonic()
+        if self.search_query is not None:
+            try:
+                results = await self.poll_bulk()
+            except Exception as e:
+                results = [e] * len(self.loggers)
+        else:
+            results = await asyncio.gather(
+                *(self.poll_item(name) for name in self.loggers),
+                return_exceptions=True,
+            )
+        # batched backends commit the whole cycle as one transaction
+        for store in self.stores:
+            await asyncio.to_thread(store.flush)
+        ok = 0
+        for name, result in zip(self.loggers, results):
+            if isinstance(result, Exception):
+                print("Collect error:", name, result, file=sys.stderr)
+            elif result:
+                ok += 1
+        elapsed = time.monotonic() - started
+        stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{stamp}] collected {ok}/{len(self.loggers)} items in {elapsed:.1f}s")
+        blocked_for = self.client.rate_budget()["blocked_for"]
+        if blocked_for > 0:
+            print(f"Steam asked to back off; requests paused for {blocked_for:.0f}s", file=sys.stderr)
+
+    async def run(self, interval: float, once: bool = False):
+        async with self.client:
+            while True:
+                started = time.monotonic()
+                if self.profiler is not None:
+                    with self.profiler.cycle("collector"):
+                        await self.run_cycle()
+                else:
+                    await self.run_cycle()
+                if once:
+                    return
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Steam Market price collector")
+    parser.add_argument("--watchlist", default=WATCHLIST_FILE, help="file with one listing URL or market hash name per line")
+    parser.add_argument("--interval", type=float, default=REFRESH_SECONDS, help="seconds between polling cycles")
+    parser.add_argument("--concurrency", type=int, default=COLLECTOR_CONCURRENCY, help="maximum requests in flight")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory the price logs are written to")
+    parser.add_argument("--backend", default=STORAGE_BACKEND, choices=("csv", "binary", "sqlite"), help="price log storage format")
+    parser.add_argument(
+        "--search-query",
+        default=None,
+        help="fetch prices in bulk from market search results for this query (e.g. a skin family); "
+        "items it misses fall back to one request each",
+    )
+    parser.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT, help="serve Prometheus metrics on 127.0.0.1:PORT (0: off)")
+    parser.add_argument("--alerts", default=ALERTS_FILE, help="JSON file with alert rules and sinks (default: ALERTS_FILE)")
+    parser.add_argument("--profile-every", type=int, default=None, metavar="N", help="profile every N-th cycle into PROFILE_DIR (default: PROFILE_EVERY)")
+    args = parser.parse_args(argv)
+
+    try:
+        names = load_watchlist(args.watchlist)
+    except OSError as e:
+        parser.error(f"cannot read watchlist: {e}")
+    if not names:
+        parser.error(f"watchlist {args.watchlist} is empty")
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+    alerts.configure(args.alerts)
+    client = AsyncSteamMarketClient(appid=APPID, currency=CURRENCY, concurrency=args.concurrency)
+    collector = Collector(
+        names,
+        client,
+        data_dir=args.data_dir,
+        backend=args.backend,
+        search_query=args.search_query,
+        profiler=profiler_from_config(args.profile_every),
+    )
+    print(f"Collecting {len(names)} items every {args.interval:g}s (concurrency={args.concurrency})")
+    try:
+        asyncio.run(collector.run(args.interval, once=args.once))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Deduplication, retention and archiving for CSV price logs.
+
+    python -m steam_market_gui.compaction --retention-days 30
+
+For every `{slug}.csv` in the data directory:
+
+- rows are put in time order, samples logged twice within the same second
+  collapse to one (preferring the one with a price), and every run of failed
+  fetches (neither median nor lowest price) shrinks to its first row, which
+  stays behind as a gap marker;
+- the hourly and daily rollups are rebuilt from the cleaned rows;
+- rows older than the retention window (cut at a UTC midnight) move into gzip
+  segments `archive/{slug}/{YYYY-MM}.csv.gz`, so the rollups are the only hot
+  copy of that history.
+
+Every file is written under a temporary name and renamed over the original,
+and segments are merged by epoch, so an interrupted run leaves either the old
+or the new version of each file and can simply be repeated. Rows appended by
+a running GUI or collector while a log is compacted are carried over, also
+those that land in the old file just after it is renamed over.
+"""
+import argparse
+import csv
+import glob
+import gzip
+import io
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from .config import DATA_DIR, COMPACT_RETENTION_DAYS
+from .data_logger import FIELDNAMES
+from .rollups import ROLLUP_RESOLUTIONS, RollupSeries
+from .utils import parse_volume, to_float
+
+DAY_SECONDS = 86400
+LATE_ROW_WAITS = 10  # 50 ms each, for a row appended mid-rename
+
+Row = Tuple[float, List[str]]  # (epoch, csv fields)
+
+@dataclass
+class CompactionStats:
+    rows: int = 0
+    kept: int = 0
+    failed: int = 0
+    duplicates: int = 0
+    archived: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.failed or self.duplicates or self.archived)
+
+def _has_price(row: List[str]) -> bool:
+    return to_float(row[2]) is not None or to_float(row[3]) is not None
+
+def _parse_rows(data: bytes) -> List[Row]:
+    rows = []
+    for row in csv.reader(io.StringIO(data.decode("utf-8", errors="replace"), newline="")):
+        if len(row) < len(FIELDNAMES) or row == FIELDNAMES:
+            continue
+        epoch = to_float(row[1])
+        if epoch is None:
+            continue
+        rows.append((epoch, row[:len(FIELDNAMES)]))
+    return rows
+
+def _format_rows(rows: List[Row], header: bool = True) -> bytes:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    if header:
+        w.writerow(FIELDNAMES)
+    w.writerows(row for _, row in rows)
+    return buf.getvalue().encode("utf-8")
+
+def collapse(rows: List[Row]) -> Tuple[List[Row], int, int]:
+    """Sort rows and collapse duplicates and failed runs.
+
+    Returns (rows, failed rows dropped, duplicate rows dropped).
+    """
+    out: List[Row] = []
+    failed = duplicates = 0
+    for epoch, row in sorted(rows, key=lambda item: item[0]):
+        priced = _has_price(row)
+        if out and int(epoch) == int(out[-1][0]):
+            if priced and not _has_price(out[-1][1]):
+                out[-1] = (epoch, row)
+            duplicates += 1
+        elif not priced and out and not _has_price(out[-1][1]):
+            failed += 1
+        else:
+            out.append((epoch, row))
+    return out, failed, duplicates
+
+def _write_atomic(path: str, data: bytes, compress: bool = False):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as raw:
+        if compress:
+            with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+                f.write(data)
+        else:
+            raw.write(data)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _read_rows_from(f, offset: int, wait: bool = False) -> bytes:
+    """Complete rows from `offset` to the end of `f`.
+
+    With `wait`, an append that opened the file but has not written yet, or a
+    row still being written, is given a moment to finish first.
+    """
+    for _ in range(LATE_ROW_WAITS if wait else 1):
+        if wait:
+            time.sleep(0.05)
+        f.seek(offset)
+        data = f.read()
+        if data.endswith(b"\n") or not data:
+            return data
+    return data[:data.rfind(b"\n") + 1]
+
+def archive_rows(archive_dir: str, slug: str, rows: List[Row]):
+    """Merge rows into the monthly gzip segments of an item."""
+    months = {}
+    for epoch, row in rows:
+        month = datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m")
+        months.setdefault(month, []).append((epoch, row))
+    directory = os.path.join(archive_dir, slug)
+    os.makedirs(directory, exist_ok=True)
+    for month, month_rows in sorted(months.items()):
+        path = os.path.join(directory, f"{month}.csv.gz")
+        if os.path.exists(path):
+            with gzip.open(path, "rb") as f:
+                # existing rows first, so a repeated run keeps what is already archived
+                month_rows = _parse_rows(f.read()) + month_rows
+        merged, _, _ = collapse(month_rows)
+        _write_atomic(path, _format_rows(merged), compress=True)
+
+def _rollup_samples(rows: List[Row]):
+    return [
+        (epoch, median, parse_volume(row[4]))
+        for epoch, row in rows
+        if (median := to_float(row[2])) is not None
+    ]
+
+def compact_log(
+    path: str,
+    retention_days: int = COMPACT_RETENTION_DAYS,
+    archive_dir: Optional[str] = None,
+    now: Optional[float] = None,
+    dry_run: bool = False,
+) -> CompactionStats:
+    """Compact one `{slug}.csv` log in place; see the module docstring."""
+    slug = os.path.splitext(os.path.basename(path))[0]
+    if archive_dir is None:
+        archive_dir = os.path.join(os.path.dirname(path), "archive")
+    with open(path, "rb") as f:
+        data = f.read()
+    # leave a row that is still being written to the tail copy below
+    read_to = data.rfind(b"\n") + 1
+    rows, failed, duplicates = collapse(_parse_rows(data[:read_to]))
+
+    old: List[Row] = []
+    if retention_days > 0:
+        now = time.time() if now is None else now
+        cutoff = (int(now) // DAY_SECONDS) * DAY_SECONDS - retention_days * DAY_SECONDS
+        old = [item for item in rows if item[0] < cutoff]
+        rows = rows[len(old):]
+    stats = CompactionStats(
+        rows=len(rows) + len(old) + failed + duplicates,
+        kept=len(rows),
+        failed=failed,
+        duplicates=duplicates,
+        archived=len(old),
+    )
+    if dry_run or not stats.changed:
+        return stats
+
+    # rollups first: they must hold the archived history before it leaves the hot file
+    samples = _rollup_samples(old + rows)
+    rollups = [RollupSeries(f"{path}.{name}", seconds) for name, seconds in ROLLUP_RESOLUTIONS.items()]
+    for rollup in rollups:
+        rollup.rebuild(samples)
+    if old:
+        archive_rows(archive_dir, slug, old)
+
+    # the index holds byte offsets into the old file; drop it on both sides of
+    # the rename so no reader pairs it with the new one
+    index_path = path + ".idx"
+    _remove(index_path)
+    compacted = _format_rows(rows)
+    with open(path, "rb") as f:
+        # keep the old file open: rows appended to it after the tail is copied,
+        # up to and just past the rename, are read back from it below
+        tail = _read_rows_from(f, read_to)
+        _write_atomic(path, compacted + tail)
+        _remove(index_path)
+        late = _read_rows_from(f, read_to + len(tail), wait=True)
+    if late:
+        with open(path, "ab") as f:
+            f.write(late)
+        tail += late
+
+    for epoch, row in _parse_rows(tail):
+        median = to_float(row[2])
+        if median is not None:
+            for rollup in rollups:
+                rollup.update(epoch, median, parse_volume(row[4]))
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deduplicate, trim and archive CSV price logs")
+    parser.add_argument("slugs", nargs="*", help="only compact these items (log file names without .csv); default: every log")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory holding the {slug}.csv logs")
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=COMPACT_RETENTION_DAYS,
+        help="keep raw rows this many days, archive older ones and keep only their rollups (0: keep everything)",
+    )
+    parser.add_argument("--archive-dir", default=None, help="where gzip segments go (default: DATA_DIR/archive)")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args(argv)
+
+    if args.slugs:
+        paths = [os.path.join(args.data_dir, f"{slug}.csv") for slug in args.slugs]
+    else:
+        paths = sorted(glob.glob(os.path.join(args.data_dir, "*.csv")))
+    archive_dir = args.archive_dir or os.path.join(args.data_dir, "archive")
+    for path in paths:
+        try:
+            stats = compact_log(path, args.retention_days, archive_dir, dry_run=args.dry_run)
+        except OSError as e:
+            print(f"{os.path.basename(path)}: compaction failed:", e, file=sys.stderr)
+            continue
+        print(
+            f"{os.path.basename(path)}: {stats.rows} rows -> {stats.kept} "
+            f"({stats.failed} failed and {stats.duplicates} duplicate collapsed, {stats.archived} archived)"
+        )
+
+if __name__ == "__main__":
+    main()
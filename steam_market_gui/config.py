@@ -0,0 +1,53 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+APPID = 730
+CURRENCY = int(os.getenv("CURRENCY", "1"))
+REFRESH_SECONDS = int(os.getenv("REFRESH_SECONDS", "300"))
+REFRESH_WORKERS = int(os.getenv("REFRESH_WORKERS", "4"))
+
+ASSETS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets"))
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+# "csv" (default), "binary" (fixed-width records read through numpy.memmap)
+# or "sqlite" (one WAL database for all items in DATA_DIR/prices.sqlite3)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "csv").strip().lower()
+
+# Conditional-request cache for listing pages and item images
+HTTP_CACHE_DIR = os.path.join(ASSETS_DIR, ".cache", "http")
+
+# Chart downsampling for dense histories: "lttb" or "minmax"
+CHART_DOWNSAMPLE = os.getenv("CHART_DOWNSAMPLE", "lttb").strip().lower()
+# "thread" renders charts on the refresh workers; "process" uses a pool of
+# CHART_RENDER_PROCESSES processes (default: one per CPU)
+CHART_RENDER_MODE = os.getenv("CHART_RENDER_MODE", "thread").strip().lower()
+CHART_RENDER_PROCESSES = int(os.getenv("CHART_RENDER_PROCESSES", "0")) or os.cpu_count() or 1
+
+# Indicator overlays (Indicators button, on at start with CHART_INDICATORS=1); windows
+# count samples: SMA and the standard deviation band over INDICATOR_WINDOW, EMA with
+# span INDICATOR_EMA_SPAN, volume-weighted average over INDICATOR_VWAP_WINDOW
+CHART_INDICATORS = os.getenv("CHART_INDICATORS", "0").strip().lower() in ("1", "true", "yes", "on")
+INDICATOR_WINDOW = int(os.getenv("INDICATOR_WINDOW", "48"))
+INDICATOR_EMA_SPAN = int(os.getenv("INDICATOR_EMA_SPAN", "48"))
+INDICATOR_VWAP_WINDOW = int(os.getenv("INDICATOR_VWAP_WINDOW", "288"))
+
+# Headless collector
+WATCHLIST_FILE = os.getenv("WATCHLIST_FILE", os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "watchlist.txt")))
+COLLECTOR_CONCURRENCY = int(os.getenv("COLLECTOR_CONCURRENCY", "8"))
+
+# Compaction (python -m steam_market_gui.compaction): days of raw rows kept in
+# the hot logs before they are archived and only their rollups stay (0 keeps everything)
+COMPACT_RETENTION_DAYS = int(os.getenv("COMPACT_RETENTION_DAYS", "30"))
+
+# Prometheus text metrics on http://127.0.0.1:METRICS_PORT/metrics (0 disables the endpoint)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Alert rules and sinks (JSON, see alerts.example.json); alerts are off if the file does not exist
+ALERTS_FILE = os.getenv("ALERTS_FILE", os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "alerts.json")))
+
+# Opt-in profiling: every PROFILE_EVERY-th refresh cycle runs under cProfile and
+# tracemalloc; the newest PROFILE_KEEP samples are kept in PROFILE_DIR (0 disables)
+PROFILE_EVERY = int(os.getenv("PROFILE_EVERY", "0"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(ASSETS_DIR, ".cache", "profiles"))
@@ -1,69 +1,516 @@
-import csv, os, time
-from collections import deque
+import csv, io, os, threading, time
+from array import array
+from bisect import bisect_right
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+from .rollups import ROLLUP_RESOLUTIONS, RollupSeries
+from .utils import parse_volume, to_float
+
+FIELDNAMES = ["timestamp_iso", "epoch_s", "median_price", "lowest_price", "volume"]
+
+# Granularity of the sparse on-disk index: one entry per hour of samples.
+INDEX_BUCKET_SECONDS = 3600
+
+def _to_volume(value: str) -> float:
+    # logged volumes are digits with thousands separators ("1,204"); parse_volume handles the rest
+    try:
+        return float(value.replace(",", "")) if value else 0.0
+    except ValueError:
+        return float(parse_volume(value) or 0)
+
+def _parse_ts(value: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+        if dt.tzinfo is None:
+            return dt.replace(tzinfo=timezone.utc)
+        return dt
+    except ValueError:
+        return None
+
+def _normalize_row(row: Dict[str, str]) -> Dict[str, Any]:
+    # Normalise numeric fields and timestamp for easier reuse
+    return {
+        "timestamp_iso": row.get("timestamp_iso", ""),
+        "timestamp": _parse_ts(row.get("timestamp_iso", "")),
+        "epoch_s": to_float(row.get("epoch_s", "")),
+        "median_price": to_float(row.get("median_price", "")),
+        "lowest_price": to_float(row.get("lowest_price", "")),
+        "volume": row.get("volume", ""),
+    }
 
 class PriceLogger:
-    def __init__(self, path: str):
+    """CSV price log with a sparse time index.
+
+    Next to `{slug}.csv` sits `{slug}.csv.idx`, which records the byte offset
+    of the first row of every INDEX_BUCKET_SECONDS bucket. `append` extends it
+    when a new bucket starts, `range` uses it to read only the byte span that
+    covers the requested window, and `latest` seeks from the end of the file.
+
+    Hourly and daily OHLC rollups (`{slug}.csv.1h`, `{slug}.csv.1d`) are
+    updated on every append and rebuilt from the raw rows if missing or behind.
+
+    With `read_only` (the attached GUI, exports) no file is ever created,
+    rewritten or truncated: a missing or stale index is rebuilt in memory
+    only, rollups are read as they are, and an incomplete trailing row is
+    skipped, since the writer may be in the middle of it.
+    """
+
+    def __init__(self, path: str, bucket_seconds: int = INDEX_BUCKET_SECONDS, read_only: bool = False):
         self.path = path
-        os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        if not os.path.exists(self.path):
-            with open(self.path, "w", newline="", encoding="utf-8") as f:
-                w = csv.writer(f)
-                w.writerow(["timestamp_iso", "epoch_s", "median_price", "lowest_price", "volume"])
+        self.index_path = path + ".idx"
+        self.bucket_seconds = bucket_seconds
+        self.read_only = read_only
+        if not read_only:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if not os.path.exists(self.path):
+                with open(self.path, "w", newline="", encoding="utf-8") as f:
+                    w = csv.writer(f)
+                    w.writerow(FIELDNAMES)
+        # the index is extended by append and read by render workers
+        self._index_lock = threading.Lock()
+        self._buckets: List[int] = []
+        self._offsets: List[int] = []
+        self._index_read = 0    # bytes of the .idx file already loaded; None if not followed
+        self._scanned_to = 0    # data offset up to which buckets are known
+        self._data_start = 0    # offset of the first row after the header
+        self._load_index()
+        self.rollups = {
+            name: RollupSeries(f"{path}.{name}", seconds, read_only)
+            for name, seconds in ROLLUP_RESOLUTIONS.items()
+        }
+        self._rollups_lock = threading.Lock()
+        self._rollups_checked = False
+
+    # -- index maintenance -------------------------------------------------
+
+    def _reset_index(self):
+        self._buckets = []
+        self._offsets = []
+        self._index_read = 0
+        try:
+            with open(self.path, "rb") as f:
+                f.readline()
+                self._data_start = f.tell()
+                self._inode = os.fstat(f.fileno()).st_ino
+        except FileNotFoundError:
+            # a reader may start before the writer created the log
+            self._data_start = 0
+            self._inode = None
+        self._scanned_to = self._data_start
+
+    def _load_index(self):
+        self._reset_index()
+        if not os.path.exists(self.index_path):
+            self._rebuild_index()
+            return
+        with open(self.index_path, "rb") as f:
+            header = f.readline()
+            if header.strip() != f"bucket_seconds={self.bucket_seconds}".encode():
+                self._rebuild_index()
+                return
+            self._index_read = f.tell()
+        self._read_index_tail()
+        if self._offsets and (self._inode is None or self._offsets[-1] >= os.path.getsize(self.path)):
+            # the log was truncated or rewritten underneath the index
+            self._rebuild_index()
+            return
+        # rows logged after the last entry, such as an append in the same hour
+        self._scan_tail()
+
+    def _read_index_tail(self):
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_read)
+            chunk = f.read()
+        # only consume complete lines; a concurrent writer may be mid-line
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                bucket, offset = (int(part) for part in line.split(b","))
+            except ValueError:
+                continue
+            if not self._buckets or bucket > self._buckets[-1]:
+                self._buckets.append(bucket)
+                self._offsets.append(offset)
+                self._scanned_to = max(self._scanned_to, offset)
+        self._index_read += end
+
+    def _rebuild_index(self):
+        self._reset_index()
+        if self.read_only:
+            # indexed in memory only; repairing the .idx file is the writer's job
+            self._index_read = None
+            self._scan_tail()
+            return
+        with open(self.index_path, "wb") as f:
+            f.write(f"bucket_seconds={self.bucket_seconds}\n".encode())
+        self._index_read = os.path.getsize(self.index_path)
+        new_entries = self._scan_tail()
+        self._write_index_entries(new_entries)
+
+    def _scan_tail(self):
+        """Index rows appended (possibly by another process) since the last scan."""
+        new_entries = []
+        offset = self._scanned_to
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    epoch = self._line_epoch(line)
+                    if epoch is not None:
+                        bucket = int(epoch // self.bucket_seconds)
+                        if not self._buckets or bucket > self._buckets[-1]:
+                            self._buckets.append(bucket)
+                            self._offsets.append(offset)
+                            new_entries.append((bucket, offset))
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        self._scanned_to = offset
+        return new_entries
+
+    def _write_index_entries(self, entries):
+        if not entries:
+            return
+        with open(self.index_path, "ab") as f:
+            f.write("".join(f"{b},{o}\n" for b, o in entries).encode())
+            self._index_read = f.tell()
+
+    def _sync_index(self):
+        try:
+            st = os.stat(self.path)
+            data_size = st.st_size
+            # a reader that indexed in memory keeps doing so
+            idx_size = os.path.getsize(self.index_path) if self._index_read is not None else None
+        except OSError:
+            self._load_index()
+            return
+        if st.st_ino != self._inode or data_size < self._scanned_to or (idx_size is not None and idx_size < self._index_read):
+            # rewritten by compaction (new inode) or truncated
+            self._load_index()
+            return
+        if idx_size is not None and idx_size > self._index_read:
+            self._read_index_tail()
+        if data_size > self._scanned_to:
+            self._scan_tail()
+
+    @staticmethod
+    def _line_epoch(line: bytes) -> Optional[float]:
+        parts = line.split(b",", 2)
+        if len(parts) < 2:
+            return None
+        try:
+            return float(parts[1])
+        except ValueError:
+            return None
+
+    def _ensure_rollups(self):
+        # checked once per logger, on first use rather than at construction
+        if self.read_only:
+            return
+        with self._rollups_lock:
+            if self._rollups_checked:
+                return
+            self._rollups_checked = True
+            last = self.latest()
+            if not last or last.get("epoch_s") is None:
+                return
+            if last.get("median_price") is None:
+                # a failed fetch carries no price; only fill in rollups that do not exist yet
+                stale = [rollup for rollup in self.rollups.values() if rollup.last_bucket() is None]
+            else:
+                latest_epoch = last["epoch_s"]
+                stale = [
+                    rollup for rollup in self.rollups.values()
+                    if (rollup.last_bucket() or -1) < int(latest_epoch // rollup.seconds) * rollup.seconds
+                ]
+            if not stale:
+                return
+            samples = [
+                (float(row[1]), median, parse_volume(row[4]))
+                for row in self._read_rows(None, None)
+                if (median := to_float(row[2])) is not None
+            ]
+            for rollup in stale:
+                rollup.rebuild(samples)
+
+    # -- public API --------------------------------------------------------
 
     def append(self, median: Optional[float], lowest: Optional[float], volume: Optional[str]):
         """Persist a single price snapshot to disk with an accurate timestamp."""
+        if self.read_only:
+            raise ValueError(f"{self.path} is opened read-only")
         ts = time.time()
         ts_local = datetime.now(timezone.utc).astimezone()
-        with open(self.path, "a", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow([
-                ts_local.isoformat(timespec="seconds"),
-                f"{ts:.0f}",
-                "" if median is None else median,
-                "" if lowest is None else lowest,
-                volume or "",
-            ])
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        w.writerow([
+            ts_local.isoformat(timespec="seconds"),
+            f"{ts:.0f}",
+            "" if median is None else median,
+            "" if lowest is None else lowest,
+            volume or "",
+        ])
+        line = buf.getvalue().encode("utf-8")
+
+        # before the write, so a rebuild does not already include this sample
+        self._ensure_rollups()
+        with self._index_lock:
+            self._sync_index()
+            with open(self.path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(line)
+            bucket = int(round(ts) // self.bucket_seconds)
+            if not self._buckets or bucket > self._buckets[-1]:
+                self._buckets.append(bucket)
+                self._offsets.append(offset)
+                self._write_index_entries([(bucket, offset)])
+            self._scanned_to = offset + len(line)
+
+        if median is not None:
+            for rollup in self.rollups.values():
+                rollup.update(ts, median, parse_volume(volume))
+
+    def _span(self, start_epoch: Optional[float], end_epoch: Optional[float]):
+        """Byte span [start, end) of the log that can hold rows in the window."""
+        with self._index_lock:
+            self._sync_index()
+            start = self._data_start
+            end = self._scanned_to
+            if start_epoch is not None and self._buckets:
+                i = bisect_right(self._buckets, int(start_epoch // self.bucket_seconds)) - 1
+                if i >= 0:
+                    start = self._offsets[i]
+            if end_epoch is not None and self._buckets:
+                i = bisect_right(self._buckets, int(end_epoch // self.bucket_seconds))
+                if i < len(self._offsets):
+                    end = self._offsets[i]
+        return start, end
+
+    def _read_rows(self, start_epoch: Optional[float], end_epoch: Optional[float]):
+        start, end = self._span(start_epoch, end_epoch)
+        if end <= start:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            chunk = f.read(end - start)
+        for row in csv.reader(io.StringIO(chunk.decode("utf-8", errors="replace"), newline="")):
+            if len(row) < len(FIELDNAMES):
+                continue
+            epoch = to_float(row[1])
+            if epoch is None:
+                continue
+            if start_epoch is not None and epoch < start_epoch:
+                continue
+            if end_epoch is not None and epoch > end_epoch:
+                continue
+            yield row
+
+    def chunks(self, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None, size: int = 8 << 20):
+        """Yield the raw CSV rows of the indexed span around the window, about `size` bytes at a time.
+
+        Every chunk ends with a complete row. Rows are not parsed or filtered:
+        the span starts at the index bucket holding `start_epoch`, so callers
+        drop rows outside the window themselves.
+        """
+        start, end = self._span(start_epoch, end_epoch)
+        if end <= start:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            position = start
+            rest = b""
+            while position < end:
+                block = f.read(min(size, end - position))
+                if not block:
+                    break
+                position += len(block)
+                block = rest + block
+                cut = block.rfind(b"\n") + 1
+                rest = block[cut:]
+                if cut:
+                    yield block[:cut]
+
+    def range(self, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return rows with start_epoch <= epoch_s <= end_epoch, reading only the indexed span."""
+        return [_normalize_row(dict(zip(FIELDNAMES, row))) for row in self._read_rows(start_epoch, end_epoch)]
+
+    def median_series(self, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None):
+        """Return (epochs, medians) for logged samples that have a median price."""
+        ts = []
+        med = []
+        for row in self._read_rows(start_epoch, end_epoch):
+            m = to_float(row[2])
+            if m is None:
+                continue
+            ts.append(float(row[1]))
+            med.append(m)
+        return ts, med
+
+    def ohlc_series(self, resolution: str, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None):
+        """Return (bucket epochs, opens, highs, lows, closes, volumes) of the "1h" or "1d" rollup."""
+        self._ensure_rollups()
+        rows = self.rollups[resolution].read(start_epoch, end_epoch)
+        if not rows:
+            return [], [], [], [], [], []
+        return tuple(list(column) for column in zip(*rows))[:6]
+
+    def first_epoch(self) -> Optional[float]:
+        """Oldest epoch covered by the raw rows or, after compaction archived them, the rollups."""
+        with self._index_lock:
+            self._sync_index()
+            first_raw = self._buckets[0] * self.bucket_seconds if self._buckets else None
+        firsts = [rollup.first_bucket() for rollup in self.rollups.values()]
+        firsts.append(first_raw)
+        firsts = [first for first in firsts if first is not None]
+        return float(min(firsts)) if firsts else None
 
     def latest(self) -> Optional[Dict[str, Any]]:
         """Return the most recent logged row as a dictionary or None if empty."""
         if not os.path.exists(self.path):
             return None
 
-        with open(self.path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            rows = deque(reader, maxlen=1)
+        # Read backwards from the end until we hold one complete row.
+        with open(self.path, "rb") as f:
+            pos = f.seek(0, os.SEEK_END)
+            tail = b""
+            while pos > 0:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                tail = f.read(step) + tail
+                lines = tail.rstrip(b"\r\n").split(b"\n")
+                if len(lines) > 1 or pos == 0:
+                    break
+        last = lines[-1].strip(b"\r") if tail else b""
+        if not last:
+            return None
 
-        if not rows:
+        row = next(csv.reader([last.decode("utf-8", errors="replace")]), [])
+        if row == FIELDNAMES:
             return None
+        return _normalize_row(dict(zip(FIELDNAMES, row)))
 
-        row = rows[0]
-        # Normalise numeric fields and timestamp for easier reuse
-        def _to_float(value: str) -> Optional[float]:
-            if not value:
-                return None
-            try:
-                return float(value)
-            except ValueError:
-                return None
+class SeriesCache:
+    """In-memory (datetime, median) series that follows a CSV log as it grows.
 
-        def _parse_ts(value: str) -> Optional[datetime]:
-            if not value:
-                return None
+    `refresh` remembers the byte offset it has read up to and parses only rows
+    appended since, inserting them in time order. If the file shrinks, is
+    replaced (new inode) or its first row changes (compaction/rotation), the
+    series is rebuilt from scratch.
+
+    `epochs`, `medians` and `volumes` hold the same samples as plain float
+    columns for vectorized consumers (see `columns`); `generation` changes
+    whenever rows are replaced or inserted out of order rather than appended.
+    """
+
+    FINGERPRINT_BYTES = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self.points = []  # sorted list of (datetime, median)
+        self.epochs = array("d")
+        self.medians = array("d")
+        self.volumes = array("d")  # 0.0 where the row has no volume
+        self.generation = 0
+        self._offset = 0
+        self._inode = None
+        self._fingerprint = b""
+        self._lock = threading.Lock()
+
+    def _reset(self):
+        self.points = []
+        self.epochs = array("d")
+        self.medians = array("d")
+        self.volumes = array("d")
+        self.generation += 1
+        self._offset = 0
+        self._fingerprint = b""
+
+    def refresh(self) -> list:
+        with self._lock:
             try:
-                dt = datetime.fromisoformat(value)
-                if dt.tzinfo is None:
-                    return dt.replace(tzinfo=timezone.utc)
-                return dt
-            except ValueError:
-                return None
-
-        return {
-            "timestamp_iso": row.get("timestamp_iso", ""),
-            "timestamp": _parse_ts(row.get("timestamp_iso", "")),
-            "epoch_s": _to_float(row.get("epoch_s", "")),
-            "median_price": _to_float(row.get("median_price", "")),
-            "lowest_price": _to_float(row.get("lowest_price", "")),
-            "volume": row.get("volume", ""),
-        }
+                st = os.stat(self.path)
+            except OSError:
+                self._reset()
+                self._inode = None
+                return self.points
+            with open(self.path, "rb") as f:
+                head = f.read(self.FINGERPRINT_BYTES)
+                rotated = (
+                    st.st_ino != self._inode
+                    or st.st_size < self._offset
+                    or (self._fingerprint and not head.startswith(self._fingerprint))
+                )
+                if rotated:
+                    self._reset()
+                    self._inode = st.st_ino
+                if st.st_size == self._offset:
+                    return self.points
+                f.seek(self._offset)
+                chunk = f.read(st.st_size - self._offset)
+            # leave a partially written trailing row for the next refresh
+            end = chunk.rfind(b"\n") + 1
+            if end == 0:
+                return self.points
+            if not self._fingerprint:
+                self._fingerprint = head[:min(len(head), self._offset + end)]
+            self._offset += end
+            self._ingest(chunk[:end])
+            return self.points
+
+    def columns(self):
+        'Copies of the (epochs, medians, volumes) columns as NumPy arrays, and the generation.'
+        import numpy as np
+
+        with self._lock:
+            return (
+                np.array(self.epochs, dtype=np.float64),
+                np.array(self.medians, dtype=np.float64),
+                np.array(self.volumes, dtype=np.float64),
+                self.generation,
+            )
+
+    def _ingest(self, chunk: bytes):
+        points = self.points
+        for row in csv.reader(io.StringIO(chunk.decode("utf-8", errors="replace"), newline="")):
+            if len(row) < len(FIELDNAMES):
+                continue
+            epoch = to_float(row[1])
+            median = to_float(row[2])
+            if epoch is None or median is None:
+                continue
+            point = (datetime.fromtimestamp(epoch, tz=timezone.utc).astimezone(), median)
+            volume = _to_volume(row[4])
+            if not points or point[0] >= points[-1][0]:
+                points.append(point)
+                self.epochs.append(epoch)
+                self.medians.append(median)
+                self.volumes.append(volume)
+            else:
+                i = bisect_right(points, point)
+                points.insert(i, point)
+                self.epochs.insert(i, epoch)
+                self.medians.insert(i, median)
+                self.volumes.insert(i, volume)
+                self.generation += 1
+
+def open_logger(data_dir: str, slug: str, backend: str = "csv", read_only: bool = False):
+    """Create the price logger for an item using the configured storage backend.
+
+    `read_only` opens the logs of another process without creating or
+    repairing anything; a SQLite database is opened with `mode=ro`.
+    """
+    if backend == "binary":
+        from .binary_logger import BinaryPriceLogger
+        return BinaryPriceLogger(os.path.join(data_dir, f"{slug}.bin"), read_only)
+    if backend == "sqlite":
+        from .sqlite_logger import SqlitePriceLogger
+        return SqlitePriceLogger(os.path.join(data_dir, "prices.sqlite3"), slug, read_only)
+    if backend != "csv":
+        raise ValueError(f"unknown storage backend: {backend!r}")
+    return PriceLogger(os.path.join(data_dir, f"{slug}.csv"), read_only=read_only)
@@ -0,0 +1,81 @@
+"""Diagnostics window: where the refresh budget goes, from the in-process metrics.
+
+Opened from the footer of the GUI started with --diagnostics. It redraws
+once a second on the main loop; reading the metrics only copies a few
+small dicts, so it costs nothing measurable while open.
+"""
+import tkinter as tk
+
+from .metrics import ITEM_STALENESS, SCHEDULER_LAG, STAGE_SECONDS, STEAM_LATENCY, STEAM_RATE_BUDGET, STEAM_RATE_WAIT, STEAM_REQUESTS
+
+REFRESH_MS = 1000
+STALE_ROWS = 15
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:8.1f}"
+
+def _histogram_rows(histogram, title: str):
+    lines = [f"{title:<28} {'count':>7} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8}"]
+    for key in sorted(histogram.series()):
+        summary = histogram.summary(key)
+        if summary:
+            name = "/".join(key) or "all"
+            lines.append(f"  {name:<26} {summary['count']:>7} {_ms(summary['mean'])} {_ms(summary['p50'])} {_ms(summary['p95'])}")
+    return lines
+
+def render_report() -> str:
+    lines = _histogram_rows(STEAM_LATENCY, "Steam requests")
+    statuses = {}
+    for (endpoint, status), count in STEAM_REQUESTS.values().items():
+        statuses.setdefault(endpoint, []).append(f"{status}={int(count)}")
+    for endpoint, parts in sorted(statuses.items()):
+        lines.append(f"  {endpoint:<26} {' '.join(sorted(parts))}")
+    lines.append("")
+    budget = {key[0]: value for key, value in STEAM_RATE_BUDGET.values().items()}
+    if budget:
+        lines.append(
+            f"Rate budget {budget['tokens']:.1f}/{budget['capacity']:.0f} requests "
+            f"(+{budget['rate_per_minute']:g}/min), cool-down {budget['blocked_for']:.0f} s"
+        )
+    lines.extend(_histogram_rows(STEAM_RATE_WAIT, "Rate limiter wait"))
+    lines.extend(_histogram_rows(SCHEDULER_LAG, "Scheduler lag"))
+    lines.append("")
+    lines.extend(_histogram_rows(STAGE_SECONDS, "Stages"))
+    lines.append("")
+    ages = sorted(ITEM_STALENESS.ages().items(), key=lambda item: -item[1])
+    lines.append(f"Staleness (oldest {min(len(ages), STALE_ROWS)} of {len(ages)} items)")
+    for item, age in ages[:STALE_ROWS]:
+        lines.append(f"  {item[:50]:<50} {age:8.0f} s")
+    return "\n".join(lines)
+
+class DiagnosticsWindow(tk.Toplevel):
+    def __init__(self, master, background: str = "#050b18", foreground: str = "#a9c7ff"):
+        super().__init__(master)
+        self.title("Diagnostics")
+        self.geometry("760x560")
+        self.configure(background=background)
+        self.text = tk.Text(
+            self,
+            background=background,
+            foreground=foreground,
+            font=("Share Tech Mono", 10),
+            borderwidth=0,
+            highlightthickness=0,
+            wrap="none",
+        )
+        self.text.pack(fill="both", expand=True, padx=12, pady=12)
+        self._job = None
+        self._refresh()
+
+    def _refresh(self):
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", render_report())
+        self.text.configure(state="disabled")
+        self._job = self.after(REFRESH_MS, self._refresh)
+
+    def destroy(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        super().destroy()
@@ -0,0 +1,65 @@
+"""Reduce dense price series to roughly the number of points a chart can show.
+
+Both methods return sorted indices into the input, always including the
+first and last samples and the exact global minimum and maximum, so the
+reduced line keeps its endpoints and extremes.
+"""
+import numpy as np
+
+def _with_extremes(idx: np.ndarray, y: np.ndarray) -> np.ndarray:
+    extremes = np.array([0, len(y) - 1, int(np.argmin(y)), int(np.argmax(y))])
+    return np.unique(np.concatenate((idx, extremes)))
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: pick the point per bucket that forms the
+    largest triangle with the previously chosen point and the next bucket's mean."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    out = np.empty(threshold, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], max(edges[i + 2], edges[i + 1] + 1))
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        bx = x[start:end]
+        by = y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        out[i + 1] = a
+    return _with_extremes(out, y)
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Keep the lowest and highest sample of each of threshold/2 equal-count buckets."""
+    n = len(x)
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+
+    buckets = threshold // 2
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)[:-1]
+    lows = np.minimum.reduceat(y, edges)
+    highs = np.maximum.reduceat(y, edges)
+    # map each bucket's extreme value back to its first position in that bucket
+    bucket_of = np.repeat(np.arange(buckets), np.diff(np.append(edges, n)))
+    pos = np.arange(n)
+    low_idx = np.full(buckets, n, dtype=np.int64)
+    high_idx = np.full(buckets, n, dtype=np.int64)
+    np.minimum.at(low_idx, bucket_of[y == lows[bucket_of]], pos[y == lows[bucket_of]])
+    np.minimum.at(high_idx, bucket_of[y == highs[bucket_of]], pos[y == highs[bucket_of]])
+    return _with_extremes(np.concatenate((low_idx, high_idx)), y)
+
+def downsample(x, y, threshold: int, method: str = "lttb") -> np.ndarray:
+    """Return the indices of about `threshold` points chosen by `method` ("lttb" or "minmax")."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) <= threshold:
+        return np.arange(len(x))
+    pick = minmax_indices if method == "minmax" else lttb_indices
+    return pick(x, y, threshold)
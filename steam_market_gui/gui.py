@@ -1,58 +1,86 @@
-import os, io, threading, time, sys, csv
-from typing import Optional
-from datetime import datetime, timedelta, timezone
+import os, io, threading, time, sys, argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, TYPE_CHECKING
+from datetime import datetime
 from urllib.parse import unquote
-from dotenv import load_dotenv
+
+from .startup import STARTUP
 
 import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as tb
-from PIL import Image, ImageTk, ImageFilter, ImageOps, ImageChops
-import numpy as np
-
-import matplotlib
-matplotlib.use("Agg")  # render offscreen, then show as image in Tk
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib import ticker
-
+STARTUP.mark("import tkinter + ttkbootstrap")
+from PIL import Image
+STARTUP.mark("import PIL")
+
+# Matplotlib (chart_render) and NumPy are imported on first use, off the main thread
+if TYPE_CHECKING:
+    from .chart_render import HoverPoints
+from .image_cache import StyledImageCache
+from .item_style import ItemStyler
+from .tracker_chart import TrackerChart, CHART_STYLE as TRACKER_CHART_STYLE
 from .steam_api import SteamMarketClient
-from .data_logger import PriceLogger
-from .utils import market_hash_from_url, slugify, parse_price_to_float
-
-load_dotenv()
-
-APPID = 730
-CURRENCY = int(os.getenv("CURRENCY", "1"))
-REFRESH_SECONDS = int(os.getenv("REFRESH_SECONDS", "300"))
+from .data_logger import open_logger
+from .utils import market_hash_from_url, slugify, parse_price_to_float, load_watchlist
+from .scheduler import RefreshScheduler
+from . import alerts
+from .profiling import from_config as profiler_from_config
+from .ui_dispatcher import UiDispatcher, SetVar, SetImage
+from .metrics import ITEM_STALENESS, timed_stage, serve as serve_metrics
+from .watchlist_view import WatchlistView
+from .config import APPID, CURRENCY, REFRESH_SECONDS, REFRESH_WORKERS, ASSETS_DIR, DATA_DIR, STORAGE_BACKEND, HTTP_CACHE_DIR
+from .config import CHART_RENDER_MODE, CHART_RENDER_PROCESSES, WATCHLIST_FILE, METRICS_PORT, ALERTS_FILE
+STARTUP.mark("import app modules + .env")
+
+# hover hit radius in pixels and the minimum spacing of hover lookups (~one frame)
+CHART_HOVER_RADIUS = 8
+CHART_HOVER_INTERVAL_MS = 16
 
 ACCENT_COLOR = "#58b4ff"
 SECONDARY_ACCENT = "#5e7cff"
 CARD_BACKGROUND = "#0b162f"
 BASE_BACKGROUND = "#050b18"
 
+CHART_STYLE = {
+    **TRACKER_CHART_STYLE,
+    "line_color": ACCENT_COLOR,
+    "background": BASE_BACKGROUND,
+}
+
 DEFAULT_URL_1 = os.getenv("ITEM_URL_1", "https://steamcommunity.com/market/listings/730/%E2%98%85%20Bayonet%20%7C%20Marble%20Fade%20%28Factory%20New%29")
 DEFAULT_URL_2 = os.getenv("ITEM_URL_2", "https://steamcommunity.com/market/listings/730/%E2%98%85%20Falchion%20Knife%20%7C%20Marble%20Fade%20%28Factory%20New%29")
 
-ASSETS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets"))
-DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+IMAGE_CACHE = StyledImageCache(os.path.join(ASSETS_DIR, ".cache"))
+# last chart of each tracker and timeframe, shown at start-up before the first refresh
+CHART_CACHE_DIR = os.path.join(ASSETS_DIR, ".cache", "charts")
 
 class TrackerFrame(ttk.Frame):
-    def __init__(self, master, title: str, listing_url: str, client: SteamMarketClient, **kwargs):
+    def __init__(self, master, title: str, listing_url: str, client: SteamMarketClient, scheduler: RefreshScheduler, dispatcher: UiDispatcher, read_only: bool = False, render_pool: Optional[ProcessPoolExecutor] = None, **kwargs):
         super().__init__(master, **kwargs)
         self.client = client
+        self.scheduler = scheduler
+        # refreshes run on worker threads; every widget change goes through the dispatcher
+        self.dispatcher = dispatcher
+        # button clicks made before a requested render starts collapse into one
+        self._request_lock = threading.Lock()
+        self._chart_requested = False
+        # read-only trackers never poll Steam; they follow the logs a collector writes
+        self.read_only = read_only
         self.listing_url = listing_url.strip()
         self.market_hash = market_hash_from_url(self.listing_url)
         self.slug = slugify(self.market_hash)
-        self.logger = PriceLogger(os.path.join(DATA_DIR, f"{self.slug}.csv"))
+        self.logger = open_logger(DATA_DIR, self.slug, STORAGE_BACKEND, read_only)
+        self.chart = TrackerChart(self.logger, CHART_STYLE, self._show_chart, self._persist_chart, render_pool)
         self.configure(style="TrackerFrame.TFrame")
         self.accent_color = ACCENT_COLOR
         self.secondary_accent = SECONDARY_ACCENT
         self.card_background = CARD_BACKGROUND
+        self.styler = ItemStyler(self.accent_color, self.secondary_accent, BASE_BACKGROUND, IMAGE_CACHE)
 
         self.configure_padding()
         self.build_ui(title)
-        self.fetch_all_async()
+        self.scheduler.add(self, self._fetch_all)
 
     def configure_padding(self):
         for i in range(3):
@@ -120,9 +148,12 @@ class TrackerFrame(ttk.Frame):
         self.updated_lbl.grid(row=3, column=1, sticky="w", pady=(4, 0))
 
         # Chart area
-        self.chart_points = []
-        self.chart_pixel_points = []
+        self.chart_pixel_points = None
+        self._pending_motion = None
+        self._motion_job = None
         self.timeframe_var = tk.StringVar(value="day")
+        # plain copy of timeframe_var that worker threads can read
+        self.chart.timeframe = self.timeframe_var.get()
 
         self.chart_container = tk.Frame(
             self,
@@ -140,6 +171,7 @@ class TrackerFrame(ttk.Frame):
         self.chart_lbl.grid(row=0, column=0, sticky="nsew", padx=14, pady=12)
         self.chart_lbl.bind("<Motion>", self._on_chart_motion)
         self.chart_lbl.bind("<Leave>", lambda _: self._hide_chart_tooltip())
+        self._show_cached_chart()
 
         self.chart_tooltip = tk.Label(
             self.chart_container,
@@ -156,7 +188,7 @@ class TrackerFrame(ttk.Frame):
 
         self.timeframe_frame = ttk.Frame(self, padding=(0, 6, 0, 0), style="TrackerFrame.TFrame")
         self.timeframe_frame.grid(row=2, column=0, columnspan=3, sticky="ew", padx=4)
-        self.timeframe_frame.columnconfigure((0,1,2), weight=1)
+        self.timeframe_frame.columnconfigure((0,1,2,3,4), weight=1)
 
         self.timeframe_buttons = {}
         for idx, (label, key) in enumerate([("Day", "day"), ("Week", "week"), ("Lifetime", "lifetime")]):
@@ -171,6 +203,24 @@ class TrackerFrame(ttk.Frame):
             btn.configure(cursor="hand2")
             self.timeframe_buttons[key] = btn
 
+        self.candles_btn = tb.Button(
+            self.timeframe_frame,
+            text="Candles",
+            command=self._toggle_candles,
+            style="Timeframe.Unselected.TButton",
+        )
+        self.candles_btn.grid(row=0, column=3, padx=6)
+        self.candles_btn.configure(cursor="hand2")
+
+        self.indicators_btn = tb.Button(
+            self.timeframe_frame,
+            text="Indicators",
+            command=self._toggle_indicators,
+            style="Timeframe.Selected.TButton" if self.chart.show_indicators else "Timeframe.Unselected.TButton",
+        )
+        self.indicators_btn.grid(row=0, column=4, padx=6)
+        self.indicators_btn.configure(cursor="hand2")
+
         # Controls
         self.controls = ttk.Frame(self, padding=(0, 12, 0, 0), style="TrackerFrame.TFrame")
         self.controls.grid(row=3, column=0, columnspan=3, sticky="ew", padx=4)
@@ -197,9 +247,6 @@ class TrackerFrame(ttk.Frame):
         self.interval_lbl = ttk.Label(self.controls, text=f"Auto-refresh: {REFRESH_SECONDS}s", style="NeonInfo.TLabel")
         self.interval_lbl.grid(row=0, column=3, sticky="e")
 
-        # Start auto refresh
-        self.after(REFRESH_SECONDS * 1000, self.fetch_all_async)
-
     def open_listing(self):
         import webbrowser
         webbrowser.open(self.listing_url)
@@ -208,14 +255,17 @@ class TrackerFrame(ttk.Frame):
         last = self.logger.latest()
         if not last:
             return
+        if last.get("median_price") is not None and last.get("epoch_s") is not None:
+            # in attach mode the collector's appends only show up here
+            ITEM_STALENESS.mark(self.slug, last["epoch_s"])
 
         def fmt_price(value: Optional[float]) -> str:
             return "n/a" if value is None else f"{value:.2f}"
 
-        self.median_var.set(f"Median: {fmt_price(last.get('median_price'))} (cached)")
-        self.lowest_var.set(f"Lowest: {fmt_price(last.get('lowest_price'))} (cached)")
+        self._set_var(self.median_var, f"Median: {fmt_price(last.get('median_price'))} (cached)")
+        self._set_var(self.lowest_var, f"Lowest: {fmt_price(last.get('lowest_price'))} (cached)")
         vol = last.get("volume") or "n/a"
-        self.volume_var.set(f"Volume: {vol} (cached)")
+        self._set_var(self.volume_var, f"Volume: {vol} (cached)")
 
         ts = last.get("timestamp")
         if ts:
@@ -226,44 +276,60 @@ class TrackerFrame(ttk.Frame):
         else:
             ts_display = last.get("timestamp_iso", "")
         if ts_display:
-            self.updated_var.set(f"Updated: {ts_display} (cached)")
+            self._set_var(self.updated_var, f"Updated: {ts_display} (cached)")
         else:
-            self.updated_var.set("Updated: —")
+            self._set_var(self.updated_var, "Updated: —")
+
+    def _set_var(self, var: tk.Variable, value: str):
+        self.dispatcher.post(SetVar(var, value))
 
     def fetch_all_async(self):
-        threading.Thread(target=self._fetch_all, daemon=True).start()
+        # the scheduler owns the refresh cadence; this just pulls the next run forward
+        self.scheduler.trigger(self)
 
     def fetch_image_async(self):
-        threading.Thread(target=self._fetch_image, daemon=True).start()
+        self.scheduler.submit(self._fetch_image)
 
+    def destroy(self):
+        self.scheduler.remove(self)
+        super().destroy()
+
+    @timed_stage("refresh_tracker")
     def _fetch_all(self):
         try:
-            self._fetch_price()
-            self._plot_chart()
-            self.updated_var.set(f"Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            if self.read_only:
+                self._load_cached_snapshot()
+                if not getattr(self, "_image_cached", None):
+                    self._fetch_image()
+            else:
+                self._fetch_price()
+            self.chart.plot()
+            self._set_var(self.updated_var, f"Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         except Exception as e:
             print("Fetch error:", e, file=sys.stderr)
-        finally:
-            # schedule next refresh
-            self.after(REFRESH_SECONDS * 1000, self.fetch_all_async)
 
     def _fetch_price(self):
         data = self.client.price_overview(self.market_hash)
-        print("DEBUG priceoverview:", data)
         if not data:
-            self.median_var.set("Median: — (failed)")
+            self._set_var(self.median_var, "Median: — (failed)")
             return
         median_str = data.get("median_price")
         lowest_str = data.get("lowest_price")
         volume_str = data.get("volume")
 
-        self.median_var.set(f"Median: {median_str if median_str else 'n/a'}")
-        self.lowest_var.set(f"Lowest: {lowest_str if lowest_str else 'n/a'}")
-        self.volume_var.set(f"Volume: {volume_str if volume_str else 'n/a'}")
+        self._set_var(self.median_var, f"Median: {median_str if median_str else 'n/a'}")
+        self._set_var(self.lowest_var, f"Lowest: {lowest_str if lowest_str else 'n/a'}")
+        self._set_var(self.volume_var, f"Volume: {volume_str if volume_str else 'n/a'}")
 
         median = parse_price_to_float(median_str)
         lowest = parse_price_to_float(lowest_str)
         self.logger.append(median, lowest, volume_str)
+        if hasattr(self.logger, "flush"):
+            # batched backends: make the sample visible to the chart we draw next
+            self.logger.flush()
+        if median is not None:
+            ITEM_STALENESS.mark(self.slug)
+        alerts.observe(self.slug, median, lowest)
 
         # ensure we have an image
         if not getattr(self, "_image_cached", None):
@@ -287,9 +353,9 @@ class TrackerFrame(ttk.Frame):
         if not url:
             return
         try:
-            r = self.client.session.get(url, timeout=15)
-            if r.status_code == 200:
-                img_bytes = io.BytesIO(r.content)
+            content = self.client.get_cached(url)
+            if content:
+                img_bytes = io.BytesIO(content)
                 try:
                     pil_image = Image.open(img_bytes)
                 except Exception as exc:
@@ -309,7 +375,7 @@ class TrackerFrame(ttk.Frame):
                 except Exception:
                     target_path = legacy_path
                     with open(target_path, "wb") as f:
-                        f.write(r.content)
+                        f.write(content)
 
                 self._set_label_image(pil_image)
                 self._image_cached = True
@@ -317,366 +383,99 @@ class TrackerFrame(ttk.Frame):
             print("Image fetch failed:", e, file=sys.stderr)
 
     def _set_label_image(self, pil_img):
-        styled = self._stylize_item_image(pil_img)
-        self.tk_img = ImageTk.PhotoImage(styled)
-        self.image_lbl.configure(image=self.tk_img, text="")
-
-    def _stylize_item_image(self, pil_img: Image.Image) -> Image.Image:
-        base = ImageOps.contain(pil_img.convert("RGBA"), (220, 220))
-        alpha = base.split()[-1]
-
-        pad = 48
-        canvas_size = (base.width + pad * 2, base.height + pad * 2)
-
-        mask_canvas = Image.new("L", canvas_size, 0)
-        mask_canvas.paste(alpha, (pad, pad))
-
-        glow_mask = mask_canvas.filter(ImageFilter.GaussianBlur(radius=28))
-        glow_mask = ImageOps.autocontrast(glow_mask, cutoff=6)
-        glow_mask = glow_mask.filter(ImageFilter.GaussianBlur(radius=6))
-        glow_mask = self._scale_mask(glow_mask, 0.55)
-
-        highlight_mask = mask_canvas.filter(ImageFilter.GaussianBlur(radius=10))
-        highlight_mask = ImageOps.autocontrast(highlight_mask, cutoff=14)
-        highlight_mask = highlight_mask.filter(ImageFilter.GaussianBlur(radius=3))
-        highlight_mask = self._scale_mask(highlight_mask, 0.45)
-
-        shadow_mask = ImageChops.offset(mask_canvas, 0, 16)
-        shadow_mask = ImageOps.autocontrast(shadow_mask, cutoff=6)
-        shadow_mask = shadow_mask.filter(ImageFilter.GaussianBlur(radius=20))
-        shadow_mask = self._scale_mask(shadow_mask, 0.7)
-
-        background = self._create_background_gradient(canvas_size)
-        composite = background.convert("RGBA")
-
-        accent_rgb = self._hex_to_rgb(self.secondary_accent)
-        primary_rgb = self._dominant_color(base)
-
-        glow_color = self._mix_colors(primary_rgb, accent_rgb, 0.2)
-        glow_color = self._mix_colors(glow_color, (255, 255, 255), 0.15)
-
-        glow_layer = Image.new("RGBA", canvas_size, (*glow_color, 0))
-        glow_layer.putalpha(glow_mask)
-
-        highlight_color = self._mix_colors(primary_rgb, accent_rgb, 0.25)
-        highlight_color = self._mix_colors(highlight_color, (255, 255, 255), 0.35)
-        highlight_layer = Image.new("RGBA", canvas_size, (*highlight_color, 0))
-        highlight_layer.putalpha(highlight_mask)
-
-        shadow_layer = Image.new("RGBA", canvas_size, (10, 14, 28, 0))
-        shadow_layer.putalpha(shadow_mask)
-
-        composite.alpha_composite(shadow_layer)
-        composite.alpha_composite(glow_layer)
-        composite.alpha_composite(highlight_layer)
-        composite.alpha_composite(base, (pad, pad))
-
-        border_accent = tuple(list(accent_rgb) + [120])
-        composite = ImageOps.expand(composite, border=2, fill=border_accent)
-        composite = ImageOps.expand(
-            composite,
-            border=4,
-            fill=(*self._hex_to_rgb(BASE_BACKGROUND), 255),
-        )
-
-        return composite
-
-    def _build_color_halo(
-        self,
-        base: Image.Image,
-        canvas_size: tuple[int, int],
-        pad: int,
-        mask_canvas: Image.Image,
-    ) -> Image.Image:
-        halo_source = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
-        halo_source.paste(base, (pad, pad))
-
-        premultiplied = self._premultiply_alpha(halo_source)
-        blurred = premultiplied
-        for radius in (26, 48):
-            blurred = blurred.filter(ImageFilter.GaussianBlur(radius=radius))
-
-        blurred = self._unpremultiply_alpha(blurred)
-
-        halo_alpha = ImageChops.subtract(blurred.split()[-1], mask_canvas)
-        halo_alpha = ImageOps.autocontrast(halo_alpha, cutoff=6)
-        halo_alpha = halo_alpha.filter(ImageFilter.GaussianBlur(radius=6))
-
-        halo_np = np.array(blurred, dtype=np.float32)
-        halo_np[..., :3] = np.clip(halo_np[..., :3] * 1.18 + 12, 0, 255)
-        halo_image = Image.fromarray(halo_np.astype(np.uint8), "RGBA")
-        halo_image.putalpha(halo_alpha)
-
-        return halo_image
-
-    def _premultiply_alpha(self, image: Image.Image) -> Image.Image:
-        arr = np.array(image, dtype=np.float32)
-        alpha = arr[..., 3:4] / 255.0
-        arr[..., :3] *= alpha
-        return Image.fromarray(arr.astype(np.uint8), "RGBA")
-
-    def _unpremultiply_alpha(self, image: Image.Image) -> Image.Image:
-        arr = np.array(image, dtype=np.float32)
-        alpha = arr[..., 3]
-        safe_alpha = alpha.copy()
-        safe_alpha[safe_alpha == 0] = 1
-        arr[..., :3] = np.clip(arr[..., :3] * 255.0 / safe_alpha[..., None], 0, 255)
-        arr[..., :3][alpha == 0] = 0
-        return Image.fromarray(arr.astype(np.uint8), "RGBA")
-
-    def _scale_mask(self, mask: Image.Image, factor: float) -> Image.Image:
-        factor = max(0.0, factor)
-        return mask.point(lambda v: min(255, int(v * factor)))
-
-    def _dominant_color(self, image: Image.Image) -> tuple[int, int, int]:
-        thumb = image.copy()
-        if thumb.mode not in ("RGB", "RGBA"):
-            thumb = thumb.convert("RGBA")
-        thumb = thumb.resize((1, 1), Image.LANCZOS)
-        pixel = thumb.getpixel((0, 0))
-        r, g, b = pixel[:3]
-        accent_rgb = self._hex_to_rgb(self.accent_color)
-        blended = []
-        for idx, component in enumerate((r, g, b)):
-            mixed = int(component * 0.55 + accent_rgb[idx] * 0.45 + 25)
-            blended.append(min(255, mixed))
-        brightness = max(blended)
-        if brightness < 120:
-            boost = 120 - brightness
-            blended = [min(255, c + boost) for c in blended]
-        return tuple(blended)
-
-    def _hex_to_rgb(self, hex_color: str) -> tuple[int, int, int]:
-        hex_color = hex_color.lstrip("#")
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-
-    def _create_background_gradient(self, size: tuple[int, int]) -> Image.Image:
-        width, height = size
-        gradient = Image.linear_gradient("L").rotate(90, expand=True)
-        gradient = gradient.resize((width, height), Image.BICUBIC)
-
-        base_rgb = self._hex_to_rgb(BASE_BACKGROUND)
-        accent_rgb = self._hex_to_rgb(self.secondary_accent)
-        deep_tone = self._mix_colors(base_rgb, accent_rgb, 0.15)
-        light_tone = self._mix_colors(base_rgb, (240, 240, 255), 0.18)
-
-        colored = ImageOps.colorize(
-            gradient,
-            black=self._rgb_to_hex(deep_tone),
-            white=self._rgb_to_hex(light_tone),
-        )
-        vignette = Image.linear_gradient("L")
-        vignette = vignette.resize((width, height), Image.BICUBIC)
-        vignette = ImageOps.invert(vignette)
-        vignette = vignette.filter(ImageFilter.GaussianBlur(radius=24))
-
-        vignette_layer = Image.new("RGBA", (width, height), (*base_rgb, 0))
-        vignette_layer.putalpha(vignette)
-
-        background = colored.convert("RGBA")
-        background.alpha_composite(vignette_layer)
-        return background
-
-    def _mix_colors(
-        self, rgb_a: tuple[int, int, int], rgb_b: tuple[int, int, int], ratio: float
-    ) -> tuple[int, int, int]:
-        ratio = max(0.0, min(1.0, ratio))
-        mixed = []
-        for a, b in zip(rgb_a, rgb_b):
-            mixed.append(int(a * (1 - ratio) + b * ratio))
-        return tuple(mixed)
-
-    def _rgb_to_hex(self, rgb: tuple[int, int, int]) -> str:
-        return "#" + "".join(f"{component:02x}" for component in rgb)
+        styled = self.styler.styled(pil_img)
+        self.dispatcher.post(SetImage(self.image_lbl, styled))
 
     def _set_timeframe(self, timeframe: str):
         if timeframe == self.timeframe_var.get():
             # still refresh in case data changed
-            self._render_chart(timeframe)
+            self._request_chart()
             return
 
         self.timeframe_var.set(timeframe)
+        self.chart.timeframe = timeframe
         self._update_timeframe_buttons()
-        self._render_chart(timeframe)
+        # cheap with the series cache; other backends reload the new window
+        self._request_chart()
 
     def _update_timeframe_buttons(self):
         for key, btn in self.timeframe_buttons.items():
             style_name = "Timeframe.Selected.TButton" if key == self.timeframe_var.get() else "Timeframe.Unselected.TButton"
             btn.configure(style=style_name)
 
-    def _plot_chart(self):
-        csv_path = os.path.join(DATA_DIR, f"{self.slug}.csv")
-        ts = []
-        med = []
-        if os.path.exists(csv_path):
-            with open(csv_path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    try:
-                        epoch = float(row["epoch_s"])
-                        m = float(row["median_price"]) if row["median_price"] else None
-                        if m is not None:
-                            ts.append(epoch)
-                            med.append(m)
-                    except:
-                        continue
-
-        if not med:
-            # no data yet — clear chart
-            self.chart_points = []
-            self.chart_pixel_points = []
-            self._hide_chart_tooltip()
-            self.chart_lbl.configure(image="", text="No price history yet", anchor="center")
-            return
-
-        # Convert epochs to timezone-aware datetimes and sort chronologically
-        timestamps = [datetime.fromtimestamp(t, tz=timezone.utc).astimezone() for t in ts]
-        self.chart_points = sorted(zip(timestamps, med), key=lambda x: x[0])
-        self._render_chart(self.timeframe_var.get())
-
-    def _render_chart(self, timeframe: Optional[str] = None):
-        if timeframe is None:
-            timeframe = self.timeframe_var.get()
-
-        if not self.chart_points:
-            self.chart_lbl.configure(image="", text="No price history yet", anchor="center")
-            return
-
-        self._hide_chart_tooltip()
-        plt.close("all")
-        plt.style.use("dark_background")
-        fig, ax = plt.subplots(figsize=(3.4, 1.75), dpi=135)
-        fig.patch.set_facecolor(BASE_BACKGROUND)
-        ax.set_facecolor("#0b1a34")
+    def _toggle_candles(self):
+        self.chart.chart_mode = "line" if self.chart.chart_mode == "candles" else "candles"
+        selected = self.chart.chart_mode == "candles"
+        self.candles_btn.configure(style="Timeframe.Selected.TButton" if selected else "Timeframe.Unselected.TButton")
+        self._request_chart()
+
+    def _toggle_indicators(self):
+        self.chart.show_indicators = not self.chart.show_indicators
+        self.indicators_btn.configure(style="Timeframe.Selected.TButton" if self.chart.show_indicators else "Timeframe.Unselected.TButton")
+        self._request_chart()
+
+    def _request_chart(self):
+        'Re-render on a worker; clicks made before it starts collapse into one render.'
+        with self._request_lock:
+            if self._chart_requested:
+                return
+            self._chart_requested = True
+        self.scheduler.submit(self._run_requested_chart)
 
-        line_color = ACCENT_COLOR
-        fill_color = "#0f2f5c"
+    def _run_requested_chart(self):
+        with self._request_lock:
+            self._chart_requested = False
+        try:
+            self.chart.plot()
+        except Exception as e:
+            print("Chart render failed:", e, file=sys.stderr)
 
-        times, prices = zip(*self.chart_points)
-        now = datetime.now(timezone.utc).astimezone(times[0].tzinfo)
+    def _chart_cache_path(self, timeframe: str) -> str:
+        return os.path.join(CHART_CACHE_DIR, f"{self.slug}-{timeframe}.png")
 
-        span = {
-            "day": timedelta(days=1),
-            "week": timedelta(days=7),
-            "lifetime": None,
-        }.get(timeframe, None)
+    def _persist_chart(self, timeframe: str, image: Image.Image):
+        path = self._chart_cache_path(timeframe)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+            image.save(tmp_path, format="PNG", compress_level=1)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print("Chart cache write failed:", e, file=sys.stderr)
 
-        if span is None:
-            filtered = list(self.chart_points)
-            range_start = times[0]
-        else:
-            threshold = now - span
-            filtered = [(t, p) for t, p in self.chart_points if t >= threshold]
-            range_start = threshold
-
-        if not filtered:
-            filtered = [self.chart_points[-1]]
-
-        filtered_times, filtered_prices = zip(*filtered)
-
-        if filtered_prices:
-            for glow_width, alpha in ((9, 0.08), (6, 0.12), (4, 0.18)):
-                ax.plot(
-                    filtered_times,
-                    filtered_prices,
-                    color=line_color,
-                    linewidth=glow_width,
-                    alpha=alpha,
-                    solid_capstyle="round",
-                )
-
-        ax.plot(
-            filtered_times,
-            filtered_prices,
-            color=line_color,
-            linewidth=2.6,
-            marker="o",
-            markersize=4,
-            markerfacecolor=BASE_BACKGROUND,
-            markeredgecolor=ACCENT_COLOR,
-        )
-        if len(filtered_prices) > 1:
-            ax.fill_between(filtered_times, filtered_prices, color=fill_color, alpha=0.22)
-
-        ax.set_title(
-            f"Median Price — {timeframe.capitalize()} View",
-            color="#94b7ff",
-            fontsize=11,
-            pad=16,
-            fontweight="bold",
-        )
+    def _show_cached_chart(self):
+        path = self._chart_cache_path(self.chart.timeframe)
+        if not os.path.exists(path):
+            return
+        try:
+            # Tk decodes the PNG itself; no PIL or Matplotlib needed for the first paint
+            self._cached_chart_photo = tk.PhotoImage(file=path)
+        except tk.TclError:
+            return
+        self.chart_lbl.configure(image=self._cached_chart_photo, text="")
 
-        locator = mdates.AutoDateLocator(minticks=3, maxticks=6)
-        formatter = mdates.ConciseDateFormatter(locator)
-        ax.xaxis.set_major_locator(locator)
-        ax.xaxis.set_major_formatter(formatter)
-        ax.tick_params(colors="#7f9bff", labelsize=8)
-        ax.xaxis.set_tick_params(rotation=0, labelcolor="#a9c2ff")
-
-        dollar_formatter = ticker.FuncFormatter(lambda val, _: f"${val:,.2f}")
-        ax.yaxis.set_major_locator(ticker.MaxNLocator(nbins=6))
-        ax.yaxis.set_major_formatter(dollar_formatter)
-        ax.yaxis.label.set_color("#94b7ff")
-        ax.set_ylabel("Median Price", fontsize=9)
-
-        for spine in ax.spines.values():
-            spine.set_color("#1b2b4d")
-
-        ax.grid(which="major", color="#1b2b4d", linestyle="-", linewidth=0.8, alpha=0.8)
-
-        range_end = now
-        if len(filtered_times) == 1:
-            padding = {
-                "day": timedelta(hours=12),
-                "week": timedelta(days=1.5),
-            }.get(timeframe, timedelta(days=30))
-            range_start = min(range_start, filtered_times[0] - padding)
-            range_end = max(range_end, filtered_times[0] + padding)
-
-        ax.set_xlim(range_start, range_end)
-        ax.margins(x=0.03)
-        ax.margins(y=0.1)
-
-        ax.set_xlabel("Date", color="#d4defc", fontsize=9)
-
-        fig.canvas.draw()
-        width, height = fig.canvas.get_width_height()
-        if filtered_prices:
-            date_nums = mdates.date2num(filtered_times)
-            data_points = np.column_stack((date_nums, filtered_prices))
-            display_points = ax.transData.transform(data_points)
-            self.chart_pixel_points = [
-                (px, height - py, f"${price:,.2f}")
-                for (px, py), price in zip(display_points, filtered_prices)
-            ]
-        else:
-            self.chart_pixel_points = []
+    def _show_chart(self, image: Optional[Image.Image], pixel_points: Optional["HoverPoints"], text: str = ""):
+        def apply():
+            # swap the hover points together with the image they belong to
+            self.chart_pixel_points = pixel_points
             self._hide_chart_tooltip()
 
-        buf = io.BytesIO()
-        fig.canvas.print_png(buf)
-        buf.seek(0)
-        from PIL import Image as _Image
-        im = _Image.open(buf)
-        self.tk_chart = ImageTk.PhotoImage(im)
-        self.chart_lbl.configure(image=self.tk_chart, text="")
-        plt.close(fig)
-
+        self.dispatcher.post(SetImage(self.chart_lbl, image, text, on_apply=apply))
 
     def _on_chart_motion(self, event):
-        if not getattr(self, "chart_pixel_points", None):
+        # coalesce bursts of motion events into one lookup per frame
+        self._pending_motion = (event.x, event.y)
+        if self._motion_job is None:
+            self._motion_job = self.after(CHART_HOVER_INTERVAL_MS, self._process_chart_motion)
+
+    def _process_chart_motion(self):
+        self._motion_job = None
+        if self._pending_motion is None or not self.chart_pixel_points:
             return
+        x, y = self._pending_motion
+        self._pending_motion = None
 
-        closest = None
-        min_dist_sq = 64  # 8px radius
-        for px, py, price in self.chart_pixel_points:
-            dx = px - event.x
-            dy = py - event.y
-            dist_sq = dx * dx + dy * dy
-            if dist_sq <= min_dist_sq:
-                min_dist_sq = dist_sq
-                closest = (px, py, price)
-
+        closest = self.chart_pixel_points.nearest(x, y, CHART_HOVER_RADIUS)
         if closest is None:
             self._hide_chart_tooltip()
             return
@@ -689,12 +488,13 @@ class TrackerFrame(ttk.Frame):
 
 
     def _hide_chart_tooltip(self):
+        self._pending_motion = None
         if hasattr(self, "chart_tooltip"):
             self.chart_tooltip.place_forget()
 
 
 class App(tb.Window):
-    def __init__(self):
+    def __init__(self, attach: bool = False, watchlist: Optional[list] = None, diagnostics: bool = False, profile_every: Optional[int] = None):
         super().__init__(themename="flatly")  # light & clean; try "cyborg" for dark
         self.title("Steam Market — CS2 Trackers")
         self.geometry("1200x720")
@@ -822,28 +622,117 @@ class App(tb.Window):
             foreground=[("active", "#c5d8ff"), ("pressed", "#c5d8ff")],
         )
 
-        client = SteamMarketClient(appid=APPID, currency=CURRENCY)
-
-        container = ttk.Frame(self, padding=20, style="TrackerFrame.TFrame")
-        container.pack(fill="both", expand=True)
+        STARTUP.mark("window + styles")
+
+        client = SteamMarketClient(appid=APPID, currency=CURRENCY, cache_dir=HTTP_CACHE_DIR)
+        self.scheduler = RefreshScheduler(REFRESH_SECONDS, max_workers=REFRESH_WORKERS, profiler=profiler_from_config(profile_every))
+        self.dispatcher = UiDispatcher(self)
+        self.render_pool = None
+        if CHART_RENDER_MODE == "process":
+            # spawn: forking a process that runs Tk and worker threads is unsafe
+            self.render_pool = ProcessPoolExecutor(CHART_RENDER_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+
+        if watchlist:
+            style.configure("TNotebook", background=neon_bg, borderwidth=0)
+            notebook = ttk.Notebook(self)
+            notebook.pack(fill="both", expand=True)
+            container = ttk.Frame(notebook, padding=20, style="TrackerFrame.TFrame")
+            notebook.add(container, text="Trackers")
+            # rows are built for the visible part only, however long the list is
+            self.watchlist_view = WatchlistView(
+                notebook,
+                watchlist,
+                client,
+                self.scheduler,
+                self.dispatcher,
+                read_only=attach,
+                line_color=ACCENT_COLOR,
+                padding=(20, 12),
+            )
+            notebook.add(self.watchlist_view, text=f"Watchlist ({len(watchlist)})")
+        else:
+            container = ttk.Frame(self, padding=20, style="TrackerFrame.TFrame")
+            container.pack(fill="both", expand=True)
         container.rowconfigure(0, weight=1)
         container.columnconfigure(0, weight=1)
         container.columnconfigure(1, weight=1)
 
-        self.tracker1 = TrackerFrame(container, "Tracker 1", os.getenv("ITEM_URL_1", DEFAULT_URL_1), client)
+        self.tracker1 = TrackerFrame(container, "Tracker 1", os.getenv("ITEM_URL_1", DEFAULT_URL_1), client, self.scheduler, self.dispatcher, read_only=attach, render_pool=self.render_pool)
         self.tracker1.grid(row=0, column=0, sticky="nsew", padx=(0, 18))
 
-        self.tracker2 = TrackerFrame(container, "Tracker 2", os.getenv("ITEM_URL_2", DEFAULT_URL_2), client)
+        self.tracker2 = TrackerFrame(container, "Tracker 2", os.getenv("ITEM_URL_2", DEFAULT_URL_2), client, self.scheduler, self.dispatcher, read_only=attach, render_pool=self.render_pool)
         self.tracker2.grid(row=0, column=1, sticky="nsew", padx=(18, 0))
+        STARTUP.mark("trackers + watchlist")
 
         # Footer
         footer = ttk.Frame(self, padding=(18, 10), style="Footer.TFrame")
         footer.pack(fill="x", side="bottom")
-        ttk.Label(footer, text=f"Auto refresh every {REFRESH_SECONDS}s | Currency={CURRENCY}", style="Footer.TLabel").pack(side="left")
+        mode = " | Attached to collector (read-only)" if attach else ""
+        ttk.Label(footer, text=f"Auto refresh every {REFRESH_SECONDS}s | Currency={CURRENCY}{mode}", style="Footer.TLabel").pack(side="left")
         tb.Button(footer, text="Quit", command=self.destroy, style="Command.Danger.TButton").pack(side="right")
-
-def main():
-    app = App()
+        self.diagnostics_window = None
+        if diagnostics:
+            tb.Button(footer, text="Diagnostics", command=self.open_diagnostics, style="Command.Secondary.TButton").pack(side="right", padx=(0, 12))
+
+        # cached prices and charts are on screen with the first paint
+        self.dispatcher.flush()
+        self.dispatcher.start()
+        self.scheduler.start()
+        self.chart_modules_loaded = threading.Event()
+        self.scheduler.submit(self._preload_chart_modules)
+
+    def open_diagnostics(self):
+        from .diagnostics_view import DiagnosticsWindow
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        self.diagnostics_window = DiagnosticsWindow(self, background=BASE_BACKGROUND)
+
+    def _preload_chart_modules(self):
+        started = time.perf_counter()
+        from . import chart_render  # noqa: F401 - Matplotlib and NumPy
+        STARTUP.record("import matplotlib + numpy", time.perf_counter() - started)
+        self.chart_modules_loaded.set()
+
+    def destroy(self):
+        self.scheduler.stop()
+        self.dispatcher.stop()
+        if self.render_pool is not None:
+            self.render_pool.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Steam Market CS2 tracker GUI")
+    parser.add_argument("--attach", action="store_true", help="display logs written by the headless collector without polling Steam")
+    parser.add_argument("--watchlist", default=WATCHLIST_FILE, help="file with one listing URL or market hash name per line, shown in a Watchlist tab")
+    parser.add_argument("--profile-startup", action="store_true", help="print how long each start-up phase took")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT, help="serve Prometheus metrics on 127.0.0.1:PORT (0: off)")
+    parser.add_argument("--profile-every", type=int, default=None, metavar="N", help="profile every N-th refresh job into PROFILE_DIR (default: PROFILE_EVERY)")
+    parser.add_argument("--diagnostics", action="store_true", help="add a Diagnostics button showing request latency, stage timings and staleness")
+    parser.add_argument("--alerts", default=ALERTS_FILE, help="JSON file with alert rules and sinks (default: ALERTS_FILE)")
+    args = parser.parse_args(argv)
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+    if not args.attach:
+        # attached, the collector logs the samples and evaluates the rules
+        alerts.configure(args.alerts)
+    watchlist = load_watchlist(args.watchlist) if os.path.exists(args.watchlist) else []
+    STARTUP.mark("arguments + watchlist")
+    app = App(attach=args.attach, watchlist=watchlist, diagnostics=args.diagnostics, profile_every=args.profile_every)
+    if args.profile_startup:
+        def report():
+            # wait for the background imports so they show up in the report
+            if app.chart_modules_loaded.is_set():
+                STARTUP.report()
+            else:
+                app.after(50, report)
+
+        def first_paint():
+            STARTUP.mark("first paint")
+            report()
+
+        # idle callbacks run once the initial redraws are done
+        app.after_idle(first_paint)
     app.mainloop()
 
 if __name__ == "__main__":
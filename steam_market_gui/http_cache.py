@@ -0,0 +1,99 @@
+import codecs
+import hashlib
+import json
+import os
+import sys
+import time
+from html.parser import HTMLParser
+from typing import Iterable, Optional, Dict
+
+class HttpCache:
+    """Tiny on-disk HTTP cache keyed by URL.
+
+    Each entry is a body file plus a JSON sidecar holding the ETag and
+    Last-Modified validators, which are replayed as If-None-Match /
+    If-Modified-Since so unchanged resources come back as a bodiless 304.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.json"), os.path.join(self.directory, f"{key}.body")
+
+    def load(self, url: str) -> Optional[Dict]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                meta["body"] = f.read()
+            return meta
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, response_headers, body: bytes):
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            # nothing to revalidate against later
+            return
+        meta_path, body_path = self._paths(url)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "stored_at": time.time()}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for path, data, mode in ((body_path, body, "wb"), (meta_path, json.dumps(meta).encode("utf-8"), "wb")):
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, mode) as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            print("HTTP cache write failed:", e, file=sys.stderr)
+
+class _OgImageParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.og_image: Optional[str] = None
+        self.head_closed = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta" and self.og_image is None:
+            attrs = dict(attrs)
+            if attrs.get("property") == "og:image" and attrs.get("content"):
+                self.og_image = attrs["content"]
+        elif tag == "body":
+            self.head_closed = True
+
+    handle_startendtag = handle_starttag
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.head_closed = True
+
+def extract_og_image(chunks: Iterable[bytes], max_bytes: int = 512 * 1024) -> Optional[str]:
+    """Return the og:image URL from a stream of HTML chunks.
+
+    Parsing stops as soon as the tag is found or </head> is seen, so the
+    caller can drop the rest of the response unread.
+    """
+    parser = _OgImageParser()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    seen = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        seen += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if parser.og_image or parser.head_closed or seen >= max_bytes:
+            break
+    return parser.og_image
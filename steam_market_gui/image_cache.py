@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+import sys
+from typing import Optional
+
+from PIL import Image
+
+class StyledImageCache:
+    """On-disk cache of stylized item images, addressed by content.
+
+    The key hashes the source pixels together with every style parameter,
+    so a cached composite is reused across restarts until either the
+    source image or the styling changes.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @staticmethod
+    def key(source: Image.Image, params: dict) -> str:
+        h = hashlib.sha256()
+        h.update(f"{source.mode}:{source.width}x{source.height}:".encode())
+        h.update(source.tobytes())
+        h.update(json.dumps(params, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with Image.open(path) as im:
+                return im.convert("RGBA")
+        except Exception:
+            return None
+
+    def put(self, key: str, image: Image.Image):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            image.save(tmp_path, format="PNG")
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print("Image cache write failed:", e, file=sys.stderr)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
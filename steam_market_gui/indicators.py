@@ -0,0 +1,216 @@
+"""Rolling indicators of one item's median series: SMA, EMA, standard deviation, VWAP.
+
+Windows count samples (48 samples are four hours at the default refresh).
+Until a window has filled, its values cover the samples seen so far.
+
+`RollingIndicators.update` adds one sample in O(1): the SMA and standard
+deviation share running sums over a deque of the last `window` prices, the
+VWAP keeps running price*volume and volume sums, and the EMA is a single
+value. The running sums are recomputed from the deque once per window,
+so rounding errors cannot pile up over a long session. `backfill`
+computes the same columns for a whole history with NumPy (cumulative sums,
+and a blockwise closed form for the EMA) and leaves the state ready for the
+next `update`.
+
+VWAP weights each median by the volume logged with it (Steam's 24 h sales
+count); samples without a volume carry no weight, and the VWAP is NaN while
+none in the window has one.
+"""
+import math
+from array import array
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+COLUMNS = ("sma", "ema", "std", "vwap")
+# the EMA block length keeps decay**-block within this range, which bounds the rounding error
+_EMA_DYNAMIC_RANGE = 1e6
+
+def _window_sums(values: np.ndarray, window: int):
+    'Sums and sample counts of the trailing `window` values, over fewer at the start.'
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - window, 0)
+    return cumulative[ends] - cumulative[starts], ends - starts
+
+def sma(prices, window: int) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    sums, counts = _window_sums(prices, window)
+    return sums / counts
+
+def rolling_std(prices, window: int) -> np.ndarray:
+    'Population standard deviation of the trailing `window` prices.'
+    prices = np.asarray(prices, dtype=np.float64)
+    if not len(prices):
+        return prices.copy()
+    # centring on the median price keeps the cumulative sums of squares small
+    deviations = prices - np.median(prices)
+    sums, counts = _window_sums(deviations, window)
+    squares, _ = _window_sums(deviations * deviations, window)
+    mean = sums / counts
+    return np.sqrt(np.maximum(squares / counts - mean * mean, 0.0))
+
+def ema(prices, span: int) -> np.ndarray:
+    """Exponential moving average with alpha = 2 / (span + 1), seeded with the first price.
+
+    The series is cut into blocks that are solved in closed form, all at
+    once: within a block y[i] = decay**(i+1) * carry + alpha * sum(decay**(i-j) * x[j]).
+    Only the carry from block to block is a Python loop, over len/block
+    steps.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(prices)
+    if n == 0 or span <= 1:
+        return prices.copy()
+    alpha = 2.0 / (span + 1)
+    decay = 1.0 - alpha
+    block = max(1, min(n, int(math.log(_EMA_DYNAMIC_RANGE) / -math.log(decay))))
+    blocks = -(-n // block)
+    padded = np.zeros(blocks * block)
+    padded[:n] = prices
+    powers = decay ** np.arange(block)
+    local = alpha * powers * np.cumsum(padded.reshape(blocks, block) / powers, axis=1)
+    carry_weights = powers * decay  # decay**(i+1)
+    carries = np.empty(blocks)
+    carry = prices[0]  # alpha * x0 + decay * x0 == x0
+    ends = local[:, -1]
+    last_weight = carry_weights[-1]
+    for k in range(blocks):
+        carries[k] = carry
+        carry = ends[k] + last_weight * carry
+    return (local + carries[:, None] * carry_weights).ravel()[:n]
+
+def vwap(prices, volumes, window: int) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    volumes = np.nan_to_num(np.asarray(volumes, dtype=np.float64))
+    weighted, _ = _window_sums(prices * volumes, window)
+    total, _ = _window_sums(volumes, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, weighted / np.where(total > 0, total, 1.0), np.nan)
+
+class RollingIndicators:
+    def __init__(self, window: int = 48, ema_span: int = 48, vwap_window: int = 288):
+        self.window = max(1, window)
+        self.ema_span = max(1, ema_span)
+        self.vwap_window = max(1, vwap_window)
+        self.reset()
+
+    def reset(self):
+        self.epochs = array("d")
+        self.columns: Dict[str, array] = {name: array("d") for name in COLUMNS}
+        self._prices = deque(maxlen=self.window)
+        self._shift = 0.0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._since_resync = 0
+        self._ema: Optional[float] = None
+        self._flows = deque(maxlen=self.vwap_window)  # (price * volume, volume)
+        self._flow_sum = 0.0
+        self._volume_sum = 0.0
+        self._flow_updates = 0
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def update(self, epoch: float, price: float, volume: Optional[float] = None):
+        'Add the next sample; epochs are expected in increasing order.'
+        prices = self._prices
+        if len(prices) == self.window:
+            dropped = prices[0] - self._shift
+            self._sum -= dropped
+            self._sum_sq -= dropped * dropped
+        prices.append(price)
+        deviation = price - self._shift
+        self._sum += deviation
+        self._sum_sq += deviation * deviation
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self._resync()
+        count = len(prices)
+        mean = self._sum / count
+        self.columns["sma"].append(self._shift + mean)
+        self.columns["std"].append(math.sqrt(max(self._sum_sq / count - mean * mean, 0.0)))
+
+        alpha = 2.0 / (self.ema_span + 1)
+        self._ema = price if self._ema is None else alpha * price + (1.0 - alpha) * self._ema
+        self.columns["ema"].append(self._ema)
+
+        volume = volume if volume and volume > 0 else 0.0
+        flows = self._flows
+        if len(flows) == self.vwap_window:
+            old_flow, old_volume = flows[0]
+            self._flow_sum -= old_flow
+            self._volume_sum -= old_volume
+        flows.append((price * volume, volume))
+        self._flow_sum += price * volume
+        self._volume_sum += volume
+        self._flow_updates += 1
+        if self._flow_updates >= self.vwap_window:
+            self._flow_updates = 0
+            self._flow_sum = math.fsum(flow for flow, _ in flows)
+            self._volume_sum = math.fsum(volume for _, volume in flows)
+        self.columns["vwap"].append(self._flow_sum / self._volume_sum if self._volume_sum > 0 else math.nan)
+        self.epochs.append(epoch)
+
+    def _resync(self):
+        # re-centre on the latest price and recompute the sums exactly
+        self._since_resync = 0
+        self._shift = self._prices[-1]
+        deviations = [price - self._shift for price in self._prices]
+        self._sum = math.fsum(deviations)
+        self._sum_sq = math.fsum(d * d for d in deviations)
+
+    def backfill(self, epochs, prices, volumes=None):
+        'Replace the state with the indicators of a whole history, computed with NumPy.'
+        epochs = np.asarray(epochs, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.zeros_like(prices) if volumes is None else np.nan_to_num(np.asarray(volumes, dtype=np.float64))
+        self.reset()
+        if not len(prices):
+            return
+        computed = {
+            "sma": sma(prices, self.window),
+            "ema": ema(prices, self.ema_span),
+            "std": rolling_std(prices, self.window),
+            "vwap": vwap(prices, volumes, self.vwap_window),
+        }
+        self.epochs = array("d", epochs.tobytes())
+        for name, values in computed.items():
+            self.columns[name] = array("d", values.tobytes())
+        self._prices.extend(prices[-self.window:].tolist())
+        self._resync()
+        self._ema = float(computed["ema"][-1])
+        tail_prices = prices[-self.vwap_window:]
+        tail_volumes = np.maximum(volumes[-self.vwap_window:], 0.0)
+        self._flows.extend(zip((tail_prices * tail_volumes).tolist(), tail_volumes.tolist()))
+        self._flow_sum = math.fsum(flow for flow, _ in self._flows)
+        self._volume_sum = math.fsum(volume for _, volume in self._flows)
+
+    def series(self, start: int = 0, indices=None) -> Dict[str, np.ndarray]:
+        'Columns from sample `start` on, optionally only at `indices` (relative to `start`).'
+        result = {}
+        for name, column in self.columns.items():
+            values = np.array(column[start:], dtype=np.float64)
+            result[name] = values if indices is None else values[indices]
+        return result
+
+    def at(self, epochs) -> Dict[str, np.ndarray]:
+        'Columns at the last sample at or before each epoch (NaN before the first sample).'
+        own = np.array(self.epochs, dtype=np.float64)
+        positions = np.searchsorted(own, np.asarray(epochs, dtype=np.float64), side="right") - 1
+        valid = positions >= 0
+        result = {}
+        for name, column in self.columns.items():
+            values = np.full(len(positions), np.nan)
+            values[valid] = np.array(column, dtype=np.float64)[positions[valid]]
+            result[name] = values
+        return result
+
+def chart_overlays(columns: Dict[str, np.ndarray], band_sigmas: float = 2.0) -> dict:
+    'ChartRenderer overlays from indicator columns: the lines and a band of `band_sigmas` deviations around the SMA.'
+    middle, spread = columns["sma"], band_sigmas * columns["std"]
+    overlays = {"sma": middle, "ema": columns["ema"], "band": (middle - spread, middle + spread)}
+    if not np.all(np.isnan(columns["vwap"])):
+        overlays["vwap"] = columns["vwap"]
+    return overlays
@@ -0,0 +1,174 @@
+"""Neon composite of an item image: glow, highlight and drop shadow on a gradient card.
+
+Independent of Tk, so the GUI's image refresh and the benchmarks use the
+same code. Composites are cached by content in a StyledImageCache.
+"""
+from typing import Optional
+
+from PIL import Image, ImageFilter, ImageOps, ImageChops
+
+from .image_cache import StyledImageCache
+from .metrics import timed_stage
+
+ITEM_IMAGE_SIZE = (220, 220)
+ITEM_IMAGE_PAD = 48
+# bump when ItemStyler.stylize changes so cached composites are regenerated
+ITEM_STYLE_VERSION = 1
+
+class ItemStyler:
+    def __init__(
+        self,
+        accent_color: str = "#58b4ff",
+        secondary_accent: str = "#5e7cff",
+        background: str = "#050b18",
+        cache: Optional[StyledImageCache] = None,
+    ):
+        self.accent_color = accent_color
+        self.secondary_accent = secondary_accent
+        self.background = background
+        self.cache = cache
+
+    def styled(self, pil_img: Image.Image) -> Image.Image:
+        'The composite of an item image, from the cache when the source and style are unchanged.'
+        params = {
+            "version": ITEM_STYLE_VERSION,
+            "accent": self.accent_color,
+            "secondary_accent": self.secondary_accent,
+            "background": self.background,
+            "size": ITEM_IMAGE_SIZE,
+            "pad": ITEM_IMAGE_PAD,
+        }
+        if self.cache is None:
+            return self.stylize(pil_img)
+        key = self.cache.key(pil_img, params)
+        styled = self.cache.get(key)
+        if styled is None:
+            styled = self.stylize(pil_img)
+            self.cache.put(key, styled)
+        return styled
+
+    @timed_stage("stylize_item_image")
+    def stylize(self, pil_img: Image.Image) -> Image.Image:
+        base = ImageOps.contain(pil_img.convert("RGBA"), ITEM_IMAGE_SIZE)
+        alpha = base.split()[-1]
+
+        pad = ITEM_IMAGE_PAD
+        canvas_size = (base.width + pad * 2, base.height + pad * 2)
+
+        mask_canvas = Image.new("L", canvas_size, 0)
+        mask_canvas.paste(alpha, (pad, pad))
+
+        glow_mask = mask_canvas.filter(ImageFilter.GaussianBlur(radius=28))
+        glow_mask = ImageOps.autocontrast(glow_mask, cutoff=6)
+        glow_mask = glow_mask.filter(ImageFilter.GaussianBlur(radius=6))
+        glow_mask = self._scale_mask(glow_mask, 0.55)
+
+        highlight_mask = mask_canvas.filter(ImageFilter.GaussianBlur(radius=10))
+        highlight_mask = ImageOps.autocontrast(highlight_mask, cutoff=14)
+        highlight_mask = highlight_mask.filter(ImageFilter.GaussianBlur(radius=3))
+        highlight_mask = self._scale_mask(highlight_mask, 0.45)
+
+        shadow_mask = ImageChops.offset(mask_canvas, 0, 16)
+        shadow_mask = ImageOps.autocontrast(shadow_mask, cutoff=6)
+        shadow_mask = shadow_mask.filter(ImageFilter.GaussianBlur(radius=20))
+        shadow_mask = self._scale_mask(shadow_mask, 0.7)
+
+        background = self._create_background_gradient(canvas_size)
+        composite = background.convert("RGBA")
+
+        accent_rgb = self._hex_to_rgb(self.secondary_accent)
+        primary_rgb = self._dominant_color(base)
+
+        glow_color = self._mix_colors(primary_rgb, accent_rgb, 0.2)
+        glow_color = self._mix_colors(glow_color, (255, 255, 255), 0.15)
+
+        glow_layer = Image.new("RGBA", canvas_size, (*glow_color, 0))
+        glow_layer.putalpha(glow_mask)
+
+        highlight_color = self._mix_colors(primary_rgb, accent_rgb, 0.25)
+        highlight_color = self._mix_colors(highlight_color, (255, 255, 255), 0.35)
+        highlight_layer = Image.new("RGBA", canvas_size, (*highlight_color, 0))
+        highlight_layer.putalpha(highlight_mask)
+
+        shadow_layer = Image.new("RGBA", canvas_size, (10, 14, 28, 0))
+        shadow_layer.putalpha(shadow_mask)
+
+        composite.alpha_composite(shadow_layer)
+        composite.alpha_composite(glow_layer)
+        composite.alpha_composite(highlight_layer)
+        composite.alpha_composite(base, (pad, pad))
+
+        border_accent = tuple(list(accent_rgb) + [120])
+        composite = ImageOps.expand(composite, border=2, fill=border_accent)
+        composite = ImageOps.expand(
+            composite,
+            border=4,
+            fill=(*self._hex_to_rgb(self.background), 255),
+        )
+
+        return composite
+
+    def _scale_mask(self, mask: Image.Image, factor: float) -> Image.Image:
+        factor = max(0.0, factor)
+        return mask.point(lambda v: min(255, int(v * factor)))
+
+    def _dominant_color(self, image: Image.Image) -> tuple[int, int, int]:
+        thumb = image.copy()
+        if thumb.mode not in ("RGB", "RGBA"):
+            thumb = thumb.convert("RGBA")
+        thumb = thumb.resize((1, 1), Image.LANCZOS)
+        pixel = thumb.getpixel((0, 0))
+        r, g, b = pixel[:3]
+        accent_rgb = self._hex_to_rgb(self.accent_color)
+        blended = []
+        for idx, component in enumerate((r, g, b)):
+            mixed = int(component * 0.55 + accent_rgb[idx] * 0.45 + 25)
+            blended.append(min(255, mixed))
+        brightness = max(blended)
+        if brightness < 120:
+            boost = 120 - brightness
+            blended = [min(255, c + boost) for c in blended]
+        return tuple(blended)
+
+    def _hex_to_rgb(self, hex_color: str) -> tuple[int, int, int]:
+        hex_color = hex_color.lstrip("#")
+        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+    def _create_background_gradient(self, size: tuple[int, int]) -> Image.Image:
+        width, height = size
+        gradient = Image.linear_gradient("L").rotate(90, expand=True)
+        gradient = gradient.resize((width, height), Image.BICUBIC)
+
+        base_rgb = self._hex_to_rgb(self.background)
+        accent_rgb = self._hex_to_rgb(self.secondary_accent)
+        deep_tone = self._mix_colors(base_rgb, accent_rgb, 0.15)
+        light_tone = self._mix_colors(base_rgb, (240, 240, 255), 0.18)
+
+        colored = ImageOps.colorize(
+            gradient,
+            black=self._rgb_to_hex(deep_tone),
+            white=self._rgb_to_hex(light_tone),
+        )
+        vignette = Image.linear_gradient("L")
+        vignette = vignette.resize((width, height), Image.BICUBIC)
+        vignette = ImageOps.invert(vignette)
+        vignette = vignette.filter(ImageFilter.GaussianBlur(radius=24))
+
+        vignette_layer = Image.new("RGBA", (width, height), (*base_rgb, 0))
+        vignette_layer.putalpha(vignette)
+
+        background = colored.convert("RGBA")
+        background.alpha_composite(vignette_layer)
+        return background
+
+    def _mix_colors(
+        self, rgb_a: tuple[int, int, int], rgb_b: tuple[int, int, int], ratio: float
+    ) -> tuple[int, int, int]:
+        ratio = max(0.0, min(1.0, ratio))
+        mixed = []
+        for a, b in zip(rgb_a, rgb_b):
+            mixed.append(int(a * (1 - ratio) + b * ratio))
+        return tuple(mixed)
+
+    def _rgb_to_hex(self, rgb: tuple[int, int, int]) -> str:
+        return "#" + "".join(f"{component:02x}" for component in rgb)
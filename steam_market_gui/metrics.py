@@ -0,0 +1,260 @@
+"""In-process counters and latency histograms, exported as Prometheus text.
+
+Recording is a dict lookup and a few additions under a lock, cheap enough
+for every request and every chart render. `serve(port)` exposes the
+registry on http://127.0.0.1:{port}/metrics (enabled with METRICS_PORT);
+the GUI's diagnostics window reads the same objects.
+"""
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+# seconds; covers a cached 304 as well as a request stuck behind a 429 cool-down
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def expose(self):
+        for key, value in sorted(self.values().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        # counts are per bucket here and only made cumulative on export
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def series(self) -> Dict[Tuple[str, ...], list]:
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def summary(self, key: Tuple[str, ...]) -> Optional[dict]:
+        'Count, mean and bucket-interpolated p50/p95 of one label combination.'
+        series = self.series().get(key)
+        if series is None:
+            return None
+        counts, total = series[:-1], series[-1]
+        count = sum(counts)
+        if not count:
+            return None
+        return {
+            "count": count,
+            "mean": total / count,
+            "p50": self._quantile(counts, count, 0.5),
+            "p95": self._quantile(counts, count, 0.95),
+        }
+
+    def _quantile(self, counts, count: int, q: float) -> float:
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def expose(self):
+        for key, series in sorted(self.series().items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += n
+                le = 'le="%s"' % _format_value(bound)
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+class Staleness:
+    """Time of the last successful sample per item, exported as its age."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._last: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, item: str, epoch: Optional[float] = None):
+        with self._lock:
+            self._last[item] = max(self._last.get(item, 0.0), time.time() if epoch is None else epoch)
+
+    def ages(self) -> Dict[str, float]:
+        now = time.time()
+        with self._lock:
+            return {item: max(0.0, now - last) for item, last in self._last.items()}
+
+    def expose(self):
+        for item, age in sorted(self.ages().items()):
+            yield f'{self.name}{{item="{_escape(item)}"}} {age:.1f}'
+
+class Gauge:
+    """Current values of state owned elsewhere, read from a callback on export."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._source: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+
+    def set_source(self, source: Callable[[], Dict[Tuple[str, ...], float]]):
+        'Register the callback returning {label values: value}.'
+        self._source = source
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        return dict(self._source()) if self._source is not None else {}
+
+    def expose(self):
+        for key, value in sorted(self.values().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+STEAM_REQUESTS = REGISTRY.register(Counter(
+    "steam_requests_total", "Steam HTTP responses by endpoint and status code (error: no response)", ("endpoint", "status")
+))
+STEAM_LATENCY = REGISTRY.register(Histogram(
+    "steam_request_seconds", "Latency of single Steam HTTP attempts, retries counted separately", ("endpoint",)
+))
+STEAM_RATE_WAIT = REGISTRY.register(Histogram(
+    "steam_rate_limit_wait_seconds", "Time requests waited for the shared rate limiter (incl. 429 cool-downs)"
+))
+STEAM_RATE_BUDGET = REGISTRY.register(Gauge(
+    "steam_rate_budget", "Shared rate limiter: tokens left, capacity, refill per minute and seconds of 429 cool-down left", ("field",)
+))
+ITEM_STALENESS = REGISTRY.register(Staleness(
+    "item_staleness_seconds", "Seconds since the last successfully logged price of an item"
+))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "stage_seconds", "Time spent in refresh stages (plot_chart, render_chart, stylize_item_image, ...)", ("stage",)
+))
+SCHEDULER_LAG = REGISTRY.register(Histogram(
+    "scheduler_lag_seconds", "How late refresh jobs started relative to their due time"
+))
+
+def endpoint_label(url: str) -> str:
+    'Short, bounded label for a request URL.'
+    parsed = urlparse(url)
+    path = parsed.path
+    if path.startswith("/market/priceoverview"):
+        return "priceoverview"
+    if path.startswith("/market/search/render"):
+        return "search_render"
+    if path.startswith("/market/listings/"):
+        return "listing"
+    return "image" if "steamstatic" in parsed.netloc or "/economy/image/" in path else "other"
+
+def timed_stage(stage: str):
+    'Decorator recording the run time of a function under STAGE_SECONDS{stage=...}.'
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with STAGE_SECONDS.time(stage=stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = REGISTRY.expose().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def serve(port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    'Serve /metrics from a daemon thread; returns None if the port is unavailable.'
+    try:
+        server = ThreadingHTTPServer((host, port), _Handler)
+    except OSError as e:
+        print(f"Metrics endpoint on {host}:{port} unavailable:", e, file=sys.stderr)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
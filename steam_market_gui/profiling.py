@@ -0,0 +1,160 @@
+"""Opt-in profiling of every N-th refresh cycle (PROFILE_EVERY or --profile-every).
+
+A sampled cycle runs under cProfile. Afterwards a tracemalloc snapshot is
+compared with the previous sample, and live objects are counted by type.
+Allocation tracing starts with the first sample. Import-time allocations
+therefore never enter the snapshots; tracing all of them (Matplotlib
+alone is ~270k blocks) made each comparison take seconds. Each sample
+writes to PROFILE_DIR:
+
+    {time}-cycle-000040.prof        pstats data (python -m pstats, snakeviz)
+    {time}-cycle-000040.txt         top functions by cumulative time
+    {time}-cycle-000040.alloc.txt   allocation sites that grew since the previous sample
+
+Only the newest PROFILE_KEEP samples are kept. `growth.txt` is rewritten on
+every sample and compares against the first one: the allocation sites and
+object types (PhotoImage, Figure, ...) that kept growing over the session.
+"""
+import cProfile
+import gc
+import glob
+import io
+import linecache
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Hashable, Optional
+
+TRACE_FRAMES = 8
+TOP_FUNCTIONS = 40
+TOP_SITES = 25
+
+# tracemalloc's own bookkeeping and the import machinery are noise here
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+def _object_counts() -> Counter:
+    return Counter(type(obj).__qualname__ for obj in gc.get_objects())
+
+class CycleProfiler:
+    def __init__(self, directory: str, every: int, keep: int = 20):
+        self.directory = directory
+        self.every = max(1, every)
+        self.keep = max(1, keep)
+        self._cycles = 0
+        self._lock = threading.Lock()
+        # one sample at a time; cycles overlapping it run unprofiled
+        self._sampling = threading.Lock()
+        self._first_snapshot = None
+        self._last_snapshot = None
+        self._first_counts: Optional[Counter] = None
+        self._started = time.time()
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def cycle(self, label: Hashable = ""):
+        'Wrap one refresh cycle; every `every`-th one is profiled.'
+        with self._lock:
+            self._cycles += 1
+            number = self._cycles
+        if number % self.every or not self._sampling.acquire(blocking=False):
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+        finally:
+            # written even if the cycle raised; its exception still propagates
+            try:
+                self._write_sample(number, label, profile)
+            except Exception as e:
+                print("Profiling sample failed:", e, file=sys.stderr)
+            finally:
+                self._sampling.release()
+
+    def _write_sample(self, number: int, label: Hashable, profile: cProfile.Profile):
+        # time first: names sort chronologically across sessions, whose cycle numbers restart
+        base = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-cycle-{number:06d}")
+        profile.dump_stats(base + ".prof")
+        out = io.StringIO()
+        stats = pstats.Stats(profile, stream=out)
+        stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(f"cycle {number} ({label})\n")
+            f.write(out.getvalue())
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        snapshot = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+        counts = _object_counts()
+        with open(base + ".alloc.txt", "w", encoding="utf-8") as f:
+            current, peak = tracemalloc.get_traced_memory()
+            f.write(f"traced memory: {current / 1e6:.1f} MB (peak {peak / 1e6:.1f} MB)\n\n")
+            if self._last_snapshot is None:
+                f.write("first sample: allocation tracing starts here, growth is reported from the next one\n")
+            else:
+                f.write("growth since the previous sample:\n")
+                for stat in snapshot.compare_to(self._last_snapshot, "lineno")[:TOP_SITES]:
+                    f.write(f"{stat}\n")
+        if self._first_snapshot is None:
+            self._first_snapshot = snapshot
+            self._first_counts = counts
+        else:
+            self._write_growth(number, snapshot, counts)
+        self._last_snapshot = snapshot
+        self._rotate()
+
+    def _write_growth(self, number: int, snapshot, counts: Counter):
+        minutes = (time.time() - self._started) / 60
+        lines = [f"after {number} cycles ({minutes:.0f} min), compared with the first sample", ""]
+        lines.append("allocation sites by growth:")
+        for stat in snapshot.compare_to(self._first_snapshot, "traceback")[:TOP_SITES]:
+            if stat.size_diff <= 0:
+                break
+            lines.append(f"+{stat.size_diff / 1024:.1f} KiB (+{stat.count_diff} blocks), now {stat.size / 1024:.1f} KiB")
+            lines.extend(f"    {line}" for line in stat.traceback.format(limit=4))
+        lines.append("")
+        lines.append("object types by growth:")
+        growth = counts.copy()
+        growth.subtract(self._first_counts)
+        for name, diff in growth.most_common(TOP_SITES):
+            if diff <= 0:
+                break
+            lines.append(f"  {name:<40} +{diff:<8} now {counts[name]}")
+        tmp_path = os.path.join(self.directory, f"growth.txt.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, os.path.join(self.directory, "growth.txt"))
+
+    def _rotate(self):
+        samples = sorted(glob.glob(os.path.join(self.directory, "*-cycle-*.prof")))
+        for path in samples[:-self.keep]:
+            base = path[: -len(".prof")]
+            for suffix in (".prof", ".txt", ".alloc.txt"):
+                try:
+                    os.remove(base + suffix)
+                except FileNotFoundError:
+                    pass
+
+def from_config(every: Optional[int] = None) -> Optional[CycleProfiler]:
+    'The profiler configured by PROFILE_EVERY (or `every`), or None when profiling is off.'
+    from .config import PROFILE_DIR, PROFILE_EVERY, PROFILE_KEEP
+    every = PROFILE_EVERY if every is None else every
+    if every <= 0:
+        return None
+    print(f"Profiling every {every}th refresh cycle into {PROFILE_DIR}", file=sys.stderr)
+    return CycleProfiler(PROFILE_DIR, every, PROFILE_KEEP)
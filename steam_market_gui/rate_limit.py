@@ -0,0 +1,132 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from .metrics import STEAM_RATE_BUDGET
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Thread-safe token bucket with a process-wide cool-down for HTTP 429.
+
+    Every request takes one token. Tokens refill at `rate_per_minute` up to
+    `burst`. A 429 response pauses the whole bucket (see `throttle`), and the
+    pause grows exponentially while Steam keeps answering 429.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, base_delay: float = 5.0, max_delay: float = 300.0):
+        self.rate = max(rate_per_minute, 0.001) / 60.0
+        self.capacity = max(1, burst)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._strikes = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        'Take one token and return how many seconds the caller must wait before using it.'
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(0.0, self._blocked_until - now)
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    def blocked_for(self) -> float:
+        with self._lock:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+    def acquire(self):
+        wait = self.reserve()
+        while wait > 0:
+            time.sleep(wait)
+            # a 429 elsewhere may have extended the cool-down while we slept
+            wait = self.blocked_for()
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self.blocked_for()
+
+    def throttle(self, retry_after: Optional[float] = None) -> float:
+        'Record a 429 and pause all requests; returns the chosen delay in seconds.'
+        with self._lock:
+            if retry_after is not None:
+                delay = min(self.max_delay, retry_after)
+            else:
+                delay = backoff_delay(self._strikes, self.base_delay, self.max_delay)
+            self._strikes += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            return delay
+
+    def succeeded(self):
+        with self._lock:
+            self._strikes = 0
+
+    def budget(self) -> dict:
+        'Snapshot of the remaining request budget.'
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "tokens": max(0.0, self._tokens),
+                "capacity": self.capacity,
+                "rate_per_minute": self.rate * 60.0,
+                "blocked_for": max(0.0, self._blocked_until - now),
+                "strikes": self._strikes,
+            }
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    'Exponential backoff with "equal jitter": half fixed, half random.'
+    ceiling = min(cap, base * (2 ** attempt))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    'Parse a Retry-After header given either as seconds or as an HTTP date.'
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def _budget_gauge():
+    budget = _shared_limiter.budget()
+    return {(field,): budget[field] for field in ("tokens", "capacity", "rate_per_minute", "blocked_for")}
+
+_shared_limiter: Optional[TokenBucket] = None
+_shared_lock = threading.Lock()
+
+def shared_limiter() -> TokenBucket:
+    'The process-wide limiter every Steam request goes through (configured from the environment on first use).'
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = TokenBucket(
+                rate_per_minute=float(os.getenv("STEAM_RATE_PER_MINUTE", "20")),
+                burst=int(os.getenv("STEAM_RATE_BURST", "5")),
+            )
+            STEAM_RATE_BUDGET.set_source(_budget_gauge)
+        return _shared_limiter
@@ -0,0 +1,173 @@
+"""Hourly and daily OHLC rollups of a price log.
+
+Each resolution lives in a CSV sidecar next to the raw log
+(`{slug}.csv.1h`, `{slug}.csv.1d`) with one row per bucket:
+
+    bucket_epoch,open,high,low,close,volume,samples
+
+open/high/low/close describe the median price within the bucket and
+volume is the last 24h volume Steam reported in it. Only the newest
+(still open) bucket ever changes, so an update rewrites just the last row
+in place; every earlier row is final. A rebuild keeps rows older than its
+first sample, so buckets whose raw rows were archived by compaction survive.
+Only the writer repairs a torn last row; a `read_only` series skips it.
+"""
+import csv
+import io
+import os
+import threading
+from typing import Iterable, Optional, List, Tuple
+
+ROLLUP_FIELDS = ["bucket_epoch", "open", "high", "low", "close", "volume", "samples"]
+ROLLUP_RESOLUTIONS = {"1h": 3600, "1d": 86400}
+
+def _format_row(row: list) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(["" if value is None else value for value in row])
+    return buf.getvalue().encode("utf-8")
+
+def _parse_row(line: bytes) -> Optional[list]:
+    parts = line.decode("utf-8", errors="replace").strip().split(",")
+    if len(parts) != len(ROLLUP_FIELDS):
+        return None
+    try:
+        volume = int(parts[5]) if parts[5] else None
+        return [int(parts[0]), float(parts[1]), float(parts[2]), float(parts[3]), float(parts[4]), volume, int(parts[6])]
+    except ValueError:
+        return None
+
+def _fold(row: list, price: float, volume: Optional[int]):
+    row[2] = max(row[2], price)
+    row[3] = min(row[3], price)
+    row[4] = price
+    if volume is not None:
+        row[5] = volume
+    row[6] += 1
+
+class RollupSeries:
+    def __init__(self, path: str, seconds: int, read_only: bool = False):
+        self.path = path
+        self.seconds = seconds
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._open: Optional[list] = None   # the newest bucket row
+        self._open_offset = 0               # where that row starts in the file
+        self._inode = None
+
+    def _load(self):
+        if self._loaded:
+            try:
+                if os.stat(self.path).st_ino == self._inode:
+                    return
+            except OSError:
+                pass
+            # replaced by a rebuild in another process
+            self._loaded = False
+        if not os.path.exists(self.path):
+            if self.read_only:
+                self._open = None
+                return
+            with open(self.path, "wb") as f:
+                f.write(_format_row(ROLLUP_FIELDS))
+        with open(self.path, "rb" if self.read_only else "r+b") as f:
+            header_end = len(f.readline())
+            size = f.seek(0, os.SEEK_END)
+            # rows are short, the last one is always within the final few KB
+            pos = max(header_end, size - 4096)
+            f.seek(pos)
+            tail = f.read()
+            offset = pos + tail[:-1].rfind(b"\n") + 1
+            last = tail[offset - pos:]
+            row = _parse_row(last) if last.strip() else None
+            if last.strip() and (row is None or not last.endswith(b"\n")):
+                # torn write of the open bucket, or one in progress in the writer;
+                # the writer truncates it and PriceLogger rebuilds it from the raw log
+                if not self.read_only:
+                    f.truncate(offset)
+                row = None
+        self._open = row
+        self._open_offset = offset if row is not None else os.path.getsize(self.path)
+        self._inode = os.stat(self.path).st_ino
+        # a reader looks again next time, the writer may have finished the row
+        self._loaded = not self.read_only
+
+    def last_bucket(self) -> Optional[int]:
+        with self._lock:
+            self._load()
+            return self._open[0] if self._open else None
+
+    def first_bucket(self) -> Optional[int]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            f.readline()
+            line = f.readline()
+        row = _parse_row(line) if line.endswith(b"\n") else None
+        return row[0] if row else None
+
+    def update(self, epoch: float, price: float, volume: Optional[int]):
+        'Fold one sample into its bucket, appending a row or rewriting the open one.'
+        if self.read_only:
+            raise ValueError(f"{self.path} is opened read-only")
+        bucket = int(epoch // self.seconds) * self.seconds
+        with self._lock:
+            self._load()
+            row = self._open
+            if row is not None and bucket < row[0]:
+                return  # closed buckets are final
+            if row is not None and bucket == row[0]:
+                _fold(row, price, volume)
+                offset = self._open_offset
+            else:
+                row = [bucket, price, price, price, price, volume, 1]
+                offset = os.path.getsize(self.path)
+            with open(self.path, "r+b") as f:
+                f.seek(offset)
+                f.write(_format_row(row))
+                f.truncate()
+            self._open = row
+            self._open_offset = offset
+
+    def rebuild(self, samples: Iterable[Tuple[float, float, Optional[int]]]):
+        'Recompute every bucket from the first sample on from (epoch, price, volume) samples in time order.'
+        if self.read_only:
+            raise ValueError(f"{self.path} is opened read-only")
+        rows: List[list] = []
+        for epoch, price, volume in samples:
+            bucket = int(epoch // self.seconds) * self.seconds
+            if rows and bucket == rows[-1][0]:
+                _fold(rows[-1], price, volume)
+            elif not rows or bucket > rows[-1][0]:
+                rows.append([bucket, price, price, price, price, volume, 1])
+        kept = self.read(end_epoch=rows[0][0] - 1) if rows else self.read()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_format_row(ROLLUP_FIELDS))
+            for row in kept:
+                f.write(_format_row(row))
+            for row in rows:
+                f.write(_format_row(row))
+        with self._lock:
+            os.replace(tmp_path, self.path)
+            self._loaded = False
+
+    def read(self, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None) -> List[list]:
+        'Bucket rows overlapping [start_epoch, end_epoch], oldest first.'
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as f:
+            f.readline()
+            data = f.read()
+        rows = []
+        # a concurrent update may be rewriting the last row; skip it while unterminated
+        for line in data.split(b"\n")[:-1]:
+            row = _parse_row(line)
+            if row is None:
+                continue
+            if start_epoch is not None and row[0] + self.seconds <= start_epoch:
+                continue
+            if end_epoch is not None and row[0] > end_epoch:
+                break
+            rows.append(row)
+        return rows
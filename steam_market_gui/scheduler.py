@@ -0,0 +1,119 @@
+import heapq
+import itertools
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+from .metrics import SCHEDULER_LAG
+
+class RefreshScheduler:
+    """One timer for every periodic refresh in the process.
+
+    Jobs sit in a heap ordered by their next due time. A single dispatcher
+    thread pops due jobs and hands them to a bounded worker pool. A job is
+    never in flight twice: its next run is only scheduled once the current
+    one finishes, so load stays linear in the number of jobs.
+    """
+
+    def __init__(self, interval: float, max_workers: int = 4, profiler=None):
+        self.interval = interval
+        # optional profiling.CycleProfiler wrapped around periodic job runs
+        self.profiler = profiler
+        self._heap = []  # (due, seq, key)
+        self._seq = itertools.count()
+        self._jobs: Dict[Hashable, Callable[[], None]] = {}
+        self._intervals: Dict[Hashable, float] = {}
+        self._due: Dict[Hashable, float] = {}
+        self._in_flight = set()
+        self._rerun = set()
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="refresh")
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._dispatch_loop, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def add(self, key: Hashable, callback: Callable[[], None], delay: float = 0.0, interval: Optional[float] = None):
+        'Register a periodic job; the first run happens after `delay` seconds.'
+        with self._cond:
+            self._jobs[key] = callback
+            self._intervals[key] = self.interval if interval is None else interval
+            self._push(key, time.monotonic() + delay)
+
+    def remove(self, key: Hashable):
+        with self._cond:
+            self._jobs.pop(key, None)
+            self._intervals.pop(key, None)
+            self._due.pop(key, None)
+            self._rerun.discard(key)
+
+    def trigger(self, key: Hashable):
+        'Run a job as soon as possible; if it is already running, run it again right after.'
+        with self._cond:
+            if key not in self._jobs:
+                return
+            if key in self._in_flight:
+                self._rerun.add(key)
+            else:
+                self._push(key, time.monotonic())
+
+    def submit(self, fn: Callable, *args):
+        'Run a one-off task on the shared worker pool.'
+        return self._pool.submit(fn, *args)
+
+    def _push(self, key: Hashable, due: float):
+        # older heap entries for the key become stale and are skipped on pop
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, next(self._seq), key))
+        self._cond.notify()
+
+    def _dispatch_loop(self):
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, key = self._heap[0]
+                now = time.monotonic()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                heapq.heappop(self._heap)
+                if self._due.get(key) != due or key in self._in_flight:
+                    continue
+                del self._due[key]
+                SCHEDULER_LAG.observe(now - due)
+                self._in_flight.add(key)
+                try:
+                    self._pool.submit(self._run, key, self._jobs[key])
+                except RuntimeError:
+                    # pool shut down
+                    return
+
+    def _run(self, key: Hashable, callback: Callable[[], None]):
+        try:
+            with self.profiler.cycle(key) if self.profiler is not None else nullcontext():
+                callback()
+        except Exception as e:
+            print("Refresh job failed:", key, e, file=sys.stderr)
+        finally:
+            with self._cond:
+                self._in_flight.discard(key)
+                if key in self._jobs:
+                    if key in self._rerun:
+                        self._rerun.discard(key)
+                        self._push(key, time.monotonic())
+                    else:
+                        self._push(key, time.monotonic() + self._intervals[key])
@@ -0,0 +1,233 @@
+"""SQLite price store shared by every tracked item.
+
+One WAL-mode database holds all samples, keyed by (item, epoch). Writers
+from any thread hand rows to a single background thread that commits them
+in batches (group commit), while readers (GUI, exports) query the database
+concurrently without blocking the writer. A `read_only` store (a GUI
+attached to a collector) opens the database with `mode=ro` and has no
+writer thread.
+"""
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+from urllib.request import pathname2url
+
+from .utils import parse_volume
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    item TEXT NOT NULL,
+    epoch INTEGER NOT NULL,
+    median REAL,
+    lowest REAL,
+    volume INTEGER,
+    PRIMARY KEY (item, epoch)
+) WITHOUT ROWID;
+"""
+INSERT_SQL = "INSERT OR REPLACE INTO prices (item, epoch, median, lowest, volume) VALUES (?, ?, ?, ?, ?)"
+# a busy or locked database is retried before the batch is given up
+WRITE_ATTEMPTS = 3
+
+def _connect(path: str, read_only: bool = False) -> sqlite3.Connection:
+    if read_only:
+        # no WAL switch or schema here: the writer's process owns the file
+        return sqlite3.connect(f"file:{pathname2url(path)}?mode=ro", uri=True, timeout=30, check_same_thread=False)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def _row_to_dict(epoch: int, median, lowest, volume) -> Dict[str, Any]:
+    ts = datetime.fromtimestamp(epoch, tz=timezone.utc).astimezone()
+    return {
+        "timestamp_iso": ts.isoformat(timespec="seconds"),
+        "timestamp": ts,
+        "epoch_s": float(epoch),
+        "median_price": median,
+        "lowest_price": lowest,
+        "volume": "" if volume is None else str(volume),
+    }
+
+class SqliteStore:
+    """Owns the database file, the batching writer thread and a read connection per thread."""
+
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 0.5, read_only: bool = False):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.read_only = read_only
+        self._local = threading.local()
+        if read_only:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with closing(_connect(self.path)) as conn:
+            conn.executescript(SCHEMA)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="sqlite-writer", daemon=True)
+        self._writer.start()
+
+    def _reader(self) -> Optional[sqlite3.Connection]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.read_only and not os.path.exists(self.path):
+                return None  # the collector has not created it yet
+            conn = self._local.conn = _connect(self.path, self.read_only)
+        return conn
+
+    def _query(self, sql: str, params=()) -> list:
+        conn = self._reader()
+        if conn is None:
+            return []
+        try:
+            return conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError:
+            if self.read_only:
+                return []  # created but its schema not committed yet
+            raise
+
+    def put(self, item: str, epoch: int, median: Optional[float], lowest: Optional[float], volume: Optional[int]):
+        if self.read_only:
+            raise ValueError(f"{self.path} is opened read-only")
+        self._queue.put((item, epoch, median, lowest, volume))
+
+    def flush(self, timeout: Optional[float] = None):
+        'Block until every row queued so far is committed.'
+        if self.read_only:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # gather whatever else arrives shortly after into the same transaction;
+            # a flush request ends the batch, so flushing an idle queue returns at once
+            while len(batch) < self.batch_size and not isinstance(batch[-1], threading.Event):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            rows = [entry for entry in batch if not isinstance(entry, threading.Event)]
+            if rows:
+                self._commit(conn, rows)
+            for entry in batch:
+                if isinstance(entry, threading.Event):
+                    entry.set()
+
+    def _commit(self, conn: sqlite3.Connection, rows: list):
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                with conn:
+                    conn.executemany(INSERT_SQL, rows)
+                return
+            except sqlite3.OperationalError as e:
+                if attempt == WRITE_ATTEMPTS:
+                    print(f"SQLite write failed, dropped {len(rows)} rows:", e, file=sys.stderr)
+                    return
+                print(f"SQLite write failed (attempt {attempt}/{WRITE_ATTEMPTS}), retrying:", e, file=sys.stderr)
+                time.sleep(0.2 * attempt)
+            except sqlite3.Error as e:
+                # not transient; keep the rows that can be stored
+                print(f"SQLite batch write failed, writing {len(rows)} rows one by one:", e, file=sys.stderr)
+                break
+        for row in rows:
+            try:
+                with conn:
+                    conn.execute(INSERT_SQL, row)
+            except sqlite3.Error as e:
+                print("SQLite write failed, dropped row:", row, e, file=sys.stderr)
+
+    def range(self, item: str, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None, limit: Optional[int] = None):
+        sql = "SELECT epoch, median, lowest, volume FROM prices WHERE item = ?"
+        params: list = [item]
+        if start_epoch is not None:
+            sql += " AND epoch >= ?"
+            params.append(start_epoch)
+        if end_epoch is not None:
+            sql += " AND epoch <= ?"
+            params.append(end_epoch)
+        sql += " ORDER BY epoch"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, params)
+
+    def latest(self, item: str):
+        rows = self._query(
+            "SELECT epoch, median, lowest, volume FROM prices WHERE item = ? ORDER BY epoch DESC LIMIT 1",
+            (item,),
+        )
+        return rows[0] if rows else None
+
+    def items(self) -> List[str]:
+        return [item for item, in self._query("SELECT DISTINCT item FROM prices ORDER BY item")]
+
+    def latest_per_item(self) -> Dict[str, Dict[str, Any]]:
+        'Most recent sample of every item in one query, answered from the primary-key index.'
+        rows = self._query(
+            "SELECT p.item, p.epoch, p.median, p.lowest, p.volume FROM prices p "
+            "JOIN (SELECT item, MAX(epoch) AS epoch FROM prices GROUP BY item) last "
+            "ON p.item = last.item AND p.epoch = last.epoch"
+        )
+        return {item: _row_to_dict(epoch, median, lowest, volume) for item, epoch, median, lowest, volume in rows}
+
+_stores: Dict[tuple, SqliteStore] = {}
+_stores_lock = threading.Lock()
+
+def get_store(path: str, read_only: bool = False) -> SqliteStore:
+    'One store (and writer thread) per database file in the process.'
+    key = (os.path.abspath(path), read_only)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = SqliteStore(key[0], read_only=read_only)
+        return _stores[key]
+
+class SqlitePriceLogger:
+    """PriceLogger-compatible view of one item inside a shared SqliteStore."""
+
+    def __init__(self, path: str, item: str, read_only: bool = False):
+        self.path = path
+        self.item = item
+        self.read_only = read_only
+        self.store = get_store(path, read_only)
+
+    def append(self, median: Optional[float], lowest: Optional[float], volume: Optional[str]):
+        """Queue a price snapshot; it is committed with the next batch."""
+        if self.read_only:
+            raise ValueError(f"{self.path} is opened read-only")
+        self.store.put(self.item, round(time.time()), median, lowest, parse_volume(volume))
+
+    def range(self, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return rows with start_epoch <= epoch_s <= end_epoch via the primary-key index."""
+        return [_row_to_dict(*row) for row in self.store.range(self.item, start_epoch, end_epoch)]
+
+    def median_series(self, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None):
+        """Return (epochs, medians) for logged samples that have a median price."""
+        ts = []
+        med = []
+        for epoch, median, _, _ in self.store.range(self.item, start_epoch, end_epoch):
+            if median is not None:
+                ts.append(float(epoch))
+                med.append(median)
+        return ts, med
+
+    def flush(self):
+        """Wait until queued snapshots are committed and visible to readers."""
+        self.store.flush()
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Return the most recent logged row as a dictionary or None if empty."""
+        row = self.store.latest(self.item)
+        return _row_to_dict(*row) if row else None
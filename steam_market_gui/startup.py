@@ -0,0 +1,36 @@
+"""Wall-clock timings of the GUI start-up phases, reported with --profile-startup."""
+import sys
+import threading
+import time
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self._lock = threading.Lock()
+        self.phases = []  # (name, seconds, background)
+
+    def mark(self, phase: str):
+        'End the current foreground phase and record it under `phase`.'
+        with self._lock:
+            now = time.perf_counter()
+            self.phases.append((phase, now - self._last, False))
+            self._last = now
+
+    def record(self, phase: str, seconds: float):
+        'Record work that ran off the main thread and did not delay the window.'
+        with self._lock:
+            self.phases.append((phase, seconds, True))
+
+    def report(self, file=sys.stderr):
+        with self._lock:
+            phases = list(self.phases)
+            total = self._last - self.started
+        print("Startup profile:", file=file)
+        for name, seconds, background in phases:
+            suffix = "  (background)" if background else ""
+            print(f"  {name:<34} {seconds * 1000:8.1f} ms{suffix}", file=file)
+        print(f"  {'total until first paint':<34} {total * 1000:8.1f} ms", file=file)
+
+# created on the first import of the package's GUI, which is as early as we can measure
+STARTUP = StartupTimer()
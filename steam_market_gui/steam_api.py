@@ -1,51 +1,211 @@
 import requests
 import os
-from bs4 import BeautifulSoup
+import sys
+import time
+from typing import Optional, Iterable, Dict, Tuple
+
+from .http_cache import HttpCache, extract_og_image
+from .metrics import STEAM_LATENCY, STEAM_RATE_WAIT, STEAM_REQUESTS, endpoint_label
+from .rate_limit import RETRYABLE_STATUS, backoff_delay, parse_retry_after, shared_limiter
+
+DEFAULT_BASE_URL = "https://steamcommunity.com"
+PRICE_OVERVIEW_PATH = "/market/priceoverview/"
+SEARCH_RENDER_PATH = "/market/search/render/"
+SEARCH_PAGE_SIZE = 100
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://steamcommunity.com/market/"
+}
+
+def search_params(appid: int, currency: int, query: str, start: int, count: int = SEARCH_PAGE_SIZE) -> Dict[str, str]:
+    'Query string for one page of the market search listing as JSON.'
+    return {
+        "appid": str(appid),
+        "currency": str(currency),
+        "query": query,
+        "start": str(start),
+        "count": str(count),
+        "search_descriptions": "0",
+        "sort_column": "name",
+        "sort_dir": "asc",
+        "norender": "1",
+    }
+
+def parse_search_page(payload) -> Tuple[Dict[str, dict], int]:
+    """Map one search/render page to {market_hash_name: price data} plus the total result count.
+
+    The price data mirrors the priceoverview payload so callers can treat both
+    alike: lowest_price is the cheapest listing and median_price carries the
+    recent sale price. Search results have no sales volume, only a listing count.
+    """
+    if not isinstance(payload, dict) or not payload.get("success"):
+        return {}, 0
+    prices = {}
+    for result in payload.get("results") or []:
+        name = result.get("hash_name")
+        if not name:
+            continue
+        prices[name] = {
+            "success": True,
+            "lowest_price": result.get("sell_price_text"),
+            "median_price": result.get("sale_price_text"),
+            "volume": None,
+            "sell_listings": result.get("sell_listings"),
+        }
+    return prices, int(payload.get("total_count") or 0)
 
 class SteamMarketClient:
-    def __init__(self, appid: int = 730, currency: int = 1, timeout: float = 15.0):
+    def __init__(
+        self,
+        appid: int = 730,
+        currency: int = 1,
+        timeout: float = 15.0,
+        cache_dir: Optional[str] = None,
+        base_url: Optional[str] = None,
+    ):
         self.appid = appid
         self.currency = currency
         self.country = os.getenv("COUNTRY", "US")
         self.timeout = timeout
+        # point at a local stub to replay recorded responses
+        self.base_url = (base_url or os.getenv("STEAM_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.max_retries = int(os.getenv("STEAM_MAX_RETRIES", "3"))
+        self.limiter = shared_limiter()
         self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123 Safari/537.36",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Referer": "https://steamcommunity.com/market/"
-        })
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.http_cache = HttpCache(cache_dir) if cache_dir else None
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Rate-limited GET used for every Steam request.
+
+        429 and 5xx answers are retried with exponential backoff and jitter;
+        a 429 (or its Retry-After) pauses the shared limiter for all callers.
+        Returns the last response, or raises the last connection error.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        endpoint = endpoint_label(url)
+        for attempt in range(self.max_retries + 1):
+            with STEAM_RATE_WAIT.time():
+                self.limiter.acquire()
+            started = time.perf_counter()
+            try:
+                r = self.session.get(url, **kwargs)
+            except requests.RequestException:
+                STEAM_REQUESTS.inc(endpoint=endpoint, status="error")
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+            # for streamed responses this is the time to the headers
+            STEAM_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint)
+            STEAM_REQUESTS.inc(endpoint=endpoint, status=r.status_code)
+            if r.status_code not in RETRYABLE_STATUS:
+                self.limiter.succeeded()
+                return r
+            retry_after = parse_retry_after(r.headers.get("Retry-After"))
+            if r.status_code == 429:
+                # the limiter's cool-down makes the next acquire() wait, also after
+                # the last attempt: Steam asked every caller to back off
+                self.limiter.throttle(retry_after)
+            if attempt == self.max_retries:
+                return r
+            r.close()
+            if r.status_code != 429:
+                time.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+        return r
+
+    def rate_budget(self) -> dict:
+        'Remaining request budget of the shared rate limiter.'
+        return self.limiter.budget()
 
     def price_overview(self, market_hash_name: str):
         'Calls the undocumented priceoverview endpoint and returns JSON.'
-        url = "https://steamcommunity.com/market/priceoverview/"
+        url = self.base_url + PRICE_OVERVIEW_PATH
         params = {
             "appid": str(self.appid),
             "currency": str(self.currency),
             "country": self.country,
             "market_hash_name": market_hash_name
         }
-        r = self.session.get(url, params=params, timeout=self.timeout)
+        r = self.get(url, params=params)
         if r.status_code == 200:
             try:
                 data = r.json()
                 if data.get("success"):
                     return data
             except Exception:
-                print("JSON parse failed:", r.text[:200])
+                print("JSON parse failed:", r.text[:200], file=sys.stderr)
         else:
-            print("HTTP", r.status_code, r.text[:200])
+            print("HTTP", r.status_code, r.text[:200], file=sys.stderr)
         return None
 
+    def bulk_prices(self, names: Optional[Iterable[str]] = None, query: str = "", max_pages: int = 10, fallback: bool = True) -> Dict[str, dict]:
+        """Prices for many items from the paginated search listing, up to 100 per request.
+
+        With `names`, only those items are kept and paging stops once all of
+        them were seen; any still missing are then fetched one by one through
+        price_overview unless `fallback` is False. Without `names`, every
+        result of `query` is returned. Keep `query` narrow: the full CS2
+        catalogue spans hundreds of pages.
+        """
+        wanted = set(names) if names is not None else None
+        prices: Dict[str, dict] = {}
+        url = self.base_url + SEARCH_RENDER_PATH
+        start = 0
+        for _ in range(max_pages):
+            r = self.get(url, params=search_params(self.appid, self.currency, query, start))
+            if r.status_code != 200:
+                print("HTTP", r.status_code, r.text[:200], file=sys.stderr)
+                break
+            try:
+                page, total = parse_search_page(r.json())
+            except ValueError:
+                print("JSON parse failed:", r.text[:200], file=sys.stderr)
+                break
+            for name, data in page.items():
+                if wanted is None or name in wanted:
+                    prices[name] = data
+            start += SEARCH_PAGE_SIZE
+            if not page or start >= total or (wanted is not None and wanted.issubset(prices)):
+                break
+
+        if fallback and wanted:
+            for name in sorted(wanted.difference(prices)):
+                data = self.price_overview(name)
+                if data:
+                    prices[name] = data
+        return prices
+
+    def get_cached(self, url: str) -> Optional[bytes]:
+        'GET with ETag/Last-Modified revalidation against the on-disk cache; returns the body or None.'
+        entry = self.http_cache.load(url) if self.http_cache else None
+        headers = self.http_cache.conditional_headers(entry) if self.http_cache else {}
+        r = self.get(url, headers=headers)
+        if r.status_code == 304 and entry is not None:
+            return entry["body"]
+        if r.status_code != 200:
+            return None
+        if self.http_cache:
+            self.http_cache.store(url, r.headers, r.content)
+        return r.content
+
     def listing_image_url(self, listing_url: str):
-        'Scrape the listing page for og:image; returns CDN URL or None.'
+        'Read og:image from the head of the listing page; returns CDN URL or None.'
         try:
-            r = self.session.get(listing_url, timeout=self.timeout)
-            if r.status_code != 200:
-                return None
-            soup = BeautifulSoup(r.text, "html.parser")
-            og = soup.find("meta", attrs={"property": "og:image"})
-            if og and og.get("content"):
-                return og["content"]
+            # the cache stores the extracted URL, revalidated with the page's validators
+            entry = self.http_cache.load(listing_url) if self.http_cache else None
+            headers = self.http_cache.conditional_headers(entry) if self.http_cache else {}
+            r = self.get(listing_url, headers=headers, stream=True)
+            with r:
+                if r.status_code == 304 and entry is not None:
+                    return entry["body"].decode("utf-8") or None
+                if r.status_code != 200:
+                    return None
+                # stop downloading once </head> has been parsed
+                og_image = extract_og_image(r.iter_content(chunk_size=8192))
+                if og_image and self.http_cache:
+                    self.http_cache.store(listing_url, r.headers, og_image.encode("utf-8"))
+                return og_image
         except Exception:
             return None
-        return None
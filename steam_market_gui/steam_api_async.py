@@ -0,0 +1,167 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Optional, Iterable, Dict
+
+import aiohttp
+
+from .metrics import STEAM_LATENCY, STEAM_RATE_WAIT, STEAM_REQUESTS, endpoint_label
+from .rate_limit import RETRYABLE_STATUS, backoff_delay, parse_retry_after, shared_limiter
+from .steam_api import (
+    DEFAULT_BASE_URL,
+    DEFAULT_HEADERS,
+    PRICE_OVERVIEW_PATH,
+    SEARCH_PAGE_SIZE,
+    SEARCH_RENDER_PATH,
+    parse_search_page,
+    search_params,
+)
+
+class AsyncSteamMarketClient:
+    """asyncio counterpart of SteamMarketClient for polling many items at once.
+
+    All requests share one aiohttp connection pool and at most `concurrency`
+    of them are in flight at any time. Requests also go through the same
+    process-wide rate limiter as the synchronous client.
+    """
+
+    def __init__(
+        self,
+        appid: int = 730,
+        currency: int = 1,
+        timeout: float = 15.0,
+        concurrency: int = 8,
+        base_url: Optional[str] = None,
+    ):
+        self.appid = appid
+        self.currency = currency
+        self.country = os.getenv("COUNTRY", "US")
+        self.base_url = (base_url or os.getenv("STEAM_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.concurrency = max(1, concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.max_retries = int(os.getenv("STEAM_MAX_RETRIES", "3"))
+        self.limiter = shared_limiter()
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=DEFAULT_HEADERS,
+                timeout=self.timeout,
+            )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _get_text(self, url: str, params: dict, label: str):
+        'Rate-limited, retried GET; returns (status, body text) or None if the connection kept failing.'
+        await self.open()
+        endpoint = endpoint_label(url)
+        for attempt in range(self.max_retries + 1):
+            with STEAM_RATE_WAIT.time():
+                await self.limiter.acquire_async()
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    async with self._session.get(url, params=params) as r:
+                        status = r.status
+                        retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                        text = await r.text()
+                    STEAM_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint)
+                    STEAM_REQUESTS.inc(endpoint=endpoint, status=status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                STEAM_REQUESTS.inc(endpoint=endpoint, status="error")
+                if attempt == self.max_retries:
+                    print("Request failed:", label, e, file=sys.stderr)
+                    return None
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            if status not in RETRYABLE_STATUS:
+                break
+            if status == 429:
+                # also after the last attempt, so the next requests wait too
+                self.limiter.throttle(retry_after)
+            if attempt == self.max_retries:
+                break
+            if status != 429:
+                await asyncio.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+
+        if status not in RETRYABLE_STATUS:
+            self.limiter.succeeded()
+        if status != 200:
+            print("HTTP", status, text[:200], file=sys.stderr)
+        return status, text
+
+    async def _get_json(self, url: str, params: dict, label: str):
+        response = await self._get_text(url, params, label)
+        if response is None or response[0] != 200:
+            return None
+        try:
+            return json.loads(response[1])
+        except ValueError:
+            print("JSON parse failed:", response[1][:200], file=sys.stderr)
+            return None
+
+    async def price_overview(self, market_hash_name: str):
+        'Async priceoverview call; returns the JSON payload or None on failure.'
+        params = {
+            "appid": str(self.appid),
+            "currency": str(self.currency),
+            "country": self.country,
+            "market_hash_name": market_hash_name
+        }
+        data = await self._get_json(self.base_url + PRICE_OVERVIEW_PATH, params, market_hash_name)
+        if data and data.get("success"):
+            return data
+        return None
+
+    async def bulk_prices(self, names: Optional[Iterable[str]] = None, query: str = "", max_pages: int = 10, fallback: bool = True) -> Dict[str, dict]:
+        """Async counterpart of SteamMarketClient.bulk_prices.
+
+        The first page reports the total result count; the remaining pages
+        are then requested concurrently, followed by price_overview for any
+        wanted item the search did not return.
+        """
+        wanted = set(names) if names is not None else None
+        url = self.base_url + SEARCH_RENDER_PATH
+        label = f"search {query!r}"
+        first = await self._get_json(url, search_params(self.appid, self.currency, query, 0), label)
+        page, total = parse_search_page(first)
+        pages = [page]
+        starts = range(SEARCH_PAGE_SIZE, min(total, max_pages * SEARCH_PAGE_SIZE), SEARCH_PAGE_SIZE)
+        if page and starts and not (wanted is not None and wanted.issubset(page)):
+            payloads = await asyncio.gather(
+                *(self._get_json(url, search_params(self.appid, self.currency, query, start), label) for start in starts)
+            )
+            pages.extend(parse_search_page(payload)[0] for payload in payloads)
+
+        prices: Dict[str, dict] = {}
+        for page in pages:
+            for name, data in page.items():
+                if wanted is None or name in wanted:
+                    prices[name] = data
+
+        if fallback and wanted:
+            missing = sorted(wanted.difference(prices))
+            for name, data in zip(missing, await asyncio.gather(*(self.price_overview(name) for name in missing))):
+                if data:
+                    prices[name] = data
+        return prices
+
+    def rate_budget(self) -> dict:
+        'Remaining request budget of the shared rate limiter.'
+        return self.limiter.budget()
@@ -0,0 +1,329 @@
+"""Chart state and refresh path of one tracker, independent of Tk.
+
+TrackerChart loads an item's price series (followed incrementally through
+the CSV series cache, read as a window from the other backends, or taken
+from the OHLC rollups for long views), downsamples it, computes the
+indicator overlays and renders it with chart_render.ChartRenderer, in this
+thread or in a render process pool. Finished images go to the `show`
+callback; TrackerFrame posts them to Tk, the benchmarks drive the same
+object without any widgets. Matplotlib is only imported on the first render.
+"""
+import sys
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from PIL import Image
+
+from .config import CHART_DOWNSAMPLE, CHART_INDICATORS, INDICATOR_WINDOW, INDICATOR_EMA_SPAN, INDICATOR_VWAP_WINDOW
+from .data_logger import PriceLogger, SeriesCache
+from .metrics import timed_stage
+from .rollups import ROLLUP_RESOLUTIONS
+
+TIMEFRAME_SPANS = {
+    "day": timedelta(days=1),
+    "week": timedelta(days=7),
+    "lifetime": None,
+}
+
+CHART_FIGSIZE = (3.4, 1.75)
+CHART_DPI = 135
+# about two samples per horizontal pixel is all the chart can show
+CHART_MAX_POINTS = 2 * int(CHART_FIGSIZE[0] * CHART_DPI)
+CHART_MARKER_LIMIT = 120
+# long views draw hourly/daily rollups, the coarsest one that still gives this many buckets
+CHART_MIN_BUCKETS = 30
+# more new samples than this are backfilled with NumPy instead of added one by one
+INDICATOR_UPDATE_LIMIT = 1000
+# ChartRenderer keyword arguments; the GUI adds its colours
+CHART_STYLE = {"figsize": CHART_FIGSIZE, "dpi": CHART_DPI}
+
+class TrackerChart:
+    def __init__(
+        self,
+        logger,
+        style: dict = CHART_STYLE,
+        show: Optional[Callable] = None,
+        persist: Optional[Callable] = None,
+        render_pool=None,
+    ):
+        self.logger = logger
+        # CSV logs are followed incrementally; other backends read their window directly
+        self.series_cache = SeriesCache(logger.path) if isinstance(logger, PriceLogger) else None
+        self.style = style
+        # show(image, hover points, text) with (None, None, text) for an empty chart
+        self.show = show or (lambda image, pixel_points, text="": None)
+        # persist(timeframe, image) after each finished render
+        self.persist = persist or (lambda timeframe, image: None)
+        # with a process pool, charts are rasterized in other processes
+        self.render_pool = render_pool
+        self.timeframe = "day"
+        # "line" or "candles"; candles apply where the chart draws rollups
+        self.chart_mode = "line"
+        self.show_indicators = CHART_INDICATORS
+        self.points = []
+        self.renderer = None
+        self.indicators = None
+        self._indicator_source = None
+        self._indicator_lock = threading.Lock()
+        self._downsample_cache = {}
+        # one render at a time, periodic or requested by a button
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._render_generation = {}
+
+    @timed_stage("plot_chart")
+    def plot(self):
+        # the periodic refresh and button re-renders share the tracker's state and renderer
+        with self._lock:
+            resolution = self.rollup_resolution(self.timeframe)
+            if resolution is not None and self.render_rollup(self.timeframe, resolution):
+                return
+
+            if self.series_cache is not None:
+                # parses only rows appended since the last refresh; already sorted
+                self.points = self.series_cache.refresh()
+            else:
+                self.points = self.load_window_points()
+
+            if not self.points:
+                # no data yet — clear chart
+                self.points = []
+                self.show(None, None, "No price history yet")
+                return
+
+            self.render(self.timeframe)
+
+    def rollup_resolution(self, timeframe: str) -> Optional[str]:
+        if not hasattr(self.logger, "ohlc_series"):
+            return None
+        first = self.logger.first_epoch()
+        if first is None:
+            return None
+        now = time.time()
+        span = TIMEFRAME_SPANS.get(timeframe)
+        start = first if span is None else max(first, now - span.total_seconds())
+        for resolution, seconds in sorted(ROLLUP_RESOLUTIONS.items(), key=lambda item: -item[1]):
+            if (now - start) / seconds >= CHART_MIN_BUCKETS:
+                return resolution
+        return None
+
+    @timed_stage("render_rollup")
+    def render_rollup(self, timeframe: str, resolution: str) -> bool:
+        """Draw a long view from a few hundred OHLC buckets instead of every raw sample."""
+        seconds = ROLLUP_RESOLUTIONS[resolution]
+        span = TIMEFRAME_SPANS.get(timeframe)
+        now = time.time()
+        start = None if span is None else now - span.total_seconds()
+        epochs, opens, highs, lows, closes, _ = self.logger.ohlc_series(resolution, start_epoch=start)
+        if not epochs:
+            return False
+
+        label = {"1h": "Hourly", "1d": "Daily"}.get(resolution, resolution)
+        title = f"Median Price — {timeframe.capitalize()} View ({label})"
+        range_start = epochs[0] if start is None else start
+        overlays = None
+        if self.show_indicators and self.series_cache is not None:
+            # indicators run over the raw samples; each bucket shows them as of its close
+            self.points = self.series_cache.refresh()
+            overlays = self.indicator_overlays(at=[epoch + seconds - 1e-6 for epoch in epochs])
+        if self.chart_mode == "candles":
+            self._draw(
+                timeframe, epochs, closes, title, range_start, max(now, epochs[-1] + seconds),
+                markers=False, ohlc=(opens, highs, lows, closes), bar_seconds=seconds, overlays=overlays,
+            )
+        else:
+            # a bucket's close is plotted at the bucket's centre
+            centers = [epoch + seconds / 2 for epoch in epochs]
+            self._draw(
+                timeframe, centers, closes, title, range_start, max(now, centers[-1]),
+                markers=len(closes) <= CHART_MARKER_LIMIT, overlays=overlays,
+            )
+        return True
+
+    def load_window_points(self):
+        span = TIMEFRAME_SPANS.get(self.timeframe)
+        if span is None:
+            ts, med = self.logger.median_series()
+        else:
+            # only read the span covering the visible window
+            ts, med = self.logger.median_series(start_epoch=time.time() - span.total_seconds())
+            if not len(med):
+                ts, med = self.logger.median_series()
+
+        # Convert epochs to timezone-aware datetimes and sort chronologically
+        timestamps = [datetime.fromtimestamp(t, tz=timezone.utc).astimezone() for t in ts]
+        return sorted(zip(timestamps, med), key=lambda x: x[0])
+
+    @timed_stage("render_chart")
+    def render(self, timeframe: Optional[str] = None):
+        if timeframe is None:
+            timeframe = self.timeframe
+
+        if not self.points:
+            self.show(None, None, "No price history yet")
+            return
+
+        first_time = self.points[0][0]
+        now = datetime.now(timezone.utc).astimezone(first_time.tzinfo)
+
+        span = TIMEFRAME_SPANS.get(timeframe)
+
+        if span is None:
+            start_idx = 0
+            range_start = first_time
+        else:
+            threshold = now - span
+            # points is sorted, so the window is a suffix
+            start_idx = bisect_left(self.points, (threshold,))
+            range_start = threshold
+
+        start_idx = min(start_idx, len(self.points) - 1)
+        filtered_times, filtered_prices, indices = self._reduced_window(timeframe, start_idx)
+        overlays = self.indicator_overlays(start_idx, indices) if self.show_indicators else None
+
+        range_end = now
+        if len(filtered_times) == 1:
+            padding = {
+                "day": timedelta(hours=12),
+                "week": timedelta(days=1.5),
+            }.get(timeframe, timedelta(days=30))
+            range_start = min(range_start, filtered_times[0] - padding)
+            range_end = max(range_end, filtered_times[0] + padding)
+
+        self._draw(
+            timeframe,
+            [t.timestamp() for t in filtered_times],
+            filtered_prices,
+            f"Median Price — {timeframe.capitalize()} View",
+            range_start.timestamp(),
+            range_end.timestamp(),
+            markers=len(filtered_prices) <= CHART_MARKER_LIMIT,
+            overlays=overlays,
+        )
+
+    def indicator_overlays(self, start: int = 0, indices=None, at=None) -> Optional[dict]:
+        """Chart overlays for points[start:] (at `indices` of that window), or at the epochs `at`.
+
+        With the CSV series cache only the samples appended since the last
+        call are added, O(1) each; after a rebuild, and for the window reads
+        of the other backends, the indicators are backfilled with NumPy.
+        """
+        points = self.points
+        if not points:
+            return None
+        from .indicators import RollingIndicators, chart_overlays
+        with self._indicator_lock:
+            if self.indicators is None:
+                self.indicators = RollingIndicators(INDICATOR_WINDOW, INDICATOR_EMA_SPAN, INDICATOR_VWAP_WINDOW)
+            indicators = self.indicators
+            cache = self.series_cache
+            if cache is not None and points is cache.points:
+                source = (id(cache), cache.generation)
+                fed = len(indicators) if source == self._indicator_source else 0
+                new = len(cache.epochs) - fed
+                if fed and 0 <= new <= INDICATOR_UPDATE_LIMIT:
+                    for i in range(fed, fed + new):
+                        indicators.update(cache.epochs[i], cache.medians[i], cache.volumes[i])
+                else:
+                    epochs, medians, volumes, generation = cache.columns()
+                    indicators.backfill(epochs, medians, volumes)
+                    source = (id(cache), generation)
+            else:
+                # a fresh window read: no volumes and nothing to continue from
+                source = None
+                indicators.backfill([t.timestamp() for t, _ in points], [price for _, price in points])
+            self._indicator_source = source
+            if len(indicators) != len(points):
+                # rows arrived while syncing; the next refresh catches up
+                return None
+            columns = indicators.at(at) if at is not None else indicators.series(start, indices)
+        return chart_overlays(columns)
+
+    def _draw(self, timeframe: str, epochs, prices, title: str, start_epoch: float, end_epoch: float, markers: bool, ohlc=None, bar_seconds: float = 3600, overlays=None):
+        if self.render_pool is not None:
+            self._submit_render(timeframe, epochs, prices, title, start_epoch, end_epoch, markers, ohlc, bar_seconds, overlays)
+            return
+
+        generation = self._next_render_generation(timeframe)
+        if self.renderer is None:
+            from .chart_render import ChartRenderer
+            self.renderer = ChartRenderer(**self.style)
+        image, pixel_points = self.renderer.render_epochs(
+            epochs, prices, title, start_epoch, end_epoch, markers, ohlc, bar_seconds, overlays
+        )
+        if not self._is_current_render(timeframe, generation):
+            return
+        self.show(image, pixel_points)
+        self.persist(timeframe, image)
+
+    def _submit_render(self, timeframe: str, epochs, prices, title: str, start_epoch: float, end_epoch: float, markers: bool, ohlc, bar_seconds: float, overlays=None):
+        import numpy as np
+        from .chart_render import render_to_buffer
+        generation = self._next_render_generation(timeframe)
+        to_array = lambda values: np.asarray(values, dtype=np.float64)
+        future = self.render_pool.submit(
+            render_to_buffer,
+            self.style,
+            to_array(epochs),
+            to_array(prices),
+            title,
+            start_epoch,
+            end_epoch,
+            markers,
+            None if ohlc is None else tuple(to_array(column) for column in ohlc),
+            bar_seconds,
+            overlays,
+        )
+        future.add_done_callback(lambda f: self._on_render_done(f, timeframe, generation))
+
+    def _next_render_generation(self, timeframe: str) -> int:
+        with self._render_lock:
+            generation = self._render_generation.get(timeframe, 0) + 1
+            self._render_generation[timeframe] = generation
+        return generation
+
+    def _is_current_render(self, timeframe: str, generation: int) -> bool:
+        # a newer request for this timeframe, or a switch to another one, supersedes a result
+        return generation == self._render_generation.get(timeframe) and timeframe == self.timeframe
+
+    def _on_render_done(self, future, timeframe: str, generation: int):
+        if future.cancelled() or not self._is_current_render(timeframe, generation):
+            return
+        try:
+            size, rgba, xs, ys, prices = future.result()
+        except Exception as e:
+            print("Chart render failed:", e, file=sys.stderr)
+            return
+        from .chart_render import HoverPoints
+        image = Image.frombytes("RGBA", size, rgba)
+        self.show(image, HoverPoints(xs, ys, prices))
+        self.persist(timeframe, image)
+
+    def _reduced_window(self, timeframe: str, start_idx: int):
+        """Times and prices of points[start_idx:], downsampled for drawing.
+
+        Returns (times, prices, indices kept relative to start_idx or None if
+        all were). The reduced series is cached per timeframe and reused until
+        the window or the underlying series changes, so switching timeframes
+        is instant.
+        """
+        points = self.points
+        key = (id(points), start_idx, len(points), points[-1])
+        cached = self._downsample_cache.get(timeframe)
+        if cached is not None and cached[0] == key:
+            return cached[1:]
+
+        times, prices = zip(*points[start_idx:])
+        idx = None
+        if len(times) > CHART_MAX_POINTS:
+            import numpy as np
+            from .downsample import downsample
+            epochs = np.fromiter((t.timestamp() for t in times), dtype=np.float64, count=len(times))
+            idx = downsample(epochs, prices, CHART_MAX_POINTS, CHART_DOWNSAMPLE)
+            times = tuple(times[i] for i in idx)
+            prices = tuple(prices[i] for i in idx)
+        self._downsample_cache[timeframe] = (key, times, prices, idx)
+        return times, prices, idx
@@ -0,0 +1,107 @@
+"""Hand widget updates from worker threads to the Tk main loop.
+
+Tkinter must only be touched from the thread running mainloop. Workers post
+small typed messages instead; the main loop drains the queue on a fixed
+tick, keeps only the newest message per widget and applies those. Heavy work
+(fetching, rendering, stylizing) stays on the workers: the main thread only
+wraps finished PIL images in PhotoImages and sets strings.
+"""
+import queue
+import sys
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional
+
+import tkinter as tk
+from PIL import Image, ImageTk
+
+@dataclass(frozen=True)
+class SetVar:
+    'Set a Tk variable (label text) to a string.'
+    var: tk.Variable
+    value: str
+
+    @property
+    def key(self) -> Hashable:
+        return ("var", str(self.var))
+
+    def apply(self):
+        self.var.set(self.value)
+
+@dataclass(frozen=True)
+class SetImage:
+    """Show a PIL image on a label, or clear it and show `text` when image is None.
+
+    The image must not share memory with anything the worker keeps drawing
+    into; `on_apply` runs on the main thread right after the label changed.
+    """
+    widget: tk.Widget
+    image: Optional[Image.Image]
+    text: str = ""
+    on_apply: Optional[Callable[[], None]] = None
+
+    @property
+    def key(self) -> Hashable:
+        return ("image", str(self.widget))
+
+    def apply(self):
+        if self.image is None:
+            photo = None
+            self.widget.configure(image="", text=self.text)
+        else:
+            photo = ImageTk.PhotoImage(self.image)
+            self.widget.configure(image=photo, text=self.text)
+        # Tk only holds the image by name; keep the Python object alive
+        self.widget._ui_photo = photo
+        if self.on_apply is not None:
+            self.on_apply()
+
+@dataclass(frozen=True)
+class Invoke:
+    'Run `callback(*args)` on the main thread; messages sharing `key` collapse to the last one.'
+    key: Hashable
+    callback: Callable
+    args: tuple = ()
+
+    def apply(self):
+        self.callback(*self.args)
+
+class UiDispatcher:
+    def __init__(self, root: tk.Misc, interval_ms: int = 33):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._job = None
+
+    def post(self, message):
+        'Queue an update; safe to call from any thread.'
+        self._queue.put(message)
+
+    def start(self):
+        if self._job is None:
+            self._job = self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def flush(self):
+        'Apply everything queued so far right away; main thread only.'
+        latest = {}
+        while True:
+            try:
+                message = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            # re-insert so updates apply in the order of their newest post
+            latest.pop(message.key, None)
+            latest[message.key] = message
+        for message in latest.values():
+            try:
+                message.apply()
+            except Exception as e:
+                print("UI update failed:", e, file=sys.stderr)
+
+    def _drain(self):
+        self.flush()
+        self._job = self.root.after(self.interval_ms, self._drain)
@@ -1,6 +1,6 @@
 import re
 import hashlib
-from urllib.parse import urlparse, unquote
+from urllib.parse import urlparse, unquote, quote
 
 def market_hash_from_url(url: str) -> str:
     path = urlparse(url).path
@@ -11,6 +11,9 @@ def market_hash_from_url(url: str) -> str:
     except ValueError:
         return unquote(path.rsplit('/', 1)[-1])
 
+def listing_url_from_hash(market_hash: str, appid: int = 730) -> str:
+    return f"https://steamcommunity.com/market/listings/{appid}/{quote(market_hash, safe='')}"
+
 def slugify(text: str) -> str:
     text = unquote(text)
     text = re.sub(r'[^a-zA-Z0-9]+', '-', text).strip('-').lower()
@@ -30,3 +33,50 @@ def parse_price_to_float(price_str: str):
         return float(s2)
     except:
         return None
+
+def load_watchlist(path: str):
+    'Read a watchlist file (one listing URL or market hash name per line, # comments) into market hash names.'
+    names = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            name = market_hash_from_url(line) if line.startswith('http') else unquote(line)
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+    return names
+
+def to_float(value):
+    'Float of a logged CSV field, or None if it is empty or not a number.'
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def parse_volume(volume_str):
+    # Steam reports volume as a string such as "1,234"
+    if volume_str is None:
+        return None
+    s = re.sub(r'[^0-9]', '', str(volume_str))
+    if not s:
+        return None
+    try:
+        return int(s)
+    except ValueError:
+        return None
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+def parse_duration(value) -> int:
+    'Seconds from 300, "300", "15m", "1h", "7d" or "2w".'
+    text = str(value).strip().lower()
+    unit = DURATION_UNITS.get(text[-1:])
+    seconds = float(text[:-1]) * unit if unit else float(text)
+    if seconds <= 0:
+        raise ValueError(f"duration must be positive: {value!r}")
+    return int(seconds)
@@ -0,0 +1,371 @@
+"""Scrolling list of every item in the watchlist file.
+
+Only enough row widgets to fill the viewport exist; scrolling re-binds them
+to other items instead of creating new ones. Every item keeps collecting
+prices through the shared RefreshScheduler, but thumbnails and sparklines
+are only loaded and drawn for rows that are on screen, and only a bounded
+number of them is kept, so memory and CPU follow the viewport size rather
+than the length of the watchlist.
+"""
+import io
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, List
+
+import tkinter as tk
+from tkinter import ttk
+from PIL import Image, ImageDraw, ImageOps, ImageTk
+
+from .config import ASSETS_DIR, DATA_DIR, STORAGE_BACKEND
+from . import alerts
+from .data_logger import open_logger
+from .metrics import ITEM_STALENESS, timed_stage
+from .scheduler import RefreshScheduler
+from .steam_api import SteamMarketClient
+from .ui_dispatcher import UiDispatcher, Invoke
+from .utils import slugify, parse_price_to_float, listing_url_from_hash
+
+ROW_HEIGHT = 64
+THUMB_SIZE = (48, 48)
+SPARKLINE_SIZE = (200, 44)
+SPARKLINE_SPAN_SECONDS = 7 * 24 * 3600
+# thumbnails and sparklines kept for items that scrolled out of view
+IMAGE_CACHE_ROWS = 64
+
+class WatchItem:
+    """Collected state of one watchlist entry; no widgets, no images."""
+
+    def __init__(self, name: str, read_only: bool = False):
+        self.name = name
+        self.slug = slugify(name)
+        self.read_only = read_only
+        self.snapshot: Optional[dict] = None
+        self.version = 0
+        self._logger = None
+        self._lock = threading.Lock()
+
+    @property
+    def logger(self):
+        # opened on first use so a long watchlist does not touch every file at startup
+        with self._lock:
+            if self._logger is None:
+                self._logger = open_logger(DATA_DIR, self.slug, STORAGE_BACKEND, self.read_only)
+            return self._logger
+
+def _fmt_price(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.2f}"
+
+def render_sparkline(epochs, prices, size=SPARKLINE_SIZE, color: str = "#58b4ff") -> Optional[Image.Image]:
+    'Draw a small line chart of the series with PIL; returns None for fewer than two points.'
+    import numpy as np
+    from .downsample import downsample
+    x = np.asarray(epochs, dtype=np.float64)
+    y = np.asarray(prices, dtype=np.float64)
+    if len(x) < 2:
+        return None
+    width, height = size
+    idx = downsample(x, y, 2 * width, "minmax")
+    x, y = x[idx], y[idx]
+    span_x = (x[-1] - x[0]) or 1.0
+    span_y = (y.max() - y.min()) or 1.0
+    px = (x - x[0]) / span_x * (width - 4) + 2
+    py = height - 3 - (y - y.min()) / span_y * (height - 6)
+    image = Image.new("RGBA", size, (0, 0, 0, 0))
+    ImageDraw.Draw(image).line(list(zip(px.tolist(), py.tolist())), fill=color, width=2, joint="curve")
+    return image
+
+class _WatchRow(ttk.Frame):
+    def __init__(self, master):
+        super().__init__(master, style="NeonCard.TFrame", padding=(10, 6))
+        self.item: Optional[WatchItem] = None
+        self.photos = {}
+        self.columnconfigure(1, weight=1)
+
+        self.thumb_lbl = ttk.Label(self, style="NeonImage.TLabel", width=6, anchor="center")
+        self.thumb_lbl.grid(row=0, column=0, rowspan=2, padx=(0, 10))
+        self.name_lbl = ttk.Label(self, style="NeonSecondary.TLabel")
+        self.name_lbl.grid(row=0, column=1, columnspan=2, sticky="w")
+        self.median_lbl = ttk.Label(self, style="NeonValueSecondary.TLabel")
+        self.median_lbl.grid(row=1, column=1, sticky="w")
+        self.info_lbl = ttk.Label(self, style="NeonInfo.TLabel")
+        self.info_lbl.grid(row=1, column=2, sticky="w", padx=(12, 0))
+        self.spark_lbl = ttk.Label(self, style="NeonImage.TLabel")
+        self.spark_lbl.grid(row=0, column=3, rowspan=2, sticky="e")
+
+    def show(self, item: WatchItem):
+        self.item = item
+        snap = item.snapshot or {}
+        self.name_lbl.configure(text=item.name)
+        self.median_lbl.configure(text=f"Median: {snap.get('median', '—')}")
+        self.info_lbl.configure(
+            text=f"Lowest: {snap.get('lowest', '—')}   Volume: {snap.get('volume', '—')}   {snap.get('updated', '')}"
+        )
+
+    def set_image(self, label: ttk.Label, image: Optional[Image.Image]):
+        photo = ImageTk.PhotoImage(image) if image is not None else None
+        label.configure(image=photo if photo is not None else "")
+        # keep a reference; Tk only holds the image by name
+        self.photos[str(label)] = photo
+
+class WatchlistView(ttk.Frame):
+    def __init__(
+        self,
+        master,
+        names: List[str],
+        client: SteamMarketClient,
+        scheduler: RefreshScheduler,
+        dispatcher: UiDispatcher,
+        read_only: bool = False,
+        line_color: str = "#58b4ff",
+        **kwargs,
+    ):
+        super().__init__(master, style="TrackerFrame.TFrame", **kwargs)
+        self.client = client
+        self.scheduler = scheduler
+        self.dispatcher = dispatcher
+        self.read_only = read_only
+        self.line_color = line_color
+        self.items = [WatchItem(name, read_only) for name in names]
+
+        self.rows: List[_WatchRow] = []
+        self._windows: List[int] = []
+        # names of items bound to a row; replaced wholesale so workers can read it
+        self._visible = frozenset()
+        self._thumbs: "OrderedDict[str, Image.Image]" = OrderedDict()
+        self._sparklines: "OrderedDict[str, tuple]" = OrderedDict()
+        self._pending = set()
+        self._width = 1
+
+        background = ttk.Style().lookup("TrackerFrame.TFrame", "background") or "#050b18"
+        self.canvas = tk.Canvas(self, highlightthickness=0, bd=0, background=background, yscrollincrement=ROW_HEIGHT)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yview)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self.canvas.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.canvas)
+
+        # attached to a shared SQLite store, one query reads every item's latest row
+        self._store = getattr(self.items[0].logger, "store", None) if read_only and self.items else None
+        if self._store is not None:
+            scheduler.add(("watchlist", "latest"), self._load_snapshots)
+        else:
+            # spread the first fetches over one refresh interval instead of a burst
+            spacing = scheduler.interval / max(1, len(self.items))
+            for i, item in enumerate(self.items):
+                scheduler.add(("watchlist", item.name), lambda item=item: self._collect(item), delay=i * spacing)
+
+    def destroy(self):
+        self.scheduler.remove(("watchlist", "latest"))
+        for item in self.items:
+            self.scheduler.remove(("watchlist", item.name))
+        super().destroy()
+
+    # -- virtual scrolling (main thread) -------------------------------------
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self._scroll(-1 if e.delta > 0 else 1))
+        widget.bind("<Button-4>", lambda e: self._scroll(-1))
+        widget.bind("<Button-5>", lambda e: self._scroll(1))
+
+    def _scroll(self, units: int):
+        self.canvas.yview_scroll(units, "units")
+
+    def _on_resize(self, event):
+        self._width = event.width
+        self.canvas.configure(scrollregion=(0, 0, event.width, len(self.items) * ROW_HEIGHT))
+        needed = event.height // ROW_HEIGHT + 2
+        while len(self.rows) < needed:
+            row = _WatchRow(self.canvas)
+            for widget in (row, *row.winfo_children()):
+                self._bind_wheel(widget)
+            self.rows.append(row)
+            self._windows.append(self.canvas.create_window(0, 0, window=row, anchor="nw", height=ROW_HEIGHT))
+        self._layout()
+
+    def _on_yview(self, first, last):
+        self.scrollbar.set(first, last)
+        self._layout()
+
+    def _layout(self):
+        first = max(0, int(self.canvas.canvasy(0) // ROW_HEIGHT))
+        shown = self.items[first:first + len(self.rows)]
+        # publish before queueing work, the workers skip items that are not visible
+        self._visible = frozenset(item.name for item in shown)
+        for offset, (row, window) in enumerate(zip(self.rows, self._windows)):
+            if offset >= len(shown):
+                self.canvas.itemconfigure(window, state="hidden")
+                row.item = None
+                continue
+            item = shown[offset]
+            self.canvas.coords(window, 0, (first + offset) * ROW_HEIGHT)
+            self.canvas.itemconfigure(window, state="normal", width=self._width)
+            if row.item is not item:
+                self._bind_row(row, item)
+
+    def _bind_row(self, row: _WatchRow, item: WatchItem):
+        row.show(item)
+        row.set_image(row.thumb_lbl, self._cached(self._thumbs, item.slug))
+        spark = self._cached(self._sparklines, item.slug)
+        row.set_image(row.spark_lbl, spark[1] if spark else None)
+        self._request(item)
+
+    def _row_for(self, item: WatchItem) -> Optional[_WatchRow]:
+        for row in self.rows:
+            if row.item is item:
+                return row
+        return None
+
+    @staticmethod
+    def _cached(cache: OrderedDict, key: str):
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _store(self, cache: OrderedDict, key: str, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max(IMAGE_CACHE_ROWS, len(self.rows)):
+            cache.popitem(last=False)
+
+    def _request(self, item: WatchItem):
+        'Queue the background work a freshly visible row still needs.'
+        jobs = []
+        if item.snapshot is None:
+            jobs.append(("snapshot", self._load_snapshot))
+        if item.slug not in self._thumbs:
+            jobs.append(("thumb", self._load_thumb))
+        spark = self._sparklines.get(item.slug)
+        if spark is None or spark[0] != item.version:
+            jobs.append(("spark", self._render_spark))
+        for kind, job in jobs:
+            if (kind, item.name) not in self._pending:
+                self._pending.add((kind, item.name))
+                self.scheduler.submit(job, item)
+
+    def _apply(self, kind: str, item: WatchItem, value):
+        self._pending.discard((kind, item.name))
+        if kind == "thumb" and value is not None:
+            self._store(self._thumbs, item.slug, value)
+        elif kind == "spark" and value is not None:
+            self._store(self._sparklines, item.slug, value)
+        row = self._row_for(item)
+        if row is None:
+            return
+        row.show(item)
+        if kind == "thumb":
+            row.set_image(row.thumb_lbl, self._thumbs.get(item.slug))
+        elif kind == "spark":
+            spark = self._sparklines.get(item.slug)
+            row.set_image(row.spark_lbl, spark[1] if spark else None)
+        elif kind == "refresh":
+            # new data: the sparkline is out of date
+            self._request(item)
+
+    def _post(self, kind: str, item: WatchItem, value=None):
+        self.dispatcher.post(Invoke(("watchlist", kind, item.name), self._apply, (kind, item, value)))
+
+    # -- background work (worker threads) ------------------------------------
+
+    def _collect(self, item: WatchItem):
+        if self.read_only:
+            self._load_snapshot(item, post=False)
+        else:
+            data = self.client.price_overview(item.name)
+            if not data:
+                return
+            median_str = data.get("median_price")
+            lowest_str = data.get("lowest_price")
+            volume_str = data.get("volume")
+            median = parse_price_to_float(median_str)
+            lowest = parse_price_to_float(lowest_str)
+            item.logger.append(median, lowest, volume_str)
+            if hasattr(item.logger, "flush"):
+                item.logger.flush()
+            if median is not None:
+                ITEM_STALENESS.mark(item.slug)
+            alerts.observe(item.slug, median, lowest)
+            item.snapshot = {
+                "median": median_str or "n/a",
+                "lowest": lowest_str or "n/a",
+                "volume": volume_str or "n/a",
+                "updated": datetime.now().strftime("%H:%M:%S"),
+            }
+        item.version += 1
+        if item.name in self._visible:
+            self._post("refresh", item)
+
+    def _load_snapshots(self):
+        latest = self._store.latest_per_item()
+        for item in self.items:
+            last = latest.get(item.slug)
+            if item.snapshot is not None and item.snapshot.get("epoch") == (last["epoch_s"] if last else None):
+                continue
+            self._set_snapshot(item, last)
+            item.version += 1
+            if item.name in self._visible:
+                self._post("refresh", item)
+
+    def _load_snapshot(self, item: WatchItem, post: bool = True):
+        self._set_snapshot(item, item.logger.latest())
+        if post:
+            self._post("snapshot", item)
+
+    def _set_snapshot(self, item: WatchItem, last: Optional[dict]):
+        if last:
+            if last.get("median_price") is not None and last.get("epoch_s") is not None:
+                ITEM_STALENESS.mark(item.slug, last["epoch_s"])
+            ts = last.get("timestamp")
+            item.snapshot = {
+                "median": _fmt_price(last.get("median_price")),
+                "lowest": _fmt_price(last.get("lowest_price")),
+                "volume": last.get("volume") or "n/a",
+                "updated": ts.strftime("%Y-%m-%d %H:%M") if ts else "",
+                "epoch": last.get("epoch_s"),
+            }
+        else:
+            item.snapshot = {}
+
+    def _load_thumb(self, item: WatchItem):
+        thumb = None
+        if item.name in self._visible:
+            try:
+                thumb = self._thumbnail(item)
+            except Exception as e:
+                print("Thumbnail failed:", item.name, e, file=sys.stderr)
+        self._post("thumb", item, thumb)
+
+    def _thumbnail(self, item: WatchItem) -> Optional[Image.Image]:
+        # the image a tracker (or an earlier run) downloaded, else fetch it once
+        for ext in ("png", "jpg"):
+            path = os.path.join(ASSETS_DIR, f"{item.slug}.{ext}")
+            if os.path.exists(path):
+                with Image.open(path) as im:
+                    return ImageOps.contain(im.convert("RGBA"), THUMB_SIZE)
+        if self.read_only:
+            return None
+        url = self.client.listing_image_url(listing_url_from_hash(item.name))
+        content = self.client.get_cached(url) if url else None
+        if not content:
+            return None
+        with Image.open(io.BytesIO(content)) as im:
+            image = im.convert("RGBA")
+        os.makedirs(ASSETS_DIR, exist_ok=True)
+        image.save(os.path.join(ASSETS_DIR, f"{item.slug}.png"), format="PNG")
+        return ImageOps.contain(image, THUMB_SIZE)
+
+    @timed_stage("render_sparkline")
+    def _render_spark(self, item: WatchItem):
+        value = None
+        if item.name in self._visible:
+            version = item.version
+            ts, med = item.logger.median_series(start_epoch=time.time() - SPARKLINE_SPAN_SECONDS)
+            value = (version, render_sparkline(ts, med, color=self.line_color))
+        self._post("spark", item, value)